@@ -0,0 +1,46 @@
+"""
+Benchmark comparing input backend throughput.
+
+Sends the same number of clicks through the pyautogui backend (with its
+default PAUSE) and the XTest backend (flushing per click and batched), and
+reports clicks per second. Run on a throwaway X server, not your desktop:
+    xvfb-run python benchmarks/bench_backends.py
+"""
+import sys
+import time
+
+sys.path.insert(0, 'src')
+from gui.input_backend import PyAutoGUIBackend, XTestBackend
+
+
+def bench_backend(backend, clicks, flush_every=1):
+    start = time.perf_counter()
+    for i in range(clicks):
+        backend.click(100 + i % 100, 100)
+        if (i + 1) % flush_every == 0:
+            backend.flush()
+    backend.flush()
+    if hasattr(backend, "sync"):
+        backend.sync()
+    return clicks / (time.perf_counter() - start)
+
+
+def main():
+    results = {}
+    try:
+        results["pyautogui"] = bench_backend(PyAutoGUIBackend(), 20)
+    except Exception as e:
+        print(f"pyautogui backend unavailable: {e}")
+    try:
+        xtest = XTestBackend()
+        results["xtest (flush per click)"] = bench_backend(xtest, 20000)
+        results["xtest (batch of 100)"] = bench_backend(xtest, 20000, flush_every=100)
+        xtest.close()
+    except Exception as e:
+        print(f"XTest backend unavailable: {e}")
+    for name, rate in results.items():
+        print(f"{name:26s} {rate:12.0f} clicks/s")
+
+
+if __name__ == '__main__':
+    main()
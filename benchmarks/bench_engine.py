@@ -0,0 +1,93 @@
+"""
+Throughput and jitter benchmark for each run mode.
+
+Runs a single click action at a fixed interval through every run mode on
+a recording backend and reports achieved events/s, interval error
+percentiles and stop latency. With --low-jitter every mode is run again under
+a LowJitterProfile, so jitter with and without it can be compared; --load
+adds a thread producing cyclic garbage, as a busy GUI would. Results are
+written as JSON so they can be compared between releases.
+
+Run from the project root:
+    python benchmarks/bench_engine.py --interval 0.001 --seconds 2 --output bench.json
+    python benchmarks/bench_engine.py --low-jitter --load --cpus 1 --nice -5
+"""
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+
+from harness import run_mode, summarize
+from gui.cli import parse_cpus
+from gui.run_profile import LowJitterProfile
+
+MODES = ("indefinite", "duration", "executions")
+
+
+def make_garbage(stop):
+    """Allocate reference cycles until stop is set, so the cyclic GC keeps running."""
+    while not stop.is_set():
+        for _ in range(1000):
+            node = []
+            node.append(node)
+        time.sleep(0.0005)
+
+
+def bench(interval, seconds, profile=None, load=False):
+    actions = [{"x": 100, "y": 100, "interval": interval, "type": "click", "repeat": 1}]
+    results = {}
+    stop = threading.Event()
+    if load:
+        threading.Thread(target=make_garbage, args=(stop,), daemon=True).start()
+    try:
+        for mode in MODES:
+            backend, times = run_mode(mode, actions, run_seconds=seconds, profile=profile)
+            results[mode] = summarize(backend, times, interval)
+    finally:
+        stop.set()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the run engine headlessly.')
+    parser.add_argument('--interval', type=float, default=0.001, help='Action interval in seconds')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Run time per mode')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--low-jitter', action='store_true', help='Also run every mode under the low-jitter profile')
+    parser.add_argument('--load', action='store_true', help='Produce cyclic garbage on another thread during runs')
+    parser.add_argument('--cpus', type=parse_cpus, help='CPUs to pin the click thread to in the low-jitter runs')
+    parser.add_argument('--nice', type=int, help='Nice value to request in the low-jitter runs')
+    parser.add_argument('--realtime', type=int, metavar='PRIORITY', help='SCHED_FIFO priority for the low-jitter runs')
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "interval": args.interval,
+        "seconds": args.seconds,
+        "load": args.load,
+        "modes": bench(args.interval, args.seconds, load=args.load),
+    }
+    if args.low_jitter:
+        profile = LowJitterProfile(cpus=args.cpus, nice=args.nice, realtime_priority=args.realtime)
+        report["low_jitter_modes"] = bench(args.interval, args.seconds, profile, load=args.load)
+        report["low_jitter_profile"] = {"applied": profile.applied, "skipped": profile.skipped}
+    for key, label in (("modes", ""), ("low_jitter_modes", " low-jitter")):
+        for mode, stats in report.get(key, {}).items():
+            err = stats["interval_error_us"]
+            print(f"{mode + label:22s} {stats['events_per_s']:10.1f} events/s  "
+                  f"error p50 {err['p50']:8.1f} us  p99 {err['p99']:8.1f} us  max {err['max']:8.1f} us  "
+                  f"stop {stats['stop_latency_ms']:6.2f} ms")
+    if args.low_jitter:
+        print(profile.report())
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
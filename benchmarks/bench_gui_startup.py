@@ -0,0 +1,84 @@
+"""
+Benchmark for GUI startup time.
+
+Reports the slowest imports of the GUI modules from `python -X importtime`,
+and time-to-interactive: from spawning the process until the main window is
+mapped and the first idle callbacks (deferred startup work) have run.
+Needs a display; on Linux without one, run under xvfb-run.
+
+Run from the project root:
+    python benchmarks/bench_gui_startup.py [runs] [--top N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+IMPORT_GUI = "import tkinter; import gui.window_gui; import gui.window_logic"
+
+# Builds the real window and prints once it is mapped and idle, then exits
+INTERACTIVE = """
+import tkinter as tk
+from gui.window_gui import WindowGUI
+from gui.window_logic import WindowLogic
+root = tk.Tk()
+logic = WindowLogic(WindowGUI(root))
+def ready():
+    print("ready", flush=True)
+    logic.remove_hotkeys()
+    root.destroy()
+root.wait_visibility(root)
+root.after_idle(ready)
+root.mainloop()
+"""
+
+
+def import_times(top):
+    """Return the (cumulative_us, self_us, module) rows of -X importtime with the largest cumulative time."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_GUI],
+                            cwd=SRC, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def time_to_interactive(runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-c", INTERACTIVE], cwd=SRC,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        line = proc.stdout.readline()
+        elapsed = (time.perf_counter() - start) * 1000
+        proc.wait()
+        if line.strip() != "ready":
+            raise RuntimeError("GUI did not start; is a display available?")
+        times.append(elapsed)
+    times.sort()
+    return times[len(times) // 2], times[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GUI import time and time-to-interactive.')
+    parser.add_argument('runs', nargs='?', type=int, default=5, help='Launches to time (default: 5)')
+    parser.add_argument('--top', type=int, default=15, help='Number of imports to list (default: 15)')
+    args = parser.parse_args()
+
+    print(f"Slowest imports ({IMPORT_GUI}), indented by depth:")
+    print(f"  {'cumulative ms':>13}  {'self ms':>8}  module")
+    for cumulative_us, self_us, name in import_times(args.top):
+        print(f"  {cumulative_us / 1000:13.1f}  {self_us / 1000:8.1f}  {name}")
+    median, best = time_to_interactive(args.runs)
+    print(f"Time to interactive over {args.runs} runs: median {median:.1f} ms, min {best:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark for one poll of the click image action's template matching.
+
+Times PreparedTemplate.match on a synthetic 1920x1080 screenshot with the
+template already prepared (as it is between polls), with and without the
+image pyramid, and pyscreeze.locate on the same images when it is installed.
+
+Run from the project root:
+    python benchmarks/bench_image_match.py [polls]
+"""
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, 'src')
+from gui.image_match import PreparedTemplate
+
+
+def make_screen():
+    rng = np.random.default_rng(0)
+    blocks = np.kron(rng.uniform(0, 255, (135, 240)), np.ones((8, 8)))
+    return np.rint(blocks * 0.8 + rng.uniform(0, 51, blocks.shape))
+
+
+def time_per_poll(func, polls):
+    func()
+    start = time.perf_counter()
+    for _ in range(polls):
+        result = func()
+    return (time.perf_counter() - start) / polls * 1000, result
+
+
+def main():
+    polls = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    screen = make_screen()
+    template = screen[700:748, 1300:1364].copy()
+    print(f"1920x1080 screen, 64x48 template, {polls} polls")
+    for levels in (1, 3):
+        prepared = PreparedTemplate(template, levels=levels)
+        ms, found = time_per_poll(lambda: prepared.match(screen), polls)
+        print(f"  NCC, {levels} pyramid level(s): {ms:8.1f} ms/poll  found {found[:2]}")
+    try:
+        import pyscreeze
+        from PIL import Image
+    except ImportError:
+        print("  pyscreeze not installed; skipping")
+        return
+    screen_image = Image.fromarray(screen.astype(np.uint8))
+    template_image = Image.fromarray(template.astype(np.uint8))
+    ms, found = time_per_poll(lambda: pyscreeze.locate(template_image, screen_image), max(1, polls // 10))
+    print(f"  pyscreeze.locate:           {ms:8.1f} ms/poll  found {tuple(found)[:2] if found else None}")
+
+
+if __name__ == "__main__":
+    main()
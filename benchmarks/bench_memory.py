@@ -0,0 +1,59 @@
+"""
+Benchmark for the memory used per action and the cost of snapshotting.
+
+Compares a plain list of action dicts with ActionList's columnar storage,
+and times snapshot() against copying the dicts as start_clicking() used to.
+
+Run from the project root:
+    python benchmarks/bench_memory.py [action_count]
+"""
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, 'src')
+from gui.action_list import ActionList
+
+
+def make_action(i):
+    return {"x": i, "y": i * 2, "interval": 0.1 + i * 1e-6, "type": "click", "repeat": 1 + i % 3}
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    actions, dict_bytes = measure(lambda: [make_action(i) for i in range(count)])
+    action_list, column_bytes = measure(lambda: _columnar(count))
+    print(f"{count} actions")
+    print(f"  list of dicts:  {dict_bytes / count:7.1f} bytes/action")
+    print(f"  columnar:       {column_bytes / count:7.1f} bytes/action")
+
+    start = time.perf_counter()
+    copied = [dict(act) for act in actions]
+    copy_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    snapshot = action_list.snapshot()
+    snapshot_ms = (time.perf_counter() - start) * 1000
+    print(f"  copy dicts:     {copy_ms:9.3f} ms")
+    print(f"  snapshot():     {snapshot_ms:9.3f} ms")
+    start = time.perf_counter()
+    action_list.edit_action(0, "x", -1)
+    print(f"  first edit:     {(time.perf_counter() - start) * 1000:9.3f} ms (copies the columns)")
+    assert len(copied) == len(snapshot) == count
+
+
+def _columnar(count):
+    action_list = ActionList()
+    action_list.set_actions(make_action(i) for i in range(count))
+    return action_list
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark for the per-event overhead of the click loop.
+
+Compares the old loop, which re-parsed every action dict on every pass,
+with run_plan() over a precompiled ExecutionPlan. Actions are no-ops and
+intervals are zero, so only engine overhead is measured.
+
+Run from the project root:
+    python benchmarks/bench_plan.py
+"""
+import sys
+import time
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, 'src')
+from gui.run_status import RunStatus
+from gui.engine import compile_plan, run_plan
+
+
+class NullAction:
+    def __init__(self, backend=None):
+        pass
+
+    def execute(self, x, y, interval=0.1, repeat=1):
+        pass
+
+
+REGISTRY = {"click": NullAction}
+
+
+class NullLabel:
+    def config(self, **kwargs):
+        pass
+
+
+def make_logic():
+    logic = SimpleNamespace()
+    logic.is_clicking_event = threading.Event()
+    logic.is_clicking_event.set()
+    logic.is_waiting_event = threading.Event()
+    logic.status = RunStatus()
+    logic.gui = SimpleNamespace(label=NullLabel())
+    return logic
+
+
+def make_actions(count):
+    return [{"x": i, "y": i, "interval": 0, "type": "click", "repeat": 2} for i in range(count)]
+
+
+def legacy_loop(logic, actions, action_instances, passes):
+    """The pre-plan loop body, as previously duplicated in each strategy."""
+    for _ in range(passes):
+        for idx, act in enumerate(actions):
+            if not logic.is_clicking_event.is_set():
+                break
+            x = int(act["x"])
+            y = int(act["y"])
+            interval = float(act["interval"])
+            repeat = int(act.get("repeat", 1))
+            action_instance = action_instances[idx]
+            for r in range(repeat):
+                if not logic.is_clicking_event.is_set():
+                    break
+                action_instance.execute(x, y, interval=interval, repeat=1)
+                if logic.is_waiting_event.wait(interval):
+                    break
+                logic.gui.label.config(text=f"Running action {idx+1}/{len(actions)} (repeat {r+1}/{repeat}) at ({x},{y})")
+
+
+def bench(action_count=1000, passes=200):
+    actions = make_actions(action_count)
+    events = action_count * 2 * passes
+
+    instances = [REGISTRY[act["type"]]() for act in actions]
+    start = time.perf_counter_ns()
+    legacy_loop(make_logic(), actions, instances, passes)
+    legacy_ns = (time.perf_counter_ns() - start) / events
+
+    start = time.perf_counter_ns()
+    plan = compile_plan(actions, REGISTRY)
+    run_plan(make_logic(), plan, max_passes=passes)
+    plan_ns = (time.perf_counter_ns() - start) / events
+
+    return {"events": events, "legacy_ns_per_event": legacy_ns, "plan_ns_per_event": plan_ns}
+
+
+def main():
+    result = bench()
+    print(f"events:            {result['events']}")
+    print(f"legacy loop:       {result['legacy_ns_per_event']:.0f} ns/event")
+    print(f"compiled plan:     {result['plan_ns_per_event']:.0f} ns/event")
+    print(f"speedup:           {result['legacy_ns_per_event'] / result['plan_ns_per_event']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
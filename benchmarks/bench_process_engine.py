@@ -0,0 +1,84 @@
+"""
+Interval jitter of the in-process and out-of-process engines under GUI-like load.
+
+Runs a single click action at a fixed interval on a recording backend, once
+on a thread of this process and once in an EngineProcess, while the main
+thread keeps the GIL busy with pure-Python work (standing in for Tk redraws
+and Treeview refreshes). Reports interval error percentiles for both.
+
+Run from the project root:
+    python benchmarks/bench_process_engine.py --interval 0.001 --seconds 2
+"""
+import argparse
+import threading
+import time
+from array import array
+from types import SimpleNamespace
+
+from harness import run_mode, summarize
+from gui.cli import HeadlessLogic
+from gui.process_engine import EngineProcess
+from gui.run_config import RunConfig
+
+
+def busy(stop, work):
+    """Hold the GIL in short bursts until stop is set, like a busy GUI thread."""
+    while not stop.is_set():
+        sum(i * i for i in range(work))
+
+
+def with_load(run, work):
+    stop = threading.Event()
+    result = []
+    runner = threading.Thread(target=lambda: result.append(run()))
+    runner.start()
+    busy_until = threading.Thread(target=lambda: (runner.join(), stop.set()))
+    busy_until.start()
+    busy(stop, work)
+    busy_until.join()
+    return result[0]
+
+
+def run_process(engine, actions, seconds):
+    engine.status.reset()
+    engine.is_waiting_event.clear()
+    engine.is_clicking_event.set()
+    engine.run(RunConfig("indefinite"), actions=actions, backend="recording")
+    time.sleep(seconds)
+    stop_ns = time.perf_counter_ns()
+    engine.is_clicking_event.clear()
+    engine.is_waiting_event.set()
+    engine.wait_idle(10.0)
+    times = {"stop_ns": stop_ns, "exit_ns": time.perf_counter_ns()}
+    stamps = array("q")
+    stamps.frombytes(engine.results.get())
+    return SimpleNamespace(timestamps=stamps, count=len(stamps), dropped=0), times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare engine jitter in-process and in a child process.')
+    parser.add_argument('--interval', type=float, default=0.001, help='Action interval in seconds')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Run time per engine')
+    parser.add_argument('--work', type=int, default=20_000, help='Size of each busy-loop burst on the main thread')
+    args = parser.parse_args()
+
+    actions = [{"x": 100, "y": 100, "interval": args.interval, "type": "click", "repeat": 1}]
+    engine = EngineProcess()
+    engine.spawn()
+    try:
+        results = {
+            "thread": with_load(lambda: run_mode("indefinite", actions, args.seconds, logic=HeadlessLogic()), args.work),
+            "process": with_load(lambda: run_process(engine, actions, args.seconds), args.work),
+        }
+    finally:
+        engine.close()
+    for name, (backend, times) in results.items():
+        stats = summarize(backend, times, args.interval)
+        err = stats["interval_error_us"]
+        print(f"{name:8s} {stats['events_per_s']:10.1f} events/s  "
+              f"error p50 {err['p50']:8.1f} us  p99 {err['p99']:8.1f} us  max {err['max']:8.1f} us  "
+              f"stop {stats['stop_latency_ms']:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark for headless startup-to-first-click time.
+
+Launches the CLI on a one-action script in executions mode with the null
+backend and times each process from spawn to exit, which bounds the time
+to the first click from above. Also reports the CLI's import time alone.
+
+Run from the project root:
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+
+def time_command(args, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=SRC, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2], times[0]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+        f.write("x,y,interval,type,repeat\n100,100,0.001,click,1\n")
+        script = f.name
+    try:
+        baseline = time_command([sys.executable, "-c", "pass"], runs)
+        imports = time_command([sys.executable, "-c", "import gui.cli"], runs)
+        first_click = time_command([sys.executable, "-m", "gui.cli", script, "--mode", "executions",
+                                    "--executions", "1", "--stats-interval", "0", "--backend", "null"], runs)
+    finally:
+        os.unlink(script)
+    print(f"{runs} runs, median (min) ms")
+    print(f"  python -c pass:        {baseline[0]:7.1f} ({baseline[1]:.1f})")
+    print(f"  import gui.cli:        {imports[0]:7.1f} ({imports[1]:.1f})")
+    print(f"  launch to first click: {first_click[0]:7.1f} ({first_click[1]:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Headless benchmark harness for the run engine.
+
+Drives the click mode strategies without Tk or a real input device: the
+CLI's HeadlessLogic stands in for WindowLogic, and a RecordingBackend timestamps
+every emitted event so throughput, interval error and stop latency can be
+computed afterwards.
+"""
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+sys.path.insert(0, 'src')
+from gui.action_list import ACTIONS_REGISTRY
+from gui.cli import HeadlessLogic
+from gui.click_mode_strategy import get_click_mode_strategy
+from gui.engine import compile_plan
+from gui.input_backend import RecordingBackend
+from gui.run_config import RunConfig
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_mode(mode, actions, run_seconds=1.0, capacity=1_000_000, logic=None, duration=3600, executions=10**9,
+             profile=None):
+    """
+    Run the given mode on a worker thread for run_seconds, then stop it.
+    profile (e.g. a LowJitterProfile) is entered on the worker thread around the run.
+    Returns the recording backend and the stop request / engine exit times.
+    """
+    logic = logic or HeadlessLogic()
+    backend = RecordingBackend(capacity)
+    plan = compile_plan(actions, ACTIONS_REGISTRY, backend, cancel=logic.is_waiting_event)
+    strategy = get_click_mode_strategy(mode)
+    if not strategy.prepare(logic, RunConfig(mode, duration=duration, executions=executions)):
+        raise ValueError(f"Could not prepare mode {mode}")
+    times = {}
+
+    def worker():
+        with profile if profile is not None else nullcontext():
+            strategy.run(logic, plan)
+        times["exit_ns"] = time.perf_counter_ns()
+
+    logic.start_clicking()
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    time.sleep(run_seconds)
+    times["stop_ns"] = time.perf_counter_ns()
+    logic.stop_clicking()
+    thread.join()
+    return backend, times
+
+
+def summarize(backend, times, interval):
+    """
+    Compute events/s, absolute interval error percentiles (microseconds) and
+    stop latency (milliseconds) from a recorded run.
+    """
+    stamps = backend.timestamps[:backend.count]
+    interval_ns = int(interval * 1_000_000_000)
+    errors = sorted(abs((b - a) - interval_ns) for a, b in zip(stamps, stamps[1:]))
+    span = (stamps[-1] - stamps[0]) if len(stamps) > 1 else 0
+    return {
+        "events": backend.count,
+        "dropped": backend.dropped,
+        "events_per_s": (len(stamps) - 1) / (span / 1e9) if span else 0.0,
+        "interval_error_us": {
+            "p50": percentile(errors, 50) / 1000,
+            "p99": percentile(errors, 99) / 1000,
+            "max": (errors[-1] if errors else 0) / 1000,
+        },
+        "stop_latency_ms": (times["exit_ns"] - times["stop_ns"]) / 1e6,
+    }
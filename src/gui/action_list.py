@@ -1,81 +1,520 @@
 import csv
-import pyautogui
+import itertools
+import os
+import threading
 import time
+from array import array
+from .input_backend import get_default_backend
+from .binary_script import BinaryScript, is_binary_path, write_binary
 
 # --- Action base and registry ---
 class BaseAction:
     """
     Base class for all actions. Subclass and implement execute().
+    Actions emit their events through an InputBackend and flush it once per execute().
+    STEP_FIELDS names optional action fields passed to execute() as keyword arguments.
+    cancel is the run's cancellation token (a threading.Event, set by compile_plan);
+    actions that wait must do so through sleep() so Stop interrupts them.
     """
+    STEP_FIELDS = ()
+    # Seconds between check() calls for condition actions; None for unconditional actions
+    poll_interval = None
+    # Never set; used until compile_plan binds the run's token
+    cancel = threading.Event()
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else get_default_backend()
+
+    def sleep(self, seconds):
+        """Wait up to seconds; returns True (early) if the run was cancelled."""
+        return self.cancel.wait(seconds)
+
     def execute(self, x, y, interval=0.1, repeat=1):
         raise NotImplementedError("Action must implement execute()")
 
 class ClickAction(BaseAction):
     def execute(self, x, y, interval=0.1, repeat=1):
         for _ in range(repeat):
-            pyautogui.click(x, y)
+            self.backend.click(x, y)
+        self.backend.flush()
 
 class DoubleClickAction(BaseAction):
     def execute(self, x, y, interval=0.1, repeat=1):
         for _ in range(repeat):
-            pyautogui.doubleClick(x, y)
+            self.backend.double_click(x, y)
+        self.backend.flush()
 
 # Press and Hold Action (left button only for now)
 class PressAndHoldAction(BaseAction):
+    STEP_FIELDS = ("duration",)
+
     def execute(self, x, y, interval=0.1, repeat=1, duration=0.1):
         for _ in range(repeat):
-            pyautogui.mouseDown(x, y, button='left')
-            time.sleep(duration)
-            pyautogui.mouseUp(x, y, button='left')
+            self.backend.mouse_down(x, y, button='left')
+            self.backend.flush()
+            try:
+                cancelled = self.sleep(duration)
+            finally:
+                # Release even when cancelled or interrupted, so the button is never left held
+                self.backend.mouse_up(x, y, button='left')
+                self.backend.flush()
+            if cancelled:
+                return
+
+class MoveAction(BaseAction):
+    def execute(self, x, y, interval=0.1, repeat=1):
+        self.backend.move(x, y)
+        self.backend.flush()
+
+class ConditionAction(BaseAction):
+    """
+    Base class for actions guarded by a screen condition. The engine calls
+    check() every poll_interval seconds (or the action's own poll field, when
+    set) through its scheduler until it passes
+    or the action's duration runs out (0 checks once), and calls execute()
+    only if it passed. The template field holds the condition's spec.
+    Pixel conditions read the screen through a FrameCache shared by all
+    condition actions, so the ones checked in the same tick share one capture.
+    Requires numpy.
+    """
+    STEP_FIELDS = ("template", "duration")
+    poll_interval = 0.05
+
+    def __init__(self, backend=None, frames=None, poll_interval=None):
+        super().__init__(backend)
+        self._frames = frames
+        if poll_interval is not None:
+            self.poll_interval = poll_interval
+
+    @property
+    def frames(self):
+        if self._frames is None:
+            from .screen_cache import get_default_frame_cache
+            self._frames = get_default_frame_cache()
+        return self._frames
+
+    def check(self, x, y, template=None, duration=0.0):
+        raise NotImplementedError("Condition action must implement check()")
+
+class ImageClickAction(ConditionAction):
+    """
+    Waits for an image template to appear on screen, then clicks its centre
+    offset by (x, y). The action's template field is a spec understood by
+    image_match.parse_template_spec. Prepared templates are cached for the
+    life of the action.
+    """
+    def __init__(self, backend=None, screen=None, threshold=None, poll_interval=None):
+        super().__init__(backend, poll_interval=poll_interval)
+        # Callable taking a region (or None) and returning a grayscale array
+        self.screen = screen
+        self.threshold = threshold
+        self._templates = {}
+        # Match position found by the last passing check, per template
+        self._found = {}
+
+    def _prepare(self, spec):
+        prepared = self._templates.get(spec)
+        if prepared is None:
+            from .image_match import PreparedTemplate, parse_template_spec
+            path, region = parse_template_spec(spec)
+            prepared = self._templates[spec] = (PreparedTemplate.from_file(path), region)
+        return prepared
+
+    def locate(self, template):
+        """Return the screen position of the template's centre, or None."""
+        if not template:
+            raise ValueError("Click image actions need a template.")
+        from .image_match import grab_screen, DEFAULT_THRESHOLD
+        prepared, region = self._prepare(template)
+        image = (self.screen or grab_screen)(region)
+        found = prepared.match(image, self.threshold or DEFAULT_THRESHOLD)
+        if found is None:
+            return None
+        left, top, _ = found
+        if region is not None:
+            left += region[0]
+            top += region[1]
+        return left + prepared.width // 2, top + prepared.height // 2
+
+    def check(self, x, y, template=None, duration=0.0):
+        found = self.locate(template)
+        if found is None:
+            return False
+        self._found[template] = found
+        return True
+
+    def execute(self, x, y, interval=0.1, repeat=1, template=None, duration=0.0):
+        found = self._found.pop(template, None) or self.locate(template)
+        if found is None:
+            return
+        for _ in range(repeat):
+            self.backend.click(found[0] + x, found[1] + y)
+        self.backend.flush()
+
+class PixelConditionAction(ConditionAction):
+    """
+    Passes when every pixel probe in the template field matches its colour
+    (see screen_cache.PixelProbes). All probes of a step are read from one
+    capture of their bounding rectangle.
+    """
+    def __init__(self, backend=None, frames=None, poll_interval=None):
+        super().__init__(backend, frames, poll_interval)
+        self._probes = {}
+        # The frame cache holds watches weakly; keeping them here keeps the
+        # probed regions in its shared capture
+        self._watches = {}
+
+    def probes(self, x, y, spec):
+        key = (spec, x, y)
+        probes = self._probes.get(key)
+        if probes is None:
+            if not spec:
+                raise ValueError("Pixel actions need a probe spec.")
+            from .screen_cache import PixelProbes
+            probes = self._probes[key] = PixelProbes.parse(spec, x, y)
+            self._watches[key] = self.frames.watch(probes.region)
+        return probes
+
+    def check(self, x, y, template=None, duration=0.0):
+        probes = self.probes(x, y, template)
+        return probes.matches(self.frames.grab(probes.region))
+
+class WaitForPixelAction(PixelConditionAction):
+    """Only waits for the pixel condition; emits no input."""
+    def execute(self, x, y, interval=0.1, repeat=1, template=None, duration=0.0):
+        pass
+
+class ClickWhenPixelAction(PixelConditionAction):
+    """Clicks at (x, y) once the pixel condition holds; skipped if it times out."""
+    def execute(self, x, y, interval=0.1, repeat=1, template=None, duration=0.0):
+        for _ in range(repeat):
+            self.backend.click(x, y)
+        self.backend.flush()
+
+class ClickWhenChangedAction(ConditionAction):
+    """
+    Clicks at (x, y) only if the region in the template field
+    ("left,top,width,height") changed since this action last looked at it.
+    The first check only records the region.
+    """
+    def __init__(self, backend=None, frames=None, poll_interval=None):
+        super().__init__(backend, frames, poll_interval)
+        self._watches = {}
+
+    def check(self, x, y, template=None, duration=0.0):
+        watch = self._watches.get(template)
+        if watch is None:
+            try:
+                region = tuple(int(v) for v in (template or "").split(","))
+            except ValueError:
+                region = ()
+            if len(region) != 4 or region[2] <= 0 or region[3] <= 0:
+                raise ValueError(f"Invalid region: {template}")
+            watch = self._watches[template] = self.frames.watch(region)
+        self.frames.grab(watch.region)
+        return watch.take_changed()
+
+    def execute(self, x, y, interval=0.1, repeat=1, template=None, duration=0.0):
+        for _ in range(repeat):
+            self.backend.click(x, y)
+        self.backend.flush()
 
 # Central registry of actions (all keys lowercase)
 ACTIONS_REGISTRY = {
     "click": ClickAction,
     "double click": DoubleClickAction,
     "press and hold": PressAndHoldAction,
+    "move": MoveAction,
+    "click image": ImageClickAction,
+    "wait for pixel": WaitForPixelAction,
+    "click when pixel": ClickWhenPixelAction,
+    "click when changed": ClickWhenChangedAction,
     # Add new actions here
 }
 
+CSV_FIELDS = ["x", "y", "interval", "type", "repeat", "duration", "template", "track", "poll"]
+
+# Highest track number; tracks are stored in 16 bits
+MAX_TRACK = 0xFFFF
+
+# Script files larger than this are streamed during runs instead of loaded into memory
+STREAMING_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+# Change events passed to ActionList listeners
+ACTION_INSERTED = "insert"
+ACTION_DELETED = "delete"
+ACTION_UPDATED = "update"
+ACTION_MOVED = "move"
+ACTIONS_RESET = "reset"
+
+# --- Columnar action storage ---
+# Field name -> array typecode. Each action takes 44 bytes across the columns.
+ACTION_FIELDS = (("x", "i"), ("y", "i"), ("interval", "d"), ("repeat", "i"), ("type", "H"), ("duration", "d"),
+                 ("template", "I"), ("track", "H"), ("poll", "d"))
+
+
+class ActionColumns:
+    """
+    Actions stored as one typed array per field, with type names interned
+    into small integer ids (the ACTIONS_REGISTRY keys come first) and
+    templates interned the same way (id 0 means no template).
+    """
+    __slots__ = ("x", "y", "interval", "repeat", "type", "duration", "template", "track", "poll",
+                 "type_names", "_type_ids", "templates", "_template_ids")
+
+    def __init__(self, type_names=None, templates=None):
+        for name, typecode in ACTION_FIELDS:
+            setattr(self, name, array(typecode))
+        self.type_names = list(type_names if type_names is not None else ACTIONS_REGISTRY)
+        self._type_ids = {name: i for i, name in enumerate(self.type_names)}
+        self.templates = list(templates if templates is not None else [""])
+        self._template_ids = {name: i for i, name in enumerate(self.templates)}
+
+    def __len__(self):
+        return len(self.x)
+
+    def copy(self):
+        other = ActionColumns(self.type_names, self.templates)
+        for name, _ in ACTION_FIELDS:
+            setattr(other, name, array(getattr(self, name).typecode, getattr(self, name)))
+        return other
+
+    def type_id(self, type_name):
+        type_name = str(type_name).lower()
+        type_id = self._type_ids.get(type_name)
+        if type_id is None:
+            type_id = self._type_ids[type_name] = len(self.type_names)
+            self.type_names.append(type_name)
+        return type_id
+
+    def template_id(self, template):
+        template = str(template or "")
+        template_id = self._template_ids.get(template)
+        if template_id is None:
+            template_id = self._template_ids[template] = len(self.templates)
+            self.templates.append(template)
+        return template_id
+
+    def _row(self, action):
+        return (int(action["x"]), int(action["y"]), float(action["interval"]),
+                int(action.get("repeat", 1)), self.type_id(action.get("type", "click")),
+                float(action.get("duration", 0.0)), self.template_id(action.get("template")),
+                int(action.get("track") or 0), float(action.get("poll") or 0.0))
+
+    def append(self, action):
+        self.insert(len(self.x), action)
+
+    def insert(self, idx, action):
+        row = self._row(action)
+        for (name, _), value in zip(ACTION_FIELDS, row):
+            getattr(self, name).insert(idx, value)
+
+    def pop(self, idx):
+        for name, _ in ACTION_FIELDS:
+            getattr(self, name).pop(idx)
+
+    def swap(self, i, j):
+        for name, _ in ACTION_FIELDS:
+            column = getattr(self, name)
+            column[i], column[j] = column[j], column[i]
+
+    def set(self, idx, field, value):
+        if field == "type":
+            value = self.type_id(value)
+        elif field == "template":
+            value = self.template_id(value)
+        getattr(self, field)[idx] = value
+
+    def get(self, idx):
+        action = {
+            "x": self.x[idx],
+            "y": self.y[idx],
+            "interval": self.interval[idx],
+            "type": self.type_names[self.type[idx]],
+            "repeat": self.repeat[idx],
+        }
+        if self.duration[idx]:
+            action["duration"] = self.duration[idx]
+        if self.template[idx]:
+            action["template"] = self.templates[self.template[idx]]
+        if self.track[idx]:
+            action["track"] = self.track[idx]
+        if self.poll[idx]:
+            action["poll"] = self.poll[idx]
+        return action
+
+
+class ActionSnapshot:
+    """
+    Read-only view of an ActionList taken by ActionList.snapshot(). It shares
+    the list's arrays until the list is next modified, which copies them first.
+    """
+    __slots__ = ("_columns",)
+
+    def __init__(self, columns):
+        self._columns = columns
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __getitem__(self, idx):
+        return self._columns.get(idx)
+
+    def __iter__(self):
+        get = self._columns.get
+        return (get(i) for i in range(len(self._columns)))
+
+
 # --- ActionList for managing action data ---
 class ActionList:
     """
     Encapsulates management of the list of actions for the Auto Clicker GUI tool.
     Handles add, remove, move, edit, validate, load, and save operations.
+    Actions are kept in ActionColumns and returned as dicts.
+    Files are read and written as CSV or, for the .acb extension, as binary scripts.
+    Listeners are called as listener(event, index, new_index) after every change.
     """
     def __init__(self, default_action=None):
-        self._actions = []
+        self._columns = ActionColumns()
+        # True while a snapshot shares self._columns (copy before writing)
+        self._shared = False
+        self._listeners = []
+        # File the actions are streamed from instead of being held in memory
+        self.stream_path = None
+        self.stream_count = 0
+        self._stream_script = None
+        # Whether the streamed script sets a track or poll interval on any action
+        self._stream_wide = False
         if default_action:
-            self._actions.append(default_action)
+            self._columns.append(default_action)
+
+    def __len__(self):
+        return self.stream_count if self.stream_path else len(self._columns)
+
+    @property
+    def random_access(self):
+        """False while streaming a CSV file, where get_action() has to scan the file."""
+        return not self.stream_path or self._stream_script is not None
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, event, index=None, new_index=None):
+        for listener in self._listeners:
+            listener(event, index, new_index)
+
+    def _writable(self):
+        if self._shared:
+            self._columns = self._columns.copy()
+            self._shared = False
+        return self._columns
+
+    def _replace(self, columns):
+        self._clear_stream()
+        self._columns = columns
+        self._shared = False
+        self._notify(ACTIONS_RESET)
+
+    def _clear_stream(self):
+        was_streaming = bool(self.stream_path)
+        if self._stream_script is not None:
+            self._stream_script.close()
+            self._stream_script = None
+        self.stream_path = None
+        self.stream_count = 0
+        self._stream_wide = False
+        return was_streaming
+
+    def snapshot(self):
+        """
+        Return a consistent, read-only ActionSnapshot in O(1). Later edits copy
+        the storage once instead of changing what the snapshot sees.
+        """
+        self._shared = True
+        return ActionSnapshot(self._columns)
 
     def add_action(self, action=None):
         if action is None:
             action = {"x": 0, "y": 0, "interval": 0.1, "type": "click", "repeat": 1}
-        self._actions.append(action)
+        if self._clear_stream():
+            columns = ActionColumns()
+            columns.append(action)
+            self._replace(columns)
+            return
+        self._writable().append(action)
+        self._notify(ACTION_INSERTED, len(self._columns) - 1)
 
     def remove_action(self, idx):
-        if 0 <= idx < len(self._actions):
-            del self._actions[idx]
+        if 0 <= idx < len(self._columns):
+            self._writable().pop(idx)
+            self._notify(ACTION_DELETED, idx)
 
     def move_action_up(self, idx):
-        if 0 < idx < len(self._actions):
-            self._actions[idx-1], self._actions[idx] = self._actions[idx], self._actions[idx-1]
+        if 0 < idx < len(self._columns):
+            self._writable().swap(idx-1, idx)
+            self._notify(ACTION_MOVED, idx, idx-1)
 
     def move_action_down(self, idx):
-        if 0 <= idx < len(self._actions)-1:
-            self._actions[idx+1], self._actions[idx] = self._actions[idx], self._actions[idx+1]
+        if 0 <= idx < len(self._columns)-1:
+            self._writable().swap(idx, idx+1)
+            self._notify(ACTION_MOVED, idx, idx+1)
 
     def edit_action(self, idx, col_name, value):
-        if 0 <= idx < len(self._actions):
-            self._actions[idx][col_name] = value
+        """
+        Set one field of an action. Raises ValueError if the value does not fit the field.
+        """
+        if 0 <= idx < len(self._columns):
+            try:
+                self._writable().set(idx, col_name, value)
+            except (OverflowError, TypeError) as e:
+                raise ValueError(f"Invalid value for {col_name}: {value}") from e
+            self._notify(ACTION_UPDATED, idx)
 
     def get_actions(self):
-        return self._actions
+        """
+        Return the in-memory actions as a new list of dicts.
+        """
+        return list(ActionSnapshot(self._columns))
+
+    def get_action(self, idx):
+        """
+        Return the action at idx. O(1) for in-memory and streamed binary scripts.
+        """
+        if self._stream_script is not None:
+            return self._stream_script[idx]
+        if self.stream_path:
+            return next(itertools.islice(self.iter_csv(self.stream_path), idx, None))
+        return self._columns.get(idx)
 
     def set_actions(self, actions):
-        self._actions = actions
+        self._replace(self._columns_from(actions))
+
+    def _columns_from(self, actions):
+        columns = ActionColumns()
+        for action in actions:
+            columns.append(action)
+        return columns
+
+    def iter_actions(self):
+        """
+        Iterate over the current actions, reading them from the stream file if one is set.
+        """
+        if self.stream_path:
+            return self.iter_file(self.stream_path)
+        return iter(ActionSnapshot(self._columns))
+
+    def needs_wide_records(self):
+        """Whether any action sets a track or a poll interval, which binary scripts keep in wide records."""
+        if self.stream_path:
+            return self._stream_wide
+        return any(self._columns.track) or any(self._columns.poll)
 
     def validate_actions(self):
-        return all(self.validate_action(act) for act in self._actions)
+        columns = self._columns
+        return all(v > 0 for v in columns.interval) and all(r >= 1 for r in columns.repeat)
 
     def validate_action(self, action):
         try:
@@ -83,40 +522,137 @@ class ActionList:
             y = int(action["y"])
             interval = float(action["interval"])
             repeat = int(action.get("repeat", 1))
-            if interval <= 0 or repeat < 1:
+            duration = float(action.get("duration") or 0)
+            track = int(action.get("track") or 0)
+            poll = float(action.get("poll") or 0)
+            if interval <= 0 or repeat < 1 or duration < 0 or not 0 <= track <= MAX_TRACK or poll < 0:
                 return False
             return True
         except Exception:
             return False
 
+    def iter_csv(self, file_path):
+        """
+        Yield validated actions from a CSV file one row at a time.
+        Raises ValueError naming the first invalid row (the header is row 1).
+        """
+        with open(file_path, "r", newline="") as f:
+            reader = csv.DictReader(f)
+            for row_num, row in enumerate(reader, start=2):
+                if not self.validate_action(row):
+                    raise ValueError(f"Invalid action in CSV at row {row_num}.")
+                action = {
+                    "x": int(row["x"]),
+                    "y": int(row["y"]),
+                    "interval": float(row["interval"]),
+                    "type": row["type"].lower(),
+                    "repeat": int(row["repeat"])
+                }
+                # Optional columns; older files do not have them
+                if row.get("duration"):
+                    action["duration"] = float(row["duration"])
+                if row.get("template"):
+                    action["template"] = row["template"]
+                if row.get("track") and int(row["track"]):
+                    action["track"] = int(row["track"])
+                if row.get("poll") and float(row["poll"]):
+                    action["poll"] = float(row["poll"])
+                yield action
+
+    def iter_file(self, file_path):
+        """
+        Yield validated actions from a CSV or binary script, chosen by extension.
+        """
+        if not is_binary_path(file_path):
+            yield from self.iter_csv(file_path)
+            return
+        script = BinaryScript(file_path)
+        try:
+            yield from script
+        finally:
+            script.close()
+
+    def load_from_file(self, file_path):
+        """
+        Load all actions from a CSV or binary script. Returns (action_count, error).
+        """
+        if not is_binary_path(file_path):
+            return self.load_from_csv(file_path)
+        try:
+            columns = self._columns_from(self.iter_file(file_path))
+            self._replace(columns)
+            return len(columns), None
+        except Exception as e:
+            return None, str(e)
+
     def load_from_csv(self, file_path):
-        actions = []
         try:
-            with open(file_path, "r", newline="") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if self.validate_action(row):
-                        actions.append({
-                            "x": int(row["x"]),
-                            "y": int(row["y"]),
-                            "interval": float(row["interval"]),
-                            "type": row["type"].lower(),
-                            "repeat": int(row["repeat"])
-                        })
-                    else:
-                        return None, f"Invalid action in CSV."
-            self._actions = actions
-            return actions, None
+            columns = self._columns_from(self.iter_csv(file_path))
+            self._replace(columns)
+            return len(columns), None
+        except Exception as e:
+            return None, str(e)
+
+    def stream_from_file(self, file_path):
+        """
+        Stream actions from a file on every run instead of keeping them in memory.
+        CSV files are validated up front; binary scripts are only mapped, so opening
+        them is instant and their records are validated as they are read.
+        Returns (action_count, error).
+        """
+        try:
+            if is_binary_path(file_path):
+                script = BinaryScript(file_path)
+                count = len(script)
+                wide = script.wide
+            else:
+                script = None
+                count = 0
+                wide = False
+                for action in self.iter_csv(file_path):
+                    count += 1
+                    wide = wide or "track" in action or "poll" in action
+            self._clear_stream()
+            self.stream_path = file_path
+            self.stream_count = count
+            self._stream_script = script
+            self._stream_wide = wide
+            self._columns = ActionColumns()
+            self._shared = False
+            self._notify(ACTIONS_RESET)
+            return count, None
         except Exception as e:
             return None, str(e)
 
+    def save_to_file(self, file_path):
+        if not is_binary_path(file_path):
+            return self.save_to_csv(file_path)
+        if self._is_stream_path(file_path):
+            return "Cannot overwrite the file actions are streamed from."
+        try:
+            write_binary(file_path, self.iter_actions(), wide=self.needs_wide_records())
+            return None
+        except Exception as e:
+            return str(e)
+
     def save_to_csv(self, file_path):
+        if self._is_stream_path(file_path):
+            return "Cannot overwrite the file actions are streamed from."
+        return self.write_csv(file_path, self.iter_actions())
+
+    def write_csv(self, file_path, actions):
+        """
+        Write an iterable of actions to a CSV file. Returns an error string or None.
+        """
         try:
             with open(file_path, "w", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=["x", "y", "interval", "type", "repeat"])
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
                 writer.writeheader()
-                for action in self._actions:
+                for action in actions:
                     writer.writerow(action)
             return None
         except Exception as e:
             return str(e)
+
+    def _is_stream_path(self, file_path):
+        return bool(self.stream_path) and os.path.abspath(file_path) == os.path.abspath(self.stream_path)
@@ -0,0 +1,173 @@
+"""
+Incremental view of an ActionList in a ttk.Treeview.
+Applies ActionList change events one row at a time instead of rebuilding the
+table. Lists longer than the virtual threshold are shown through a fixed pool
+of rows that is refilled on scroll, so the cost of any interaction does not
+depend on the list size.
+"""
+from .action_list import ACTION_INSERTED, ACTION_DELETED, ACTION_UPDATED, ACTION_MOVED
+
+COLUMNS = ("x", "y", "interval", "type", "repeat", "track")
+
+# Lists longer than this are rendered virtually
+VIRTUAL_THRESHOLD = 2000
+
+
+def _row_values(action):
+    return (action["x"], action["y"], action["interval"], action["type"], action["repeat"], action.get("track", 0))
+
+
+class ActionTableView:
+    """
+    Keeps a Treeview (and its vertical scrollbar) in sync with an ActionList.
+    Use selected_index(), select() and index_of() instead of Treeview item ids.
+    """
+    def __init__(self, tree, scrollbar, action_list, virtual_threshold=VIRTUAL_THRESHOLD, page_size=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.action_list = action_list
+        self.virtual_threshold = virtual_threshold
+        self.page_size = page_size or int(tree.cget("height"))
+        self.virtual = False
+        self.offset = 0
+        self._iids = []
+        self._selected = None
+        scrollbar.config(command=self._on_scrollbar)
+        tree.config(yscrollcommand=self._on_tree_yscroll)
+        tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        tree.bind("<MouseWheel>", self._on_mousewheel, add="+")
+        tree.bind("<Button-4>", lambda e: self._scroll_virtual(-1), add="+")
+        tree.bind("<Button-5>", lambda e: self._scroll_virtual(1), add="+")
+        action_list.add_listener(self.on_change)
+        self.reset()
+
+    def _count(self):
+        return len(self.action_list) if self.action_list.random_access else 0
+
+    # --- change events ---
+    def on_change(self, event, index=None, new_index=None):
+        if event not in (ACTION_INSERTED, ACTION_DELETED, ACTION_UPDATED, ACTION_MOVED) \
+                or self.virtual != (self._count() > self.virtual_threshold):
+            self.reset()
+            return
+        if self.virtual:
+            self._shift_selection(event, index, new_index)
+            self._render_virtual()
+            return
+        tree = self.tree
+        if event == ACTION_INSERTED:
+            iid = tree.insert("", index, values=_row_values(self.action_list.get_action(index)))
+            self._iids.insert(index, iid)
+        elif event == ACTION_DELETED:
+            tree.delete(self._iids.pop(index))
+        elif event == ACTION_UPDATED:
+            tree.item(self._iids[index], values=_row_values(self.action_list.get_action(index)))
+        elif event == ACTION_MOVED:
+            iid = self._iids.pop(index)
+            self._iids.insert(new_index, iid)
+            tree.move(iid, "", new_index)
+
+    def _shift_selection(self, event, index, new_index):
+        selected = self._selected
+        if selected is None:
+            return
+        if event == ACTION_INSERTED and selected >= index:
+            self._selected = selected + 1
+        elif event == ACTION_DELETED:
+            self._selected = None if selected == index else selected - (selected > index)
+        elif event == ACTION_MOVED and selected in (index, new_index):
+            self._selected = new_index if selected == index else index
+
+    def reset(self):
+        """Rebuild the table, choosing normal or virtual rendering by list size."""
+        tree = self.tree
+        tree.delete(*tree.get_children())
+        self._iids = []
+        self._selected = None
+        self.offset = 0
+        count = self._count()
+        self.virtual = count > self.virtual_threshold
+        if self.virtual:
+            for i in range(self.page_size):
+                tree.insert("", "end", iid=f"v{i}", values=())
+            self._render_virtual()
+        else:
+            get_action = self.action_list.get_action
+            self._iids = [tree.insert("", "end", values=_row_values(get_action(i))) for i in range(count)]
+
+    # --- virtual rendering ---
+    def _render_virtual(self):
+        count = self._count()
+        self.offset = max(0, min(self.offset, count - self.page_size))
+        get_action = self.action_list.get_action
+        for i in range(self.page_size):
+            idx = self.offset + i
+            self.tree.item(f"v{i}", values=_row_values(get_action(idx)) if idx < count else ())
+        if self._selected is not None and self.offset <= self._selected < self.offset + self.page_size:
+            self.tree.selection_set(f"v{self._selected - self.offset}")
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        if count:
+            self.scrollbar.set(self.offset / count, min(1.0, (self.offset + self.page_size) / count))
+
+    def _scroll_virtual(self, rows):
+        if self.virtual:
+            self.offset += rows
+            self._render_virtual()
+
+    def _on_scrollbar(self, *args):
+        if not self.virtual:
+            self.tree.yview(*args)
+            return
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self._count())
+        elif args[0] == "scroll":
+            step = self.page_size if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self._render_virtual()
+
+    def _on_tree_yscroll(self, first, last):
+        if not self.virtual:
+            self.scrollbar.set(first, last)
+
+    def _on_mousewheel(self, event):
+        self._scroll_virtual(-1 if event.delta > 0 else 1)
+
+    def _on_select(self, event=None):
+        sel = self.tree.selection()
+        if self.virtual and sel:
+            self._selected = self.offset + int(sel[0][1:])
+
+    # --- selection ---
+    def index_of(self, iid):
+        """Return the action index shown in the given Treeview row."""
+        if self.virtual:
+            return self.offset + int(iid[1:])
+        return self.tree.index(iid)
+
+    def row_id(self, idx):
+        """Return the Treeview row showing action idx, or None if it is not rendered."""
+        if self.virtual:
+            if self.offset <= idx < self.offset + self.page_size:
+                return f"v{idx - self.offset}"
+            return None
+        return self._iids[idx] if 0 <= idx < len(self._iids) else None
+
+    def selected_index(self):
+        if self.virtual:
+            return self._selected
+        sel = self.tree.selection()
+        return self.tree.index(sel[0]) if sel else None
+
+    def select(self, idx):
+        """Select action idx, scrolling it into view."""
+        if not 0 <= idx < self._count():
+            return
+        if self.virtual:
+            self._selected = idx
+            if not self.offset <= idx < self.offset + self.page_size:
+                self.offset = idx - self.page_size // 2
+            self._render_virtual()
+            return
+        self.tree.selection_set(self._iids[idx])
+        self.tree.see(self._iids[idx])
@@ -0,0 +1,207 @@
+"""
+Compact binary action-script format (.acb) read through mmap.
+
+Layout (little endian):
+    header      32 bytes: magic b"ACB1", u32 record size, u64 record count,
+                u64 type table offset, u32 type table size, padding
+    records     fixed 32-byte records: i32 x, i32 y, f64 interval, u32 repeat,
+                u32 type id, f64 duration
+                or, for scripts with tracks or poll intervals, 48-byte wide
+                records adding u32 track, f64 poll interval and 4 bytes of
+                padding (the header's record size tells which)
+    type table  strings as UTF-8 joined by "\\n"
+
+The low 16 bits of a type id index the action type name in the type table.
+The high 16 bits are 0, or 1 + the index of the action's template there.
+
+Opening a script only maps the file, so it is effectively instant and
+zero-copy, and any record can be read in O(1) by index.
+
+Convert between formats from the src directory:
+    python -m gui.binary_script actions.csv actions.acb
+    python -m gui.binary_script actions.acb actions.csv
+"""
+import mmap
+import struct
+
+BINARY_EXTENSION = ".acb"
+MAGIC = b"ACB1"
+HEADER = struct.Struct("<4sIQQI4x")
+RECORD = struct.Struct("<iidIId")
+WIDE_RECORD = struct.Struct("<iidIIdId4x")
+TYPE_MASK = 0xFFFF
+
+
+def is_binary_path(file_path):
+    return str(file_path).lower().endswith(BINARY_EXTENSION)
+
+
+def write_binary(file_path, actions, wide=False):
+    """
+    Write an iterable of action dicts as a binary script without holding them
+    all in memory. wide selects the record layout with track and poll fields;
+    without it, an action with a track or poll interval raises ValueError.
+    Returns the number of records written.
+    """
+    record = WIDE_RECORD if wide else RECORD
+    type_ids = {}
+    records = bytearray()
+    count = 0
+    with open(file_path, "wb") as f:
+        f.write(bytes(HEADER.size))
+        for act in actions:
+            action_type = act.get("type", "click").lower()
+            type_id = type_ids.setdefault(action_type, len(type_ids))
+            template = act.get("template")
+            if template:
+                type_id |= (type_ids.setdefault(template, len(type_ids)) + 1) << 16
+            if len(type_ids) > TYPE_MASK:
+                raise ValueError("Too many distinct action types and templates for a binary script.")
+            fields = (int(act["x"]), int(act["y"]), float(act["interval"]), int(act.get("repeat", 1)), type_id,
+                      float(act.get("duration", 0.0)))
+            track = int(act.get("track") or 0)
+            poll = float(act.get("poll") or 0.0)
+            if wide:
+                records += record.pack(*fields, track, poll)
+            elif track or poll:
+                raise ValueError(f"Action {count} sets a track or poll interval; write the script with wide records.")
+            else:
+                records += record.pack(*fields)
+            count += 1
+            if len(records) >= 1 << 20:
+                f.write(records)
+                records.clear()
+        f.write(records)
+        type_table = "\n".join(type_ids).encode("utf-8")
+        table_offset = f.tell()
+        f.write(type_table)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, record.size, count, table_offset, len(type_table)))
+    return count
+
+
+class BinaryScript:
+    """
+    Read-only, memory-mapped view of a binary script.
+    Indexing returns action dicts; iteration validates records as it goes.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, "rb") as f:
+            size = f.seek(0, 2)
+            if size < HEADER.size:
+                raise ValueError("File is too short to be a binary action script.")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, count, table_offset, table_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or record_size not in (RECORD.size, WIDE_RECORD.size):
+            self.close()
+            raise ValueError("Not a binary action script.")
+        self._record = WIDE_RECORD if record_size == WIDE_RECORD.size else RECORD
+        self.wide = self._record is WIDE_RECORD
+        self._offset = HEADER.size
+        if table_offset < self._offset + count * record_size or table_offset + table_size > size:
+            self.close()
+            raise ValueError("Binary action script is truncated.")
+        table = bytes(self._mmap[table_offset:table_offset + table_size]).decode("utf-8")
+        self.types = table.split("\n") if table else []
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def record(self, idx):
+        """Return the raw (x, y, interval, repeat, type_id, duration[, track, poll]) tuple at idx."""
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("Action index out of range.")
+        return self._record.unpack_from(self._mmap, self._offset + idx * self._record.size)
+
+    def _to_action(self, idx, rec):
+        x, y, interval, repeat, type_id, duration = rec[:6]
+        template_id = type_id >> 16
+        type_id &= TYPE_MASK
+        if interval <= 0 or repeat < 1 or type_id >= len(self.types) or template_id > len(self.types):
+            raise ValueError(f"Invalid action in binary script at index {idx}.")
+        action = {"x": x, "y": y, "interval": interval, "type": self.types[type_id], "repeat": repeat}
+        if duration:
+            action["duration"] = duration
+        if template_id:
+            action["template"] = self.types[template_id - 1]
+        if len(rec) > 6:
+            track, poll = rec[6:]
+            if track > TYPE_MASK or poll < 0:
+                raise ValueError(f"Invalid action in binary script at index {idx}.")
+            if track:
+                action["track"] = track
+            if poll:
+                action["poll"] = poll
+        return action
+
+    def __getitem__(self, idx):
+        return self._to_action(idx, self.record(idx))
+
+    def iter_actions(self, start=0):
+        """Yield action dicts from index start onwards."""
+        size = self._record.size
+        view = memoryview(self._mmap)[self._offset + start * size:self._offset + self._count * size]
+        try:
+            for idx, rec in enumerate(self._record.iter_unpack(view), start=start):
+                yield self._to_action(idx, rec)
+        finally:
+            view.release()
+
+    def __iter__(self):
+        return self.iter_actions()
+
+    def close(self):
+        self._mmap.close()
+
+
+def convert(src_path, dst_path):
+    """
+    Convert a script between CSV and binary, choosing each format by extension.
+    Returns the number of actions converted.
+    """
+    from .action_list import ActionList
+    action_list = ActionList()
+    script = BinaryScript(src_path) if is_binary_path(src_path) else None
+    count = 0
+
+    def counted(actions):
+        nonlocal count
+        for act in actions:
+            count += 1
+            yield act
+
+    try:
+        actions = counted(script if script is not None else action_list.iter_csv(src_path))
+        if is_binary_path(dst_path):
+            if script is not None:
+                wide = script.wide
+            else:
+                # One extra pass over the CSV to pick the record layout
+                wide = any("track" in act or "poll" in act for act in action_list.iter_csv(src_path))
+            write_binary(dst_path, actions, wide=wide)
+        else:
+            error = action_list.write_csv(dst_path, actions)
+            if error:
+                raise ValueError(error)
+    finally:
+        if script is not None:
+            script.close()
+    return count
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Convert action scripts between CSV and binary (.acb).')
+    parser.add_argument('source', help='Input script')
+    parser.add_argument('destination', help='Output script')
+    args = parser.parse_args()
+    count = convert(args.source, args.destination)
+    print(f'Converted {count} actions to {args.destination}')
+
+
+if __name__ == '__main__':
+    main()
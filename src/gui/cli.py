@@ -0,0 +1,245 @@
+"""
+Headless command-line runner for saved action scripts.
+Loads a CSV or binary script and runs it through the same strategies and
+engine as the GUI, printing periodic stats to stderr. Nothing here imports
+tkinter, so it runs without a display server for the GUI.
+
+Run from the src directory:
+    python -m gui.cli actions.csv --mode executions --executions 10
+    python -m gui.cli actions.acb --mode duration --duration 60 --stats-interval 5
+    python -m gui.cli actions.csv --mode executions --executions 100 --stats-out stats.json
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+from .action_list import ActionList, ACTIONS_REGISTRY, STREAMING_THRESHOLD_BYTES
+from .click_mode_strategy import get_click_mode_strategy
+from .engine import compile_plan, StreamingPlan, DEFAULT_STOP_LATENCY, pause_run, resume_run
+from .input_backend import NullBackend
+from .run_config import RunConfig, RUN_MODES
+from .run_status import RunStatus
+from .scheduler import CATCH_UP_SKIP, CATCH_UP_BURST
+
+
+class HeadlessLogic:
+    """
+    The run state used by the strategies and run_plan, without any widgets.
+    """
+    def __init__(self, catch_up_policy=CATCH_UP_SKIP, stop_latency=DEFAULT_STOP_LATENCY):
+        self.is_clicking_event = threading.Event()
+        self.is_waiting_event = threading.Event()
+        self.is_paused_event = threading.Event()
+        self.catch_up_policy = catch_up_policy
+        self.stop_latency = stop_latency
+        self.status = RunStatus()
+        self.run_stats = None
+        self.run_trace = None
+        self.metrics = None
+        self._execution_limit = None
+        self._timer_running = False
+        self._remaining_time = 0
+        self._executions_done = 0
+
+    def start_clicking(self):
+        self.status.reset()
+        self.is_paused_event.clear()
+        self.is_waiting_event.clear()
+        self.is_clicking_event.set()
+
+    def stop_clicking(self):
+        self.status.stop_requested_ns = time.perf_counter_ns()
+        self.is_clicking_event.clear()
+        self.is_paused_event.clear()
+        self.is_waiting_event.set()
+        self.status.message = "Stopped"
+
+    def pause_clicking(self):
+        pause_run(self)
+
+    def resume_clicking(self):
+        resume_run(self)
+
+
+
+def load_plan(file_path, backend=None, cancel=None):
+    """
+    Compile the script at file_path, streaming it from disk when it is larger
+    than STREAMING_THRESHOLD_BYTES. cancel is the run's wake event.
+    Raises ValueError if it cannot be loaded.
+    """
+    action_list = ActionList()
+    if os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES:
+        count, error = action_list.stream_from_file(file_path)
+        if error:
+            raise ValueError(error)
+        return StreamingPlan(lambda: action_list.iter_file(file_path), ACTIONS_REGISTRY, backend, total=count,
+                             cancel=cancel)
+    count, error = action_list.load_from_file(file_path)
+    if error:
+        raise ValueError(error)
+    return compile_plan(action_list.snapshot(), ACTIONS_REGISTRY, backend, cancel=cancel)
+
+
+def format_stats(status, elapsed):
+    rate = status.events / elapsed if elapsed > 0 else 0.0
+    line = f"[{elapsed:8.1f}s] {status.events} events ({rate:.1f}/s)"
+    progress = status.progress
+    if progress is not None:
+        line += " " + status.format_progress(progress)
+    return line
+
+
+def run(args, out=sys.stderr):
+    """Run a script as described by parsed arguments. Returns the exit code."""
+    backend = NullBackend() if args.backend == "null" else None
+    logic = HeadlessLogic(CATCH_UP_BURST if args.catch_up == "burst" else CATCH_UP_SKIP, args.stop_latency)
+    try:
+        plan = load_plan(args.script, backend, cancel=logic.is_waiting_event)
+    except (OSError, ValueError) as e:
+        print(f"Error loading actions: {e}", file=out)
+        return 1
+    if not len(plan):
+        print("No actions to run.", file=out)
+        return 1
+
+    config = RunConfig(args.mode, duration=args.duration, executions=args.executions)
+    strategy = get_click_mode_strategy(config.mode)
+    if not strategy.prepare(logic, config):
+        print(logic.status.message, file=out)
+        return 2
+
+    errors = []
+    profile = make_profile(args)
+    # Optional features are imported only when asked for, to keep startup fast
+    stats_out = getattr(args, "stats_out", None)
+    if stats_out:
+        from .run_stats import RunStats
+        logic.run_stats = RunStats()
+    trace_out = getattr(args, "trace", None)
+    if trace_out:
+        from .run_trace import RunTrace
+        logic.run_trace = RunTrace()
+    metrics_server = None
+    if getattr(args, "metrics_port", None) is not None:
+        from .metrics import EngineMetrics, MetricsServer
+        logic.metrics = EngineMetrics()
+        metrics_server = MetricsServer(logic.metrics, port=args.metrics_port)
+        try:
+            host, port = metrics_server.start()
+        except OSError as e:
+            print(f"Error starting metrics server: {e}", file=out)
+            return 1
+        print(f"Metrics at http://{host}:{port}/metrics", file=out)
+
+    def worker():
+        try:
+            with profile if profile is not None else nullcontext():
+                strategy.run(logic, plan)
+        except ValueError as e:
+            errors.append(e)
+            logic.stop_clicking()
+
+    logic.start_clicking()
+    started = time.perf_counter()
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    # Poll in short slices so Ctrl+C is handled promptly on every platform
+    poll = min(args.stats_interval, 0.2) if args.stats_interval > 0 else 0.2
+    next_stats = started + args.stats_interval
+    try:
+        while thread.is_alive():
+            thread.join(poll)
+            now = time.perf_counter()
+            if args.stats_interval > 0 and now >= next_stats and thread.is_alive():
+                print(format_stats(logic.status, now - started), file=out)
+                next_stats += args.stats_interval
+    except KeyboardInterrupt:
+        logic.stop_clicking()
+        thread.join()
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+    print(format_stats(logic.status, time.perf_counter() - started), file=out)
+    if profile is not None:
+        print(profile.report(), file=out)
+    if stats_out:
+        print(logic.run_stats.format_summary(), file=out)
+        try:
+            logic.run_stats.save(stats_out)
+        except OSError as e:
+            print(f"Error saving stats: {e}", file=out)
+    if trace_out:
+        try:
+            logic.run_trace.write(trace_out)
+        except OSError as e:
+            print(f"Error writing trace: {e}", file=out)
+        else:
+            print(f"Trace of {len(logic.run_trace)} spans ({logic.run_trace.dropped} dropped) written to {trace_out}",
+                  file=out)
+    if errors:
+        print(f"Error running actions: {errors[0]}", file=out)
+        return 1
+    if logic.status.message:
+        print(logic.status.message, file=out)
+    return 0
+
+
+def parse_cpus(value):
+    """Parse a CPU list such as "2,3" or "0-3"."""
+    cpus = set()
+    for part in value.split(","):
+        first, sep, last = part.partition("-")
+        try:
+            cpus.update(range(int(first), int(last) + 1) if sep else (int(first),))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid CPU list: {value}")
+    return cpus
+
+
+def make_profile(args):
+    """Return the LowJitterProfile selected by the arguments, or None."""
+    if not getattr(args, "low_jitter", False):
+        return None
+    from .run_profile import LowJitterProfile
+    return LowJitterProfile(cpus=args.cpus, nice=args.nice, realtime_priority=args.realtime)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m gui.cli", description='Run a saved action script without the GUI.')
+    parser.add_argument('script', help='CSV or binary (.acb) action script')
+    parser.add_argument('--mode', choices=RUN_MODES, default="indefinite", help='Run mode (default: indefinite)')
+    parser.add_argument('--duration', type=int, help='Seconds to run in duration mode')
+    parser.add_argument('--executions', type=int, help='Passes over the script in executions mode')
+    parser.add_argument('--stats-interval', type=float, default=1.0,
+                        help='Seconds between stats lines on stderr, 0 to disable (default: 1)')
+    parser.add_argument('--catch-up', choices=("skip", "burst"), default="skip",
+                        help='What to do with missed deadlines (default: skip)')
+    parser.add_argument('--stop-latency', type=float, default=DEFAULT_STOP_LATENCY,
+                        help=f'Seconds a stop may take before it is reported as late (default: {DEFAULT_STOP_LATENCY})')
+    parser.add_argument('--stats-out', metavar='PATH',
+                        help='Record per-action timing and write it to PATH at the end (.csv for per-action rows, else JSON)')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='Record a timeline of the run and write it to PATH as Chrome trace JSON (Perfetto)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics during the run')
+    parser.add_argument('--backend', choices=("default", "null"), default="default",
+                        help='Input backend; "null" runs without emitting any input')
+    parser.add_argument('--low-jitter', action='store_true',
+                        help='Freeze the garbage collector during the run and apply --cpus/--nice/--realtime')
+    parser.add_argument('--cpus', type=parse_cpus, help='With --low-jitter, pin the click thread to these CPUs, e.g. 2,3')
+    parser.add_argument('--nice', type=int, help='With --low-jitter, nice value to request for the click thread')
+    parser.add_argument('--realtime', type=int, metavar='PRIORITY',
+                        help='With --low-jitter, request SCHED_FIFO at this priority (usually needs privileges)')
+    return parser
+
+
+def main(argv=None):
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
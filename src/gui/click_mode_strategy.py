@@ -1,13 +1,17 @@
-import time
 from abc import ABC, abstractmethod
+from .engine import run_plan, TIME_UP
 
 class ClickModeStrategy(ABC):
+    """
+    Runs a plan in one mode. prepare() validates the RunConfig and reports
+    problems through logic.status.message, so no widget is needed.
+    """
     @abstractmethod
-    def prepare(self, logic):
+    def prepare(self, logic, config):
         pass
 
     @abstractmethod
-    def run(self, logic, actions, action_instances):
+    def run(self, logic, plan):
         pass
 
 class ExecutionsMode(ClickModeStrategy):
@@ -17,11 +21,11 @@ class ExecutionsMode(ClickModeStrategy):
             return executions
         raise ValueError("Executions must be a positive integer.")
 
-    def prepare(self, logic):
+    def prepare(self, logic, config):
         try:
-            executions = self._parse_executions(logic.gui.executions_entry.get())
-        except ValueError:
-            logic.gui.label.config(text="Invalid executions. Please enter a positive integer.")
+            executions = self._parse_executions(config.executions)
+        except (TypeError, ValueError):
+            logic.status.message = "Invalid executions. Please enter a positive integer."
             return False
         logic._timer_running = False
         logic._remaining_time = 0
@@ -29,27 +33,11 @@ class ExecutionsMode(ClickModeStrategy):
         logic._executions_done = 0
         return True
 
-    def run(self, logic, actions, action_instances):
-        executions_done = 0
-        while logic.is_clicking_event.is_set() and executions_done < logic._execution_limit:
-            for idx, act in enumerate(actions):
-                if not logic.is_clicking_event.is_set():
-                    break
-                x = int(act["x"])
-                y = int(act["y"])
-                interval = float(act["interval"])
-                repeat = int(act.get("repeat", 1))
-                action_instance = action_instances[idx]
-                for r in range(repeat):
-                    if not logic.is_clicking_event.is_set():
-                        break
-                    action_instance.execute(x, y, interval=interval, repeat=1)
-                    if logic.is_waiting_event.wait(interval):
-                        break
-                    logic.gui.label.config(text=f"Running action {idx+1}/{len(actions)} (repeat {r+1}/{repeat}) at ({x},{y})")
-            executions_done += 1
+    def run(self, logic, plan):
+        run_plan(logic, plan, max_passes=logic._execution_limit)
+        logic._executions_done = logic.status.passes
         logic.stop_clicking()
-        logic.gui.label.config(text=f"Completed {logic._execution_limit} executions.")
+        logic.status.message = f"Completed {logic._execution_limit} executions."
 
 class DurationMode(ClickModeStrategy):
     def _parse_duration(self, value):
@@ -58,64 +46,31 @@ class DurationMode(ClickModeStrategy):
             return duration
         raise ValueError("Duration must be a positive integer.")
 
-    def prepare(self, logic):
+    def prepare(self, logic, config):
         try:
-            duration = self._parse_duration(logic.gui.duration_entry.get())
-        except ValueError:
-            logic.gui.label.config(text="Invalid duration. Please enter a positive integer.")
+            duration = self._parse_duration(config.duration)
+        except (TypeError, ValueError):
+            logic.status.message = "Invalid duration. Please enter a positive integer."
             return False
         logic._timer_running = True
         logic._remaining_time = duration
         logic._execution_limit = None
         return True
 
-    def run(self, logic, actions, action_instances):
-        start_time = time.time()
-        while logic.is_clicking_event.is_set() and (time.time() - start_time) < logic._remaining_time:
-            for idx, act in enumerate(actions):
-                if not logic.is_clicking_event.is_set():
-                    break
-                x = int(act["x"])
-                y = int(act["y"])
-                interval = float(act["interval"])
-                repeat = int(act.get("repeat", 1))
-                action_instance = action_instances[idx]
-                for r in range(repeat):
-                    if not logic.is_clicking_event.is_set():
-                        break
-                    action_instance.execute(x, y, interval=interval, repeat=1)
-                    if logic.is_waiting_event.wait(interval):
-                        break
-                    logic.gui.label.config(text=f"Running action {idx+1}/{len(actions)} (repeat {r+1}/{repeat}) at ({x},{y})")
-                if (time.time() - start_time) >= logic._remaining_time:
-                    logic.stop_clicking()
-                    logic.gui.label.config(text="Time is up. Stopped.")
-                    return
+    def run(self, logic, plan):
+        if run_plan(logic, plan, time_limit=logic._remaining_time) == TIME_UP:
+            logic.stop_clicking()
+            logic.status.message = "Time is up. Stopped."
 
 class IndefiniteMode(ClickModeStrategy):
-    def prepare(self, logic):
+    def prepare(self, logic, config):
         logic._timer_running = False
         logic._remaining_time = 0
         logic._execution_limit = None
         return True
 
-    def run(self, logic, actions, action_instances):
-        while logic.is_clicking_event.is_set():
-            for idx, act in enumerate(actions):
-                if not logic.is_clicking_event.is_set():
-                    break
-                x = int(act["x"])
-                y = int(act["y"])
-                interval = float(act["interval"])
-                repeat = int(act.get("repeat", 1))
-                action_instance = action_instances[idx]
-                for r in range(repeat):
-                    if not logic.is_clicking_event.is_set():
-                        break
-                    action_instance.execute(x, y, interval=interval, repeat=1)
-                    if logic.is_waiting_event.wait(interval):
-                        break
-                    logic.gui.label.config(text=f"Running action {idx+1}/{len(actions)} (repeat {r+1}/{repeat}) at ({x},{y})")
+    def run(self, logic, plan):
+        run_plan(logic, plan)
 
 def get_click_mode_strategy(mode):
     if mode == "indefinite":
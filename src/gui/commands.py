@@ -0,0 +1,168 @@
+"""
+Command dispatcher between input hooks and the Tk loop.
+Hotkey callbacks run on the keyboard hook thread, where calling into Tk can
+hang the GUI until it next receives an event. They post commands here
+instead: every command is handled on the Tk loop. post() wakes the loop by
+queueing a <<Command>> virtual event at the tail of Tk's event queue, so a
+command is handled as soon as Tk gets to it rather than at the next poll.
+The queue is also drained every poll_ms while busy (a run is active or
+commands were just handled) and every idle_poll_ms otherwise, as a safety
+net for wake-ups that could not be delivered. Commands registered with an immediate handler (stop) also
+take effect on the posting thread without waiting for Tk. Each command
+carries the perf_counter_ns time it was posted, so handlers can measure
+latency from the key press. call() runs any function on the Tk loop the same
+way and hands back a Future of its result, for threads that need an answer.
+"""
+import queue
+import time
+from concurrent.futures import Future
+
+# Command names
+START = "start"
+STOP = "stop"
+PICK_POSITION = "pick position"
+SET_POSITION = "set position"
+TOGGLE_PREVIEW = "toggle preview"
+# Internal: run the (func, args, future) payload on the Tk loop
+CALL = "call"
+
+# Milliseconds between drains of the command queue on the Tk loop while busy
+DEFAULT_POLL_MS = 4
+# Milliseconds between drains while idle, for commands whose wake-up was lost
+DEFAULT_IDLE_POLL_MS = 50
+# Virtual event generated by post() to drain the queue right away
+WAKE_EVENT = "<<Command>>"
+
+
+class Command:
+    __slots__ = ("name", "posted_ns", "payload")
+
+    def __init__(self, name, posted_ns, payload=None):
+        self.name = name
+        self.posted_ns = posted_ns
+        self.payload = payload
+
+
+class CommandDispatcher:
+    """
+    Thread-safe queue of commands drained by the Tk loop, on the wake event
+    posted with each command and on a master.after poll.
+    post() may be called from any thread; handlers receive the Command.
+    busy is called on the Tk loop after each drain and returns True while
+    commands should be picked up quickly, e.g. while a run is active.
+    """
+    def __init__(self, master, poll_ms=DEFAULT_POLL_MS, idle_poll_ms=DEFAULT_IDLE_POLL_MS, busy=None,
+                 clock=time.perf_counter_ns):
+        if poll_ms <= 0 or idle_poll_ms <= 0:
+            raise ValueError("Poll interval must be positive.")
+        self.master = master
+        self.poll_ms = poll_ms
+        self.idle_poll_ms = idle_poll_ms
+        self.busy = busy
+        self._clock = clock
+        self._queue = queue.SimpleQueue()
+        self._handlers = {CALL: self._run_call}
+        self._immediate = {CALL: None}
+        self._after_id = None
+
+    def register(self, name, handler=None, immediate=None):
+        """
+        handler(command) runs on the Tk loop. immediate(command), if given,
+        runs first on the posting thread and must not touch Tk.
+        """
+        self._handlers[name] = handler
+        self._immediate[name] = immediate
+
+    def post(self, name):
+        if name not in self._handlers:
+            raise ValueError(f"Unknown command: {name}")
+        command = Command(name, self._clock())
+        immediate = self._immediate[name]
+        if immediate is not None:
+            immediate(command)
+        if self._handlers[name] is not None:
+            self._queue.put(command)
+            self._wake()
+        return command
+
+    def call(self, func, *args):
+        """Run func(*args) on the Tk loop at the next drain. Returns a concurrent.futures.Future of the result."""
+        future = Future()
+        self._queue.put(Command(CALL, self._clock(), (func, args, future)))
+        self._wake()
+        return future
+
+    def _wake(self):
+        try:
+            self.master.event_generate(WAKE_EVENT, when="tail")
+        except Exception:
+            # RuntimeError before the main loop runs, TclError once the window
+            # is gone; the next poll still drains the queue
+            pass
+
+    def _run_call(self, command):
+        func, args, future = command.payload
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    def start(self):
+        self.master.bind(WAKE_EVENT, lambda event: self._handle_queued())
+        self.drain()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
+
+    def drain(self):
+        """Handle every queued command, then schedule the next drain."""
+        handled = False
+        try:
+            handled = self._handle_queued()
+        finally:
+            fast = handled or (self.busy is not None and self.busy())
+            self._after_id = self.master.after(self.poll_ms if fast else self.idle_poll_ms, self.drain)
+
+    def _handle_queued(self):
+        """Handle every queued command. Returns True if there were any."""
+        handled = False
+        while True:
+            try:
+                command = self._queue.get_nowait()
+            except queue.Empty:
+                return handled
+            handled = True
+            self._handlers[command.name](command)
+
+
+class LatencyStats:
+    """
+    Count, min, max and total of latency samples per name, in nanoseconds.
+    record() is called from the click thread and summary() from any thread;
+    each sample replaces a whole tuple, so readers never see a partial update.
+    """
+    def __init__(self):
+        self._samples = {}
+
+    def record(self, name, latency_ns):
+        count, low, high, total = self._samples.get(name, (0, latency_ns, latency_ns, 0))
+        self._samples[name] = (count + 1, min(low, latency_ns), max(high, latency_ns), total + latency_ns)
+
+    def get(self, name):
+        """Return (count, min_ns, max_ns, mean_ns) for name, or None if it has no samples."""
+        sample = self._samples.get(name)
+        if sample is None:
+            return None
+        count, low, high, total = sample
+        return count, low, high, total / count
+
+    def summary(self):
+        parts = []
+        for name in sorted(self._samples):
+            count, low, high, mean = self.get(name)
+            parts.append(f"{name} {mean / 1e6:.2f} ms (min {low / 1e6:.2f}, max {high / 1e6:.2f}, n={count})")
+        return "; ".join(parts)
@@ -0,0 +1,267 @@
+"""
+Local control server for driving the clicker from scripts.
+An asyncio server on its own thread accepts any number of clients on a Unix
+socket or a localhost TCP port. Each connection speaks JSON lines: one
+request object per line, answered by one reply line echoing its "id":
+
+    {"id": 1, "cmd": "start", "mode": "executions", "executions": 10}
+    {"id": 1, "ok": true, "result": true}
+
+Commands: load (path), start (mode, duration, executions), stop, pause,
+resume, status, stats, subscribe and unsubscribe. load and start touch
+widgets, so they are handed to the Tk loop through call (for WindowLogic,
+its CommandDispatcher.call) and awaited without blocking the server; the
+others only touch thread-safe run state and are answered on the server
+thread. Subscribed clients receive {"event": "progress", ...} lines whenever
+the status changes, from one publisher shared by every subscriber; a client
+that stops reading has events dropped rather than slowing the others.
+"""
+import asyncio
+import json
+import os
+import stat
+import threading
+from concurrent.futures import Future
+
+DEFAULT_HOST = "127.0.0.1"
+# Status samples per second sent to subscribers
+PROGRESS_HZ = 10
+# Bytes a subscriber may leave unread before its events are dropped
+MAX_PENDING_BYTES = 64 * 1024
+
+
+def call_now(func, *args):
+    """Default call: run func(*args) on the server thread and return a completed Future."""
+    future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def status_snapshot(logic):
+    """The run state of logic as a JSON-ready dict."""
+    status = logic.status
+    progress = status.progress
+    paused = getattr(logic, "is_paused_event", None)
+    return {
+        "clicking": logic.is_clicking_event.is_set(),
+        "paused": paused is not None and paused.is_set(),
+        "generation": status.generation,
+        "events": status.events,
+        "passes": status.passes,
+        "total": status.total,
+        "step": progress[0].index if progress else None,
+        "repeat": progress[1] if progress else None,
+        "message": status.message,
+    }
+
+
+class ControlServer:
+    """
+    Serves logic (a WindowLogic or anything with the same run methods) on path
+    (a Unix socket) or on host:port; port 0 picks a free port, and address
+    holds the bound address once start() returns.
+    """
+    def __init__(self, logic, call=None, host=DEFAULT_HOST, port=0, path=None, progress_hz=PROGRESS_HZ):
+        if progress_hz <= 0:
+            raise ValueError("Progress rate must be positive.")
+        self.logic = logic
+        self._call = call or call_now
+        self.host = host
+        self.port = port
+        self.path = path
+        self.progress_hz = progress_hz
+        self.address = None
+        self.dropped_events = 0
+        self._commands = {
+            "load": self._load,
+            "start": self._start,
+            "stop": self._stop,
+            "pause": self._pause,
+            "resume": self._resume,
+            "status": self._status,
+            "stats": self._stats,
+            "subscribe": self._subscribe,
+            "unsubscribe": self._unsubscribe,
+        }
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._publisher = None
+        self._writers = set()
+        self._subscribers = set()
+
+    @property
+    def clients(self):
+        return len(self._writers)
+
+    def start(self, timeout=5.0):
+        """Start serving on a daemon thread. Raises OSError if the address cannot be bound."""
+        ready = threading.Event()
+        errors = []
+        self._thread = threading.Thread(target=self._serve, args=(ready, errors), name="control-server", daemon=True)
+        self._thread.start()
+        ready.wait(timeout)
+        if errors:
+            raise errors[0]
+        return self.address
+
+    def stop(self, timeout=5.0):
+        """Disconnect every client and stop the server thread."""
+        loop = self._loop
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+        self._loop = None
+
+    def _serve(self, ready, errors):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._open())
+        except OSError as e:
+            errors.append(e)
+            ready.set()
+            loop.close()
+            return
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _open(self):
+        if self.path is not None:
+            _remove_stale_socket(self.path)
+            self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+            self.address = self.path
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        self._publisher = asyncio.ensure_future(self._publish())
+
+    async def _close(self):
+        self._publisher.cancel()
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(await self._dispatch(line, writer))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # Dropped connection, or a line over the reader's limit
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._subscribers.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object.")
+            request_id = request.get("id")
+            handler = self._commands.get(request.get("cmd"))
+            if handler is None:
+                raise ValueError(f"Unknown command: {request.get('cmd')}")
+            reply = {"id": request_id, "ok": True, "result": await handler(request, writer)}
+        except Exception as e:
+            # Any failure is the client's answer; it never drops the connection
+            reply = {"id": request_id, "ok": False, "error": str(e) or type(e).__name__}
+        return _encode(reply)
+
+    async def _on_tk(self, func, *args):
+        return await asyncio.wrap_future(self._call(func, *args))
+
+    async def _load(self, request, writer):
+        count, error = await self._on_tk(self.logic.load_script, request["path"])
+        if error:
+            raise ValueError(error)
+        return {"count": count}
+
+    async def _start(self, request, writer):
+        started = await self._on_tk(self.logic.start_run, request.get("mode"), request.get("duration"),
+                                    request.get("executions"))
+        if not started:
+            raise RuntimeError(self.logic.status.message or "The run did not start.")
+        return status_snapshot(self.logic)
+
+    async def _stop(self, request, writer):
+        self.logic.stop_clicking()
+        return status_snapshot(self.logic)
+
+    async def _pause(self, request, writer):
+        self.logic.pause_clicking()
+        return status_snapshot(self.logic)
+
+    async def _resume(self, request, writer):
+        self.logic.resume_clicking()
+        return status_snapshot(self.logic)
+
+    async def _status(self, request, writer):
+        return status_snapshot(self.logic)
+
+    async def _stats(self, request, writer):
+        stats = getattr(self.logic, "run_stats", None)
+        if stats is None:
+            raise RuntimeError("Run statistics are not recorded.")
+        return {"events": stats.events, "events_per_s": stats.events_per_second(),
+                "latency_ns": stats.latency.summary(), "start_error_ns": stats.error.summary(),
+                "slowest": stats.slowest()}
+
+    async def _subscribe(self, request, writer):
+        self._subscribers.add(writer)
+        return status_snapshot(self.logic)
+
+    async def _unsubscribe(self, request, writer):
+        self._subscribers.discard(writer)
+        return None
+
+    async def _publish(self):
+        last = None
+        while True:
+            await asyncio.sleep(1 / self.progress_hz)
+            if not self._subscribers:
+                continue
+            snapshot = status_snapshot(self.logic)
+            if snapshot == last:
+                continue
+            last = snapshot
+            line = _encode({"event": "progress", **snapshot})
+            for writer in list(self._subscribers):
+                if writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+                    self.dropped_events += 1
+                    continue
+                writer.write(line)
+
+
+def _remove_stale_socket(path):
+    """Remove a socket left at path by an earlier server; refuse to remove anything else."""
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket.")
+    os.unlink(path)
+
+
+def _encode(message):
+    return json.dumps(message).encode("utf-8") + b"\n"
@@ -0,0 +1,510 @@
+"""
+Run engine for the Auto Clicker GUI tool.
+Compiles the action list into an ExecutionPlan once before the click loop
+starts (or lazily, with bounded read-ahead, for a StreamingPlan), and provides
+the single loop shared by all click mode strategies.
+Actions are bound to a cancellation token, the run's wake event: every wait
+inside the engine and the built-in actions returns as soon as it is set, so
+Stop lands within a bound (stop_latency) rather than after the current
+interval or hold.
+Actions on different tracks run as independent sequences at the same time. A
+single loop merges them by next deadline through a heap, so one thread drives
+any number of tracks.
+"""
+import heapq
+import queue
+import threading
+import time
+from functools import partial
+from .scheduler import DeadlineScheduler, CATCH_UP_SKIP
+from .run_trace import WAIT, POLL, PASS
+
+# Reasons returned by run_plan
+STOPPED = "stopped"
+COMPLETED = "completed"
+TIME_UP = "time_up"
+
+# Seconds a stop may take to halt the loop before run_plan reports it as late
+DEFAULT_STOP_LATENCY = 0.05
+
+
+class PlanStep:
+    """
+    One pre-parsed action of an ExecutionPlan, holding the bound execute callable.
+    For condition actions, check is the bound condition, polled every poll_ns
+    for up to timeout_ns before each execute; it is None for other actions.
+    track is the number of the sequence the step belongs to.
+    """
+    __slots__ = ("index", "type", "x", "y", "interval", "interval_ns", "repeat", "execute",
+                 "check", "poll_ns", "timeout_ns", "track")
+
+    def __init__(self, index, action_type, x, y, interval, repeat, execute, check=None, poll=0.0, timeout=0.0,
+                 track=0):
+        self.index = index
+        self.type = action_type
+        self.x = x
+        self.y = y
+        self.interval = interval
+        self.interval_ns = int(interval * 1_000_000_000)
+        self.repeat = repeat
+        self.execute = execute
+        self.check = check
+        self.poll_ns = int(poll * 1_000_000_000)
+        self.timeout_ns = int(timeout * 1_000_000_000)
+        self.track = track
+
+
+class ExecutionPlan:
+    """
+    Immutable sequence of PlanSteps produced by compile_plan(). tracks holds
+    the steps of each track in order of track number, each in plan order.
+    """
+    __slots__ = ("steps", "tracks")
+
+    def __init__(self, steps):
+        self.steps = tuple(steps)
+        by_track = {}
+        for step in self.steps:
+            by_track.setdefault(step.track, []).append(step)
+        self.tracks = tuple(tuple(by_track[track]) for track in sorted(by_track))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+
+def _compile_step(idx, act, registry, backend, instances, cancel=None):
+    action_type = act.get("type", "click").lower()
+    action = instances.get(action_type)
+    if action is None:
+        action_cls = registry.get(action_type)
+        if not action_cls:
+            raise ValueError(f"Unknown action type at index {idx}: {action_type}")
+        action = instances[action_type] = action_cls(backend)
+        if cancel is not None:
+            action.cancel = cancel
+    x, y = int(act["x"]), int(act["y"])
+    execute = action.execute
+    # Per-action settings (e.g. duration, template) are bound once here
+    extra = {name: act[name] for name in getattr(action, "STEP_FIELDS", ()) if act.get(name)}
+    if extra:
+        execute = partial(execute, **extra)
+    check = None
+    poll = timeout = 0.0
+    if getattr(action, "poll_interval", None) is not None:
+        # Condition actions: the duration field is how long to keep polling
+        check = partial(action.check, x, y, **extra)
+        poll = float(act.get("poll") or 0.0) or action.poll_interval
+        timeout = float(act.get("duration") or 0.0)
+    return PlanStep(
+        idx,
+        action_type,
+        x,
+        y,
+        float(act["interval"]),
+        int(act.get("repeat", 1)),
+        execute,
+        check,
+        poll,
+        timeout,
+        int(act.get("track") or 0),
+    )
+
+
+def compile_plan(actions, registry, backend=None, cancel=None):
+    """
+    Parse and type-convert every action dict once and bind it to an instance of
+    its action class (one per type) using the given input backend (None selects
+    the default backend). cancel is the threading.Event the actions' waits end
+    on, normally the run's wake event. Raises ValueError for unknown action types.
+    """
+    instances = {}
+    return ExecutionPlan(_compile_step(idx, act, registry, backend, instances, cancel)
+                         for idx, act in enumerate(actions or ()))
+
+
+class StreamingPlan:
+    """
+    Plan that compiles actions lazily on every pass over source(), a callable
+    returning a fresh iterable of action dicts. A reader thread keeps at most
+    max_chunks chunks of chunk_size steps buffered, so memory stays flat
+    however long the script is. Errors raised by the source are re-raised
+    in the iterating thread. Streamed scripts are read in a single pass, so
+    they must keep every action on track 0.
+    """
+    _END = object()
+
+    def __init__(self, source, registry, backend=None, total=0, chunk_size=256, max_chunks=4, cancel=None):
+        self.source = source
+        self.registry = registry
+        self.backend = backend
+        self.cancel = cancel
+        self.total = total
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        chunks = queue.Queue(maxsize=self.max_chunks)
+        cancel = threading.Event()
+        reader = threading.Thread(target=self._read, args=(chunks, cancel), daemon=True)
+        reader.start()
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is self._END:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield from chunk
+        finally:
+            # Runs when the pass ends early too, so the reader never outlives it
+            cancel.set()
+
+    def _read(self, chunks, cancel):
+        instances = {}
+        chunk = []
+        try:
+            for idx, act in enumerate(self.source()):
+                step = _compile_step(idx, act, self.registry, self.backend, instances, self.cancel)
+                if step.track:
+                    raise ValueError(f"Action {idx + 1} is on track {step.track}; streamed scripts cannot use tracks.")
+                chunk.append(step)
+                if len(chunk) >= self.chunk_size:
+                    if not self._put(chunks, chunk, cancel):
+                        return
+                    chunk = []
+            if chunk and not self._put(chunks, chunk, cancel):
+                return
+            self._put(chunks, self._END, cancel)
+        except Exception as e:
+            self._put(chunks, e, cancel)
+
+    @staticmethod
+    def _put(chunks, item, cancel):
+        while not cancel.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+def _halted(status, stop_latency_ns, metrics=None):
+    """Record how long the stop took to halt the loop and flag it if over the bound."""
+    requested = status.stop_requested_ns
+    if requested is not None:
+        latency = status.stop_latency_ns = time.perf_counter_ns() - requested
+        if latency > stop_latency_ns:
+            status.message = (f"Stopped in {latency / 1e6:.0f} ms, over the "
+                              f"{stop_latency_ns / 1e6:.0f} ms stop latency bound")
+        if metrics is not None:
+            metrics.record_stop(latency, latency > stop_latency_ns)
+    return STOPPED
+
+
+def pause_run(logic):
+    """Pause logic's run at its next wait. Only thread-safe flags are touched, so any thread may call this."""
+    if logic.is_clicking_event.is_set() and not logic.is_paused_event.is_set():
+        logic.is_paused_event.set()
+        logic.is_waiting_event.set()
+        logic.status.message = "Paused"
+
+
+def resume_run(logic):
+    """Resume logic's paused run; its schedule is pushed back by the time spent paused."""
+    if logic.is_paused_event.is_set():
+        logic.is_paused_event.clear()
+        logic.is_waiting_event.set()
+        logic.status.message = None
+
+
+def _sit_out_pause(logic, scheduler):
+    """
+    Called when the wake event interrupts a wait. If the run is paused, block
+    until it is resumed or stopped and push the schedule back by the time
+    spent paused, then finish the wait. Returns True if the run should carry on.
+    """
+    paused = getattr(logic, "is_paused_event", None)
+    is_clicking = logic.is_clicking_event.is_set
+    wake = logic.is_waiting_event
+    clock = time.perf_counter_ns
+    # Pause, resume and stop change their flags before setting wake, so
+    # clearing it before checking them cannot miss one. Actions use it as
+    # their cancellation token, so a stopped run leaves it set
+    while is_clicking():
+        wake.clear()
+        if not is_clicking():
+            break
+        if paused is not None and paused.is_set():
+            start = clock()
+            while paused.is_set() and is_clicking():
+                wake.wait()
+                wake.clear()
+            scheduler.deadline += clock() - start
+            if not is_clicking():
+                break
+        # Otherwise there was nothing to sit out, e.g. a pause resumed before it was seen
+        if not scheduler.wait_until(scheduler.deadline):
+            return True
+    wake.set()
+    return False
+
+
+def run_plan(logic, plan, max_passes=None, time_limit=None):
+    """
+    Execute the plan until clicking is stopped, max_passes full passes are done,
+    or time_limit seconds have elapsed (checked after each action).
+    Intervals are measured between absolute deadlines, so action and loop
+    overhead do not accumulate as drift. Steps with a condition only execute
+    once it passes; a condition that times out skips that repetition.
+    Progress is published to logic.status for the Tk loop to pick up, along
+    with the time a stop took if status.stop_requested_ns was set; stops slower
+    than logic.stop_latency seconds are reported in status.message.
+    Setting logic.is_paused_event and then the wake event pauses the run at the
+    next wait; clearing it and setting the wake event again resumes it.
+    If logic.run_stats is set (a RunStats), each event's backend call time and
+    start error against its deadline are recorded there. If logic.run_trace is
+    set (a RunTrace), spans for every action call, condition poll, interval
+    wait and pass are recorded there. If logic.metrics is set (an
+    EngineMetrics), its counters are kept up to date for scrapes.
+    A plan with several tracks runs them side by side; see _run_tracks().
+    Returns STOPPED, COMPLETED or TIME_UP.
+    """
+    if not len(plan):
+        return STOPPED
+    # Streamed plans are always on a single track
+    run = _run_tracks if len(getattr(plan, "tracks", ())) > 1 else _run_plan
+    metrics = getattr(logic, "metrics", None)
+    if metrics is None:
+        return run(logic, plan, max_passes, time_limit, None)
+    metrics.run_started(max_passes, time_limit)
+    try:
+        return run(logic, plan, max_passes, time_limit, metrics)
+    except Exception:
+        metrics.errors += 1
+        raise
+    finally:
+        metrics.running = False
+
+
+def _run_plan(logic, plan, max_passes, time_limit, metrics):
+    is_clicking = logic.is_clicking_event.is_set
+    scheduler = DeadlineScheduler(logic.is_waiting_event, catch_up=getattr(logic, "catch_up_policy", CATCH_UP_SKIP))
+    wait = scheduler.wait
+    poll = scheduler.poll
+    clock = time.perf_counter_ns
+    status = logic.status
+    status.total = len(plan)
+    stop_latency_ns = int(getattr(logic, "stop_latency", DEFAULT_STOP_LATENCY) * 1_000_000_000)
+    stats = getattr(logic, "run_stats", None)
+    if stats is not None:
+        stats.reset(len(plan))
+    trace = getattr(logic, "run_trace", None)
+    if trace is not None:
+        trace.reset()
+        pass_id = trace.intern(PASS)
+    start_ns = scheduler.start()
+    end_ns = start_ns + int(time_limit * 1_000_000_000) if time_limit is not None else None
+    passes = 0
+    events = status.events
+    while is_clicking():
+        if max_passes is not None and passes >= max_passes:
+            return COMPLETED
+        pass_start_ns = clock()
+        for step in plan:
+            if not is_clicking():
+                return _halted(status, stop_latency_ns, metrics)
+            execute = step.execute
+            x = step.x
+            y = step.y
+            interval = step.interval
+            interval_ns = step.interval_ns
+            repeat = step.repeat
+            check = step.check
+            step_events = events
+            if trace is None:
+                step_wait = wait
+                step_poll = poll
+            else:
+                # Traced copies only exist while tracing, so an untraced run calls the originals
+                execute = trace.wrap(step.type, execute, step.index)
+                step_wait = trace.wrap(WAIT, wait, step.index)
+                step_poll = trace.wrap(POLL, poll, step.index)
+            for r in range(repeat):
+                if not is_clicking():
+                    break
+                if check is None or step_poll(check, step.poll_ns, step.timeout_ns):
+                    if stats is None and metrics is None:
+                        execute(x, y, interval=interval, repeat=1)
+                    else:
+                        started = clock()
+                        execute(x, y, interval=interval, repeat=1)
+                        if stats is not None:
+                            stats.record(step, started - scheduler.deadline, clock() - started)
+                        if metrics is not None:
+                            metrics.start_error.record(started - scheduler.deadline)
+                    events += 1
+                    status.events = events
+                    if status.first_event_ns is None:
+                        status.first_event_ns = clock()
+                elif not is_clicking():
+                    break
+                if step_wait(interval_ns) and not _sit_out_pause(logic, scheduler):
+                    break
+                status.progress = (step, r + 1)
+            if metrics is not None:
+                # Once per step rather than per event
+                by_type = metrics.events_by_type
+                by_type[step.type] = by_type.get(step.type, 0) + events - step_events
+            if end_ns is not None and clock() >= end_ns:
+                return TIME_UP
+        if trace is not None:
+            trace.add(pass_id, pass_start_ns, clock(), passes)
+        passes += 1
+        status.passes = passes
+        if metrics is not None:
+            metrics.executions += 1
+    return _halted(status, stop_latency_ns, metrics)
+
+
+class _TrackState:
+    """Where one track of a multi-track run has got to."""
+    __slots__ = ("steps", "cursor", "done", "passes", "pass_start_ns", "poll_start_ns")
+
+    def __init__(self, steps, start_ns):
+        self.steps = steps
+        self.cursor = 0
+        self.done = 0
+        self.passes = 0
+        self.pass_start_ns = start_ns
+        self.poll_start_ns = None
+
+
+def _run_tracks(logic, plan, max_passes, time_limit, metrics):
+    """
+    run_plan() for a plan with several tracks. Each track is its own sequence
+    of steps with its own schedule and pass count; one loop keeps the next
+    deadline of every track in a heap and serves whichever is due first, so
+    the tracks share this thread however many there are. Conditions are
+    checked without blocking: a false check puts the track back in the heap
+    poll_ns later, so it never holds up the others. status.passes counts
+    passes completed by every track, and max_passes applies to each track,
+    which leaves the heap once it has done them.
+    """
+    is_clicking = logic.is_clicking_event.is_set
+    wake = logic.is_waiting_event
+    catch_up = getattr(logic, "catch_up_policy", CATCH_UP_SKIP)
+    scheduler = DeadlineScheduler(wake, catch_up=catch_up)
+    wait_until = scheduler.wait_until
+    clock = time.perf_counter_ns
+    status = logic.status
+    status.total = len(plan)
+    stop_latency_ns = int(getattr(logic, "stop_latency", DEFAULT_STOP_LATENCY) * 1_000_000_000)
+    stats = getattr(logic, "run_stats", None)
+    if stats is not None:
+        stats.reset(len(plan))
+    trace = getattr(logic, "run_trace", None)
+    executes = {}
+    checks = {}
+    if trace is not None:
+        trace.reset()
+        pass_id = trace.intern(PASS)
+        wait_until = trace.wrap(WAIT, wait_until)
+        for step in plan.steps:
+            executes[step.index] = trace.wrap(step.type, step.execute, step.index)
+            if step.check is not None:
+                checks[step.index] = trace.wrap(POLL, step.check, step.index)
+    start_ns = scheduler.start()
+    end_ns = start_ns + int(time_limit * 1_000_000_000) if time_limit is not None else None
+    if max_passes is not None and max_passes <= 0:
+        return COMPLETED
+    tracks = [_TrackState(steps, start_ns) for steps in plan.tracks]
+    # (deadline, track) pairs; ties go to the lower track number
+    heap = [(start_ns, i) for i in range(len(tracks))]
+    heapq.heapify(heap)
+    passes = 0
+    events = status.events
+    while is_clicking():
+        deadline, i = heap[0]
+        if wait_until(deadline):
+            if _sit_out_pause(logic, scheduler):
+                # Push every track back by the time spent paused; the order is unchanged
+                shift = scheduler.deadline - deadline
+                heap[:] = [(d + shift, n) for d, n in heap]
+            continue
+        if end_ns is not None and clock() >= end_ns:
+            return TIME_UP
+        track = tracks[i]
+        step = track.steps[track.cursor]
+        base = deadline
+        if step.check is not None:
+            now = clock()
+            if not checks.get(step.index, step.check)():
+                if track.poll_start_ns is None:
+                    track.poll_start_ns = now
+                if now - track.poll_start_ns < step.timeout_ns:
+                    heapq.heapreplace(heap, (now + step.poll_ns, i))
+                    continue
+                # Timed out: skip this repetition
+                run = False
+            else:
+                run = True
+            if track.poll_start_ns is not None:
+                # Time spent polling shifts this track's schedule, as in a single-track run
+                base = clock()
+                track.poll_start_ns = None
+        else:
+            run = True
+        if run:
+            execute = executes.get(step.index, step.execute)
+            if stats is None and metrics is None:
+                execute(step.x, step.y, interval=step.interval, repeat=1)
+            else:
+                started = clock()
+                execute(step.x, step.y, interval=step.interval, repeat=1)
+                if stats is not None:
+                    stats.record(step, started - deadline, clock() - started)
+                if metrics is not None:
+                    metrics.start_error.record(started - deadline)
+                    by_type = metrics.events_by_type
+                    by_type[step.type] = by_type.get(step.type, 0) + 1
+            events += 1
+            status.events = events
+            if status.first_event_ns is None:
+                status.first_event_ns = clock()
+        track.done += 1
+        status.progress = (step, track.done)
+        if track.done >= step.repeat:
+            track.done = 0
+            track.cursor += 1
+            if track.cursor == len(track.steps):
+                track.cursor = 0
+                if trace is not None:
+                    trace.add(pass_id, track.pass_start_ns, clock(), track.passes)
+                track.passes += 1
+                track.pass_start_ns = clock()
+                least = min(t.passes for t in tracks)
+                if least > passes:
+                    passes = least
+                    status.passes = passes
+                    if metrics is not None:
+                        metrics.executions += 1
+                if max_passes is not None and track.passes >= max_passes:
+                    heapq.heappop(heap)
+                    if not heap:
+                        return COMPLETED
+                    continue
+        next_deadline = base + step.interval_ns
+        now = clock()
+        if catch_up == CATCH_UP_SKIP and now - next_deadline >= step.interval_ns:
+            # An interval or more behind: drop the missed slots and re-anchor on now
+            next_deadline = now
+            scheduler.skipped += 1
+        heapq.heapreplace(heap, (next_deadline, i))
+    return _halted(status, stop_latency_ns, metrics)
@@ -0,0 +1,183 @@
+"""
+Template matching on screenshots with NumPy.
+Matches by normalized cross-correlation (NCC), computed with FFTs and
+integral images so the cost does not grow with the template size, and
+searched coarse-to-fine over an image pyramid: the whole screenshot is only
+correlated at the coarsest level, finer levels only look around the best
+coarse match. A PreparedTemplate caches its grayscale pyramid and its FFTs
+per search size, so repeated polls only pay for the screenshot's FFT.
+
+Requires numpy; screenshots use Pillow's ImageGrab unless another source is given.
+A template spec is "path" or "path@left,top,width,height" to search only that region.
+"""
+import numpy as np
+
+# Scores range from -1 to 1; 1 is a perfect match
+DEFAULT_THRESHOLD = 0.9
+# Templates are not shrunk below this many pixels on either side
+MIN_PYRAMID_SIZE = 8
+# Radius (pixels at each finer level) searched around the coarse match
+REFINE_RADIUS = 4
+# Coarse peaks followed down to full resolution
+COARSE_CANDIDATES = 3
+
+
+def parse_template_spec(spec):
+    """Split "path[@left,top,width,height]" into (path, region or None)."""
+    path, sep, region = spec.rpartition("@")
+    if not sep:
+        return spec, None
+    try:
+        left, top, width, height = (int(v) for v in region.split(","))
+    except ValueError:
+        return spec, None
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Invalid template region: {region}")
+    return path, (left, top, width, height)
+
+
+def to_gray(image):
+    """Convert a PIL image or an (H, W) / (H, W, 3|4) array to float64 grayscale."""
+    if hasattr(image, "convert"):
+        image = image.convert("L")
+    array = np.asarray(image, dtype=np.float64)
+    if array.ndim == 3:
+        array = array[..., :3] @ np.array([0.299, 0.587, 0.114])
+    return array
+
+
+def downsample(image):
+    """Halve an image by averaging 2x2 blocks."""
+    h, w = image.shape[0] // 2 * 2, image.shape[1] // 2 * 2
+    image = image[:h, :w]
+    return (image[0::2, 0::2] + image[1::2, 0::2] + image[0::2, 1::2] + image[1::2, 1::2]) * 0.25
+
+
+def grab_screen(region=None):
+    """Default screenshot source: a grayscale array of the screen or of region."""
+    from PIL import ImageGrab
+    bbox = None
+    if region is not None:
+        left, top, width, height = region
+        bbox = (left, top, left + width, top + height)
+    return to_gray(ImageGrab.grab(bbox=bbox))
+
+
+def _window_sums(image, h, w):
+    """Sums of every h x w window (valid positions only) via an integral image."""
+    integral = np.zeros((image.shape[0] + 1, image.shape[1] + 1))
+    np.cumsum(np.cumsum(image, axis=0), axis=1, out=integral[1:, 1:])
+    return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+
+class _Level:
+    __slots__ = ("template", "norm", "ffts")
+
+    def __init__(self, template):
+        # Zero-mean template, so NCC only needs the image's window sums
+        self.template = template - template.mean()
+        self.norm = np.sqrt((self.template ** 2).sum())
+        self.ffts = {}
+
+    def ncc(self, image):
+        """NCC score of the template at every valid position of image."""
+        h, w = self.template.shape
+        H, W = image.shape
+        if H < h or W < w:
+            return np.full((0, 0), -1.0)
+        shape = (H, W)
+        template_fft = self.ffts.get(shape)
+        if template_fft is None:
+            if len(self.ffts) >= 32:
+                # Refinement windows at screen edges vary in size; keep the cache bounded
+                self.ffts.clear()
+            template_fft = self.ffts[shape] = np.conj(np.fft.rfft2(self.template, shape))
+        corr = np.fft.irfft2(np.fft.rfft2(image, shape) * template_fft, shape)[:H - h + 1, :W - w + 1]
+        n = h * w
+        sums = _window_sums(image, h, w)
+        sq_sums = _window_sums(image * image, h, w)
+        variance = np.maximum(sq_sums - sums * sums / n, 0.0)
+        denom = np.sqrt(variance) * self.norm
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(denom > 1e-9, corr / denom, 0.0)
+        return scores
+
+
+class PreparedTemplate:
+    """
+    A template ready for matching: its grayscale pyramid and cached FFTs.
+    levels is the number of pyramid levels (1 = full resolution only).
+    """
+    def __init__(self, image, levels=3):
+        gray = to_gray(image)
+        if gray.size == 0:
+            raise ValueError("Template image is empty.")
+        self.height, self.width = gray.shape
+        pyramid = [gray]
+        while len(pyramid) < levels and min(pyramid[-1].shape) // 2 >= MIN_PYRAMID_SIZE:
+            pyramid.append(downsample(pyramid[-1]))
+        self.levels = [_Level(t) for t in pyramid]
+
+    @classmethod
+    def from_file(cls, path, levels=3):
+        from PIL import Image
+        with Image.open(path) as image:
+            return cls(image, levels)
+
+    def match(self, image, threshold=DEFAULT_THRESHOLD):
+        """
+        Find the template in a grayscale image array. Returns (left, top, score)
+        of the best match, or None if it scores below threshold.
+        """
+        pyramid = [image]
+        for _ in range(len(self.levels) - 1):
+            pyramid.append(downsample(pyramid[-1]))
+        # Coarsest level that the image is still large enough for
+        level = len(self.levels) - 1
+        while level > 0 and (pyramid[level].shape[0] < self.levels[level].template.shape[0]
+                             or pyramid[level].shape[1] < self.levels[level].template.shape[1]):
+            level -= 1
+        scores = self.levels[level].ncc(pyramid[level])
+        if scores.size == 0:
+            return None
+        if level == 0:
+            top, left = np.unravel_index(np.argmax(scores), scores.shape)
+            best = (int(left), int(top), float(scores[top, left]))
+        else:
+            # Refine a few separate coarse peaks; the best coarse one is not always right
+            best = None
+            for top, left in self._peaks(scores, self.levels[level].template.shape):
+                found = self._refine(pyramid, level, top, left)
+                if found is not None and (best is None or found[2] > best[2]):
+                    best = found
+        if best is None or best[2] < threshold:
+            return None
+        return best
+
+    @staticmethod
+    def _peaks(scores, template_shape):
+        """Yield (top, left) of up to COARSE_CANDIDATES peaks at least half a template apart."""
+        scores = scores.copy()
+        h, w = template_shape[0] // 2 + 1, template_shape[1] // 2 + 1
+        for _ in range(COARSE_CANDIDATES):
+            top, left = np.unravel_index(np.argmax(scores), scores.shape)
+            if scores[top, left] == -np.inf:
+                return
+            yield int(top), int(left)
+            scores[max(0, top - h):top + h, max(0, left - w):left + w] = -np.inf
+
+    def _refine(self, pyramid, level, top, left):
+        """Follow a match at level down to full resolution. Returns (left, top, score) or None."""
+        for level in range(level - 1, -1, -1):
+            h, w = self.levels[level].template.shape
+            H, W = pyramid[level].shape
+            y0 = max(0, top * 2 - REFINE_RADIUS)
+            x0 = max(0, left * 2 - REFINE_RADIUS)
+            y1 = min(H, top * 2 + REFINE_RADIUS + h)
+            x1 = min(W, left * 2 + REFINE_RADIUS + w)
+            scores = self.levels[level].ncc(pyramid[level][y0:y1, x0:x1])
+            if scores.size == 0:
+                return None
+            dy, dx = np.unravel_index(np.argmax(scores), scores.shape)
+            top, left = y0 + int(dy), x0 + int(dx)
+        return left, top, float(scores[dy, dx])
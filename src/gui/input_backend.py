@@ -0,0 +1,229 @@
+"""
+Input backends used by actions to emit mouse events.
+PyAutoGUIBackend is the portable fallback. XTestBackend injects events on X11
+directly through the XTest extension and only sends them to the server on
+flush(), so many events can go out in a single write. NullBackend and
+RecordingBackend never touch the OS and are used for tests and benchmarks.
+"""
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from array import array
+
+
+class InputBackend(ABC):
+    """
+    Interface for emitting mouse events. Events may be buffered until flush().
+    """
+    @abstractmethod
+    def mouse_down(self, x, y, button="left"):
+        pass
+
+    @abstractmethod
+    def mouse_up(self, x, y, button="left"):
+        pass
+
+    def click(self, x, y, button="left"):
+        self.mouse_down(x, y, button)
+        self.mouse_up(x, y, button)
+
+    def double_click(self, x, y, button="left"):
+        self.click(x, y, button)
+        self.click(x, y, button)
+
+    def move(self, x, y):
+        """Move the pointer without pressing a button."""
+        raise NotImplementedError("Backend does not support pointer moves")
+
+    def flush(self):
+        """Send any buffered events."""
+        pass
+
+    def close(self):
+        pass
+
+
+class PyAutoGUIBackend(InputBackend):
+    """
+    Backend calling pyautogui, including its PAUSE and failsafe checks.
+    """
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def mouse_down(self, x, y, button="left"):
+        self._pyautogui.mouseDown(x, y, button=button)
+
+    def mouse_up(self, x, y, button="left"):
+        self._pyautogui.mouseUp(x, y, button=button)
+
+    def click(self, x, y, button="left"):
+        self._pyautogui.click(x, y, button=button)
+
+    def double_click(self, x, y, button="left"):
+        self._pyautogui.doubleClick(x, y, button=button)
+
+    def move(self, x, y):
+        self._pyautogui.moveTo(x, y)
+
+
+class XTestBackend(InputBackend):
+    """
+    Backend writing XTest fake input requests to its own X display connection.
+    With autoflush disabled, requests are buffered until flush() is called.
+    """
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+    def __init__(self, display_name=None, autoflush=False):
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self._display = display.Display(display_name)
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise RuntimeError("X server does not support the XTEST extension.")
+        self._fake_input = xtest.fake_input
+        self._motion = X.MotionNotify
+        self._press = X.ButtonPress
+        self._release = X.ButtonRelease
+        self.autoflush = autoflush
+
+    def _button(self, button):
+        try:
+            return self.BUTTONS[button]
+        except KeyError:
+            raise ValueError(f"Unknown mouse button: {button}")
+
+    def mouse_down(self, x, y, button="left"):
+        self._fake_input(self._display, self._motion, x=x, y=y)
+        self._fake_input(self._display, self._press, self._button(button))
+        if self.autoflush:
+            self._display.flush()
+
+    def mouse_up(self, x, y, button="left"):
+        self._fake_input(self._display, self._motion, x=x, y=y)
+        self._fake_input(self._display, self._release, self._button(button))
+        if self.autoflush:
+            self._display.flush()
+
+    def click(self, x, y, button="left"):
+        detail = self._button(button)
+        fake_input = self._fake_input
+        display = self._display
+        fake_input(display, self._motion, x=x, y=y)
+        fake_input(display, self._press, detail)
+        fake_input(display, self._release, detail)
+        if self.autoflush:
+            display.flush()
+
+    def move(self, x, y):
+        self._fake_input(self._display, self._motion, x=x, y=y)
+        if self.autoflush:
+            self._display.flush()
+
+    def flush(self):
+        self._display.flush()
+
+    def sync(self):
+        """Flush and wait until the server has processed every request."""
+        self._display.sync()
+
+    def close(self):
+        self._display.close()
+
+
+class NullBackend(InputBackend):
+    """
+    Backend that discards every event.
+    """
+    def mouse_down(self, x, y, button="left"):
+        pass
+
+    def mouse_up(self, x, y, button="left"):
+        pass
+
+    def click(self, x, y, button="left"):
+        pass
+
+    def double_click(self, x, y, button="left"):
+        pass
+
+    def move(self, x, y):
+        pass
+
+
+class RecordingBackend(InputBackend):
+    """
+    Backend that timestamps every event with perf_counter_ns into preallocated
+    arrays instead of emitting it. Events beyond capacity are counted in dropped.
+    """
+    DOWN = 0
+    UP = 1
+    CLICK = 2
+    DOUBLE_CLICK = 3
+    MOVE = 4
+
+    def __init__(self, capacity=1_000_000, clock=time.perf_counter_ns):
+        self.capacity = capacity
+        self.timestamps = array("q", bytes(8 * capacity))
+        self.kinds = array("b", bytes(capacity))
+        self.xs = array("i", bytes(4 * capacity))
+        self.ys = array("i", bytes(4 * capacity))
+        self.count = 0
+        self.dropped = 0
+        self._clock = clock
+
+    def _record(self, kind, x, y):
+        i = self.count
+        if i >= self.capacity:
+            self.dropped += 1
+            return
+        self.timestamps[i] = self._clock()
+        self.kinds[i] = kind
+        self.xs[i] = x
+        self.ys[i] = y
+        self.count = i + 1
+
+    def mouse_down(self, x, y, button="left"):
+        self._record(self.DOWN, x, y)
+
+    def mouse_up(self, x, y, button="left"):
+        self._record(self.UP, x, y)
+
+    def click(self, x, y, button="left"):
+        self._record(self.CLICK, x, y)
+
+    def double_click(self, x, y, button="left"):
+        self._record(self.DOUBLE_CLICK, x, y)
+
+    def move(self, x, y):
+        self._record(self.MOVE, x, y)
+
+    def events(self):
+        """Return the recorded (timestamp_ns, kind, x, y) tuples."""
+        n = self.count
+        return list(zip(self.timestamps[:n], self.kinds[:n], self.xs[:n], self.ys[:n]))
+
+    def clear(self):
+        self.count = 0
+        self.dropped = 0
+
+
+_default_backend = None
+
+
+def get_default_backend():
+    """
+    Return the shared default backend: XTest on Linux/X11 when available,
+    otherwise pyautogui.
+    """
+    global _default_backend
+    if _default_backend is None:
+        if sys.platform.startswith("linux") and os.environ.get("DISPLAY"):
+            try:
+                _default_backend = XTestBackend()
+            except Exception:
+                _default_backend = None
+        if _default_backend is None:
+            _default_backend = PyAutoGUIBackend()
+    return _default_backend
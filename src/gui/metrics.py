@@ -0,0 +1,136 @@
+"""
+Prometheus metrics for the run engine.
+When logic.metrics is set, run_plan keeps an EngineMetrics up to date: event
+counts by action type (added once per step, not per event), completed
+executions, start errors against the schedule, errors and stop latencies.
+Only the click thread writes these, as plain attribute and dict stores, so
+the loop takes no locks; nothing is formatted until a scrape calls render().
+MetricsServer serves render() at /metrics on localhost in the Prometheus
+text exposition format.
+"""
+import threading
+
+from .run_stats import LogHistogram
+
+DEFAULT_HOST = "127.0.0.1"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+RUN_MODES = ("indefinite", "duration", "executions")
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class EngineMetrics:
+    """Counters and gauges kept by run_plan; see render() for the exported names."""
+    def __init__(self):
+        self.events_by_type = {}
+        self.executions = 0
+        self.runs = 0
+        self.errors = 0
+        self.late_stops = 0
+        self.running = False
+        self.mode = None
+        self.start_error = LogHistogram()
+        self.stop_latency = LogHistogram()
+
+    def run_started(self, max_passes, time_limit):
+        self.runs += 1
+        self.running = True
+        if max_passes is not None:
+            self.mode = "executions"
+        elif time_limit is not None:
+            self.mode = "duration"
+        else:
+            self.mode = "indefinite"
+
+    def record_stop(self, latency_ns, late):
+        self.stop_latency.record(latency_ns)
+        if late:
+            self.late_stops += 1
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+
+        def summary(name, help_text, histogram):
+            samples = [(f'{{quantile="{q}"}}', histogram.percentile(q * 100) / 1e9) for q in SUMMARY_QUANTILES]
+            metric(name, "summary", help_text, samples)
+            lines.append(f"{name}_sum {histogram.total / 1e9}")
+            lines.append(f"{name}_count {histogram.count}")
+
+        # Copied in one step, since the click thread may add a type meanwhile
+        by_type = dict(self.events_by_type)
+        metric("autoclicker_events_total", "counter", "Input events emitted, by action type.",
+               [(f'{{type="{_label(name)}"}}', count) for name, count in sorted(by_type.items())])
+        metric("autoclicker_executions_total", "counter", "Completed passes over the action list.",
+               [("", self.executions)])
+        metric("autoclicker_runs_total", "counter", "Runs started.", [("", self.runs)])
+        metric("autoclicker_running", "gauge", "1 while a run is in progress.", [("", int(self.running))])
+        metric("autoclicker_run_mode", "gauge", "1 for the mode of the current or last run.",
+               [(f'{{mode="{mode}"}}', int(mode == self.mode)) for mode in RUN_MODES])
+        summary("autoclicker_start_error_seconds", "How late events started against their schedule.",
+                self.start_error)
+        metric("autoclicker_errors_total", "counter",
+               "Runs ended by an exception from an action, its input backend or the plan.", [("", self.errors)])
+        summary("autoclicker_stop_latency_seconds", "Time from a stop request to the engine halting.",
+                self.stop_latency)
+        metric("autoclicker_late_stops_total", "counter", "Stops slower than the stop latency bound.",
+               [("", self.late_stops)])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves metrics.render() at /metrics over HTTP on a daemon thread.
+    port 0 picks a free port; address holds the bound (host, port) once started.
+    """
+    def __init__(self, metrics, host=DEFAULT_HOST, port=0):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.address = None
+        self._httpd = None
+        self._thread = None
+
+    def start(self):
+        """Start serving. Raises OSError if the port cannot be bound."""
+        # Imported here so loading the module for EngineMetrics stays cheap
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.address = self._httpd.server_address[:2]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self.address
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
@@ -0,0 +1,127 @@
+"""
+Shared cursor-position sampler.
+One Tk after() loop queries the cursor position and publishes the latest
+sample to every consumer, so the label, position picker and recorder do not
+each query the display. The rate adapts: fast while any consumer has asked
+for it (e.g. while picking a position), slow otherwise, and sampling stops
+entirely while the window is minimized or withdrawn.
+"""
+import time
+
+# Sampling interval while nothing needs fresh positions
+IDLE_INTERVAL_MS = 250
+# Sampling interval while a consumer has called request_fast()
+FAST_INTERVAL_MS = 16
+
+
+def _query_pyautogui():
+    import pyautogui
+    x, y = pyautogui.position()
+    return x, y
+
+
+class PositionSampler:
+    """
+    Samples the cursor position from the Tk loop.
+    latest is the last (x, y, timestamp) sample, or None before the first one;
+    it is replaced by a single assignment, so any thread may read it.
+    Subscribers are called with (x, y) from the Tk loop when the position changes.
+    If a query raises, on_error is called with the exception, error holds it
+    until the next good sample, and sampling carries on at the usual rate.
+    """
+    def __init__(self, master, query=None, idle_ms=IDLE_INTERVAL_MS, fast_ms=FAST_INTERVAL_MS, clock=time.monotonic,
+                 on_error=None):
+        if idle_ms <= 0 or fast_ms <= 0:
+            raise ValueError("Sampling intervals must be positive.")
+        self.master = master
+        self.query = query or _query_pyautogui
+        self.idle_ms = idle_ms
+        self.fast_ms = fast_ms
+        self.clock = clock
+        self.on_error = on_error
+        self.error = None
+        self.latest = None
+        self.samples = 0
+        self._subscribers = []
+        self._fast_requests = set()
+        self._after_id = None
+        self.paused = False
+
+    # --- consumers ---
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def request_fast(self, key):
+        """Sample at the fast rate until release_fast(key) is called."""
+        first = not self._fast_requests
+        self._fast_requests.add(key)
+        if first and self._after_id is not None:
+            # Pull the next sample forward instead of waiting out the idle interval
+            self.master.after_cancel(self._after_id)
+            self._after_id = self.master.after(self.fast_ms, self.poll)
+
+    def release_fast(self, key):
+        self._fast_requests.discard(key)
+
+    @property
+    def interval_ms(self):
+        return self.fast_ms if self._fast_requests else self.idle_ms
+
+    def position(self, max_age=None):
+        """
+        Return the latest (x, y). A new sample is taken when there is none yet,
+        or when the latest is older than max_age seconds.
+        """
+        sample = self.latest
+        if sample is None or (max_age is not None and self.clock() - sample[2] > max_age):
+            sample = self._sample()
+        return sample[0], sample[1]
+
+    # --- sampling loop ---
+    def start(self):
+        self.master.bind("<Map>", self._on_map, add="+")
+        self.poll()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _sample(self):
+        x, y = self.query()
+        sample = (x, y, self.clock())
+        self.latest = sample
+        self.samples += 1
+        return sample
+
+    def poll(self):
+        self._after_id = None
+        if self.master.state() in ("iconic", "withdrawn"):
+            # Nothing is visible to update; <Map> restarts sampling
+            self.paused = True
+            return
+        self.paused = False
+        previous = self.latest
+        try:
+            x, y, _ = self._sample()
+        except Exception as e:
+            self.error = e
+            if self.on_error is not None:
+                self.on_error(e)
+        else:
+            # After an error, subscribers get the position again even if it has not moved
+            if self.error is not None or previous is None or (previous[0], previous[1]) != (x, y):
+                self.error = None
+                for callback in self._subscribers:
+                    callback(x, y)
+        finally:
+            self._after_id = self.master.after(self.interval_ms, self.poll)
+
+    def _on_map(self, event=None):
+        if event is not None and event.widget is not self.master:
+            return
+        if self.paused and self._after_id is None:
+            self.poll()
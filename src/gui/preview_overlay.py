@@ -0,0 +1,308 @@
+"""
+Preview of action positions drawn on a single transparent overlay window.
+All markers live on one screen-sized Canvas. Updating the preview moves,
+recolours or hides existing canvas items instead of creating windows, points
+outside the screen are culled, and points closer together than a marker are
+merged into one marker showing how many actions it covers.
+The overlay must let clicks through to the windows below it, including the
+clicker's own. On Windows it is colour-keyed and marked transparent to input;
+on X11 its input shape is emptied and its visible shape cut down to the
+markers. Where neither is possible, MarkerWindows shows each marker in a
+small window of its own instead.
+"""
+import sys
+
+MARKER_SIZE = 40
+MARKER_COLOR = '#00aaff'
+BORDER_COLOR = '#005577'
+HIGHLIGHT_COLOR = '#ff8800'
+CROSSHAIR_COLOR = '#ffffff'
+# Pixels of the overlay in this colour are fully transparent
+TRANSPARENT_COLOR = '#000001'
+# Extra pixels around each marker kept visible for its count label
+LABEL_MARGIN = 10
+
+
+def cluster_positions(positions, bounds, radius=MARKER_SIZE):
+    """
+    Group (index, x, y) positions into markers.
+    Positions outside bounds (x0, y0, x1, y1) are dropped, and positions in
+    the same radius-sized grid cell are merged. Returns (markers, marker_of),
+    where each marker is [x, y, count] centred on its first position and
+    marker_of maps every kept action index to its marker number.
+    """
+    x0, y0, x1, y1 = bounds
+    cells = {}
+    markers = []
+    marker_of = {}
+    for idx, x, y in positions:
+        if not (x0 <= x < x1 and y0 <= y < y1):
+            continue
+        cell = (x // radius, y // radius)
+        number = cells.get(cell)
+        if number is None:
+            number = cells[cell] = len(markers)
+            markers.append([x, y, 0])
+        markers[number][2] += 1
+        marker_of[idx] = number
+    return markers, marker_of
+
+
+class PreviewOverlay:
+    """
+    Draws preview markers on a canvas covering bounds, reusing a pool of
+    canvas items. Call update() with new positions and highlight() with the
+    index of the running action. on_layout, if given, is called after each
+    update() with the (left, top, width, height) box of every marker, in
+    canvas coordinates.
+    """
+    def __init__(self, canvas, bounds, size=MARKER_SIZE, cluster_radius=None, on_layout=None):
+        self.canvas = canvas
+        self.bounds = bounds
+        self.size = size
+        self.cluster_radius = cluster_radius or size
+        self.on_layout = on_layout
+        # One (oval, vertical line, horizontal line, count text) tuple per slot
+        self._slots = []
+        self._visible = 0
+        self._marker_of = {}
+        self._highlighted = None
+
+    def _create_slot(self):
+        canvas = self.canvas
+        return (
+            canvas.create_oval(0, 0, 0, 0, fill=MARKER_COLOR, outline=BORDER_COLOR, width=2),
+            canvas.create_line(0, 0, 0, 0, fill=CROSSHAIR_COLOR, width=2),
+            canvas.create_line(0, 0, 0, 0, fill=CROSSHAIR_COLOR, width=2),
+            canvas.create_text(0, 0, fill=CROSSHAIR_COLOR, text=""),
+        )
+
+    def _place_slot(self, slot, x, y, count):
+        canvas = self.canvas
+        oval, vline, hline, text = slot
+        half = self.size // 2 - 2
+        x -= self.bounds[0]
+        y -= self.bounds[1]
+        canvas.coords(oval, x - half, y - half, x + half, y + half)
+        canvas.coords(vline, x, y - half, x, y + half)
+        canvas.coords(hline, x - half, y, x + half, y)
+        canvas.coords(text, x + half, y - half)
+        canvas.itemconfig(text, text=str(count) if count > 1 else "")
+        for item in slot:
+            canvas.itemconfig(item, state="normal")
+
+    def update(self, positions):
+        """
+        Show markers for an iterable of (index, x, y) positions. Existing canvas
+        items are moved; new ones are only created when more markers are needed.
+        """
+        markers, self._marker_of = cluster_positions(positions, self.bounds, self.cluster_radius)
+        while len(self._slots) < len(markers):
+            self._slots.append(self._create_slot())
+        for slot, (x, y, count) in zip(self._slots, markers):
+            self._place_slot(slot, x, y, count)
+        for slot in self._slots[len(markers):self._visible]:
+            for item in slot:
+                self.canvas.itemconfig(item, state="hidden")
+        self._visible = len(markers)
+        highlighted, self._highlighted = self._highlighted, None
+        if highlighted is not None:
+            self.canvas.itemconfig(self._slots[highlighted[0]][0], fill=MARKER_COLOR)
+            self.highlight(highlighted[1])
+        if self.on_layout is not None:
+            extent = self.size + 2 * LABEL_MARGIN
+            self.on_layout([(x - self.bounds[0] - extent // 2, y - self.bounds[1] - extent // 2, extent, extent)
+                            for x, y, _ in markers])
+
+    def highlight(self, index):
+        """Recolour the marker containing action index; None clears the highlight."""
+        number = self._marker_of.get(index)
+        current = self._highlighted
+        if current is not None and current[0] == number:
+            self._highlighted = (number, index)
+            return
+        if current is not None:
+            self.canvas.itemconfig(self._slots[current[0]][0], fill=MARKER_COLOR)
+            self._highlighted = None
+        if number is not None:
+            self.canvas.itemconfig(self._slots[number][0], fill=HIGHLIGHT_COLOR)
+            self._highlighted = (number, index)
+
+    @property
+    def marker_count(self):
+        return self._visible
+
+
+class MarkerWindows:
+    """
+    Fallback preview for platforms where a full-screen overlay cannot let
+    clicks through: each marker gets a small borderless window, taken from a
+    pool that only grows, so clicks are blocked only under the markers. It has
+    the PreviewOverlay interface plus the withdraw()/deiconify() of a window.
+    make_window(master, size) returns a (window, canvas) pair.
+    """
+    def __init__(self, master, bounds, size=MARKER_SIZE, cluster_radius=None, make_window=None):
+        self.master = master
+        self.bounds = bounds
+        self.size = size
+        self.cluster_radius = cluster_radius or size
+        self._make_window = make_window or _make_marker_window
+        # One (window, canvas, oval, count text) tuple per slot
+        self._slots = []
+        self._visible = 0
+        self._marker_of = {}
+        self._highlighted = None
+        self._shown = True
+
+    def _create_slot(self):
+        size = self.size
+        window, canvas = self._make_window(self.master, size)
+        oval = canvas.create_oval(2, 2, size - 2, size - 2, fill=MARKER_COLOR, outline=BORDER_COLOR, width=2)
+        canvas.create_line(size // 2, 2, size // 2, size - 2, fill=CROSSHAIR_COLOR, width=2)
+        canvas.create_line(2, size // 2, size - 2, size // 2, fill=CROSSHAIR_COLOR, width=2)
+        text = canvas.create_text(size - 8, 8, fill=CROSSHAIR_COLOR, text="")
+        return window, canvas, oval, text
+
+    def update(self, positions):
+        markers, self._marker_of = cluster_positions(positions, self.bounds, self.cluster_radius)
+        while len(self._slots) < len(markers):
+            self._slots.append(self._create_slot())
+        half = self.size // 2
+        for (window, canvas, oval, text), (x, y, count) in zip(self._slots, markers):
+            window.geometry(f"{self.size}x{self.size}+{x - half}+{y - half}")
+            canvas.itemconfig(text, text=str(count) if count > 1 else "")
+            canvas.itemconfig(oval, fill=MARKER_COLOR)
+            if self._shown:
+                window.deiconify()
+        for slot in self._slots[len(markers):self._visible]:
+            slot[0].withdraw()
+        self._visible = len(markers)
+        highlighted, self._highlighted = self._highlighted, None
+        if highlighted is not None:
+            self.highlight(highlighted[1])
+
+    def highlight(self, index):
+        """Recolour the marker containing action index; None clears the highlight."""
+        number = self._marker_of.get(index)
+        if self._highlighted is not None:
+            slot = self._slots[self._highlighted[0]]
+            slot[1].itemconfig(slot[2], fill=MARKER_COLOR)
+            self._highlighted = None
+        if number is not None:
+            slot = self._slots[number]
+            slot[1].itemconfig(slot[2], fill=HIGHLIGHT_COLOR)
+            self._highlighted = (number, index)
+
+    @property
+    def marker_count(self):
+        return self._visible
+
+    def withdraw(self):
+        self._shown = False
+        for slot in self._slots[:self._visible]:
+            slot[0].withdraw()
+
+    def deiconify(self):
+        self._shown = True
+        for slot in self._slots[:self._visible]:
+            slot[0].deiconify()
+
+
+def _make_marker_window(master, size):
+    from tkinter import Toplevel, Canvas, TclError
+    window = Toplevel(master)
+    window.overrideredirect(True)
+    window.attributes('-topmost', True)
+    try:
+        window.attributes('-alpha', 0.6)
+    except TclError:
+        pass
+    canvas = Canvas(window, width=size, height=size, highlightthickness=0, bg=BORDER_COLOR)
+    canvas.pack()
+    return window, canvas
+
+
+def create_overlay_window(master, size=MARKER_SIZE):
+    """
+    Create a borderless, topmost Toplevel covering the screen that lets clicks
+    through, and return (window, PreviewOverlay). Where that is not possible,
+    return a MarkerWindows as both.
+    """
+    from tkinter import Toplevel, Canvas, TclError
+    width, height = master.winfo_screenwidth(), master.winfo_screenheight()
+    bounds = (0, 0, width, height)
+    window = Toplevel(master)
+    window.overrideredirect(True)
+    window.geometry(f"{width}x{height}+0+0")
+    window.attributes('-topmost', True)
+    canvas = Canvas(window, width=width, height=height, highlightthickness=0, bg=TRANSPARENT_COLOR)
+    canvas.pack()
+    window.update_idletasks()
+    if sys.platform == "win32":
+        window.wm_attributes('-transparentcolor', TRANSPARENT_COLOR)
+        _make_click_through(window)
+        return window, PreviewOverlay(canvas, bounds, size)
+    try:
+        shape = _XShape(window)
+    except (OSError, AttributeError, ValueError, TclError):
+        window.destroy()
+        markers = MarkerWindows(master, bounds, size)
+        return markers, markers
+    # No input region at all, and only the markers visible
+    shape.set(_XShape.INPUT, [])
+    shape.set(_XShape.BOUNDING, [])
+    return window, PreviewOverlay(canvas, bounds, size, on_layout=lambda boxes: shape.set(_XShape.BOUNDING, boxes))
+
+
+def _make_click_through(window):
+    import ctypes
+    GWL_EXSTYLE = -20
+    WS_EX_LAYERED = 0x00080000
+    WS_EX_TRANSPARENT = 0x00000020
+    user32 = ctypes.windll.user32
+    hwnd = user32.GetParent(window.winfo_id())
+    style = user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+    user32.SetWindowLongW(hwnd, GWL_EXSTYLE, style | WS_EX_LAYERED | WS_EX_TRANSPARENT)
+
+
+class _XShape:
+    """
+    Sets the shape of an X11 toplevel through the SHAPE extension (libXext).
+    Raises OSError when the libraries or the display are not available, e.g.
+    on macOS.
+    """
+    BOUNDING = 0
+    INPUT = 2
+    _SHAPE_SET = 0
+    _UNSORTED = 0
+
+    def __init__(self, window):
+        import ctypes
+        import ctypes.util
+        x11_path, xext_path = ctypes.util.find_library("X11"), ctypes.util.find_library("Xext")
+        if not x11_path or not xext_path:
+            raise OSError("X11 shape extension not available")
+
+        class XRectangle(ctypes.Structure):
+            _fields_ = [("x", ctypes.c_short), ("y", ctypes.c_short),
+                        ("width", ctypes.c_ushort), ("height", ctypes.c_ushort)]
+        self._rectangle = XRectangle
+        x11 = self._x11 = ctypes.CDLL(x11_path)
+        xext = ctypes.CDLL(xext_path)
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XFlush.argtypes = [ctypes.c_void_p]
+        self._combine = xext.XShapeCombineRectangles
+        self._combine.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                  ctypes.POINTER(XRectangle), ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        # The toplevel's outer (wrapper) window, which is the one on screen
+        self._xid = int(window.wm_frame(), 16)
+        self._display = x11.XOpenDisplay(window.winfo_screen().encode())
+        if not self._display:
+            raise OSError("Cannot open the X display")
+
+    def set(self, kind, boxes):
+        rects = (self._rectangle * len(boxes))(*(self._rectangle(max(-32768, x), max(-32768, y), w, h)
+                                                 for x, y, w, h in boxes))
+        self._combine(self._display, self._xid, kind, 0, 0, rects, len(boxes), self._SHAPE_SET, self._UNSORTED)
+        self._x11.XFlush(self._display)
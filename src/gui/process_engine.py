@@ -0,0 +1,369 @@
+"""
+Out-of-process click engine.
+Runs the click mode strategies in a dedicated child process, so Tk redraws,
+the keyboard hook and garbage collection in the GUI process do not compete
+with the click loop for the GIL. The two processes share a ControlBlock, a
+multiprocessing.shared_memory block holding the run flags and live counters:
+SharedFlag and SharedRunStatus give it the threading.Event and RunStatus
+interfaces, so run_plan, the strategies and StatusPoller work on it
+unchanged, and reading progress from the GUI is a plain memory read with no
+pickling or IPC round-trip. Only the run request (config and actions) is
+pickled, once per run; a multiprocessing.Event wakes the child's waits on stop.
+"""
+import logging
+import multiprocessing
+import time
+from contextlib import nullcontext
+from multiprocessing import shared_memory
+
+from .engine import compile_plan, StreamingPlan, DEFAULT_STOP_LATENCY
+from .run_status import RunStatus
+from .scheduler import CATCH_UP_SKIP
+
+logger = logging.getLogger(__name__)
+
+# Control block layout: int64 slots followed by a UTF-8 message buffer
+(CLICKING, WAKE, STATE, GENERATION, TOTAL, EVENTS, PASSES, PROGRESS_SEQ, STEP_INDEX, STEP_REPEAT_DONE,
+ STEP_REPEAT, STEP_X, STEP_Y, FIRST_EVENT_NS, STOP_REQUESTED_NS, STOP_LATENCY_NS, MESSAGE_SEQ, MESSAGE_LEN,
+ PAUSED) = range(19)
+SLOT_COUNT = 19
+MESSAGE_BYTES = 256
+# Stored for None in the *_NS and MESSAGE_LEN slots
+NONE = -1
+# Attempts at a consistent read before falling back to the last value read,
+# so a writer that died mid-write cannot hang the reader
+READ_RETRIES = 100
+
+# Child states (STATE slot)
+IDLE = 0
+RUNNING = 1
+
+BACKENDS = ("default", "null", "recording")
+
+
+class ControlBlock:
+    """
+    Shared memory holding one run's flags and counters. Created by the GUI
+    process (name=None) and attached to by name in the child.
+    """
+    def __init__(self, name=None):
+        create = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=SLOT_COUNT * 8 + MESSAGE_BYTES)
+        self.name = self.shm.name
+        self.slots = self.shm.buf[:SLOT_COUNT * 8].cast("q")
+        self.message = self.shm.buf[SLOT_COUNT * 8:SLOT_COUNT * 8 + MESSAGE_BYTES]
+        if create:
+            for index in (FIRST_EVENT_NS, STOP_REQUESTED_NS, STOP_LATENCY_NS, MESSAGE_LEN, STEP_INDEX):
+                self.slots[index] = NONE
+
+    def close(self):
+        # Views into the buffer must be released before the mapping can be closed
+        self.slots.release()
+        self.message.release()
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class SharedFlag:
+    """
+    threading.Event-like flag in a control block slot. is_set() is a plain
+    memory read. Flags that are waited on are given a multiprocessing.Event,
+    which set() also signals so wait() returns at once.
+    """
+    def __init__(self, slots, index, event=None):
+        self._slots = slots
+        self._index = index
+        self._event = event
+
+    def is_set(self):
+        return self._slots[self._index] != 0
+
+    def set(self):
+        self._slots[self._index] = 1
+        if self._event is not None:
+            self._event.set()
+
+    def clear(self):
+        self._slots[self._index] = 0
+        if self._event is not None:
+            self._event.clear()
+
+    def wait(self, timeout=None):
+        if self.is_set():
+            return True
+        if self._event is None:
+            raise RuntimeError("This flag cannot be waited on.")
+        self._event.wait(timeout)
+        return self.is_set()
+
+
+class _StepInfo:
+    """The PlanStep fields StatusPoller and the preview need, rebuilt from the block."""
+    __slots__ = ("index", "x", "y", "repeat")
+
+    def __init__(self, index, x, y, repeat):
+        self.index = index
+        self.x = x
+        self.y = y
+        self.repeat = repeat
+
+
+def _ns_property(index):
+    def get(self):
+        value = self._slots[index]
+        return None if value == NONE else value
+
+    def set(self, value):
+        self._slots[index] = NONE if value is None else value
+    return property(get, set)
+
+
+def _int_property(index):
+    def get(self):
+        return self._slots[index]
+
+    def set(self, value):
+        self._slots[index] = value
+    return property(get, set)
+
+
+class SharedRunStatus:
+    """
+    RunStatus kept in a ControlBlock. Progress and message span several slots,
+    so they are written under a sequence counter (odd while a write is in
+    progress) and readers retry until they see a stable copy, up to
+    READ_RETRIES times, after which they return the last value read. Reads
+    return the same object until the value changes, as StatusPoller expects. Messages are
+    written under lock, since both processes set them.
+    """
+    generation = _int_property(GENERATION)
+    total = _int_property(TOTAL)
+    events = _int_property(EVENTS)
+    passes = _int_property(PASSES)
+    first_event_ns = _ns_property(FIRST_EVENT_NS)
+    stop_requested_ns = _ns_property(STOP_REQUESTED_NS)
+    stop_latency_ns = _ns_property(STOP_LATENCY_NS)
+
+    def __init__(self, block, lock):
+        self._slots = block.slots
+        self._message_buf = block.message
+        self._lock = lock
+        self._progress_key = None
+        self._progress = None
+        self._message_seq = None
+        self._message = None
+
+    def reset(self, total=0):
+        self.generation += 1
+        self.progress = None
+        self.message = None
+        self.total = total
+        self.events = 0
+        self.passes = 0
+        self.first_event_ns = None
+        self.stop_requested_ns = None
+        self.stop_latency_ns = None
+
+    @property
+    def progress(self):
+        slots = self._slots
+        for _ in range(READ_RETRIES):
+            seq = slots[PROGRESS_SEQ]
+            key = (slots[STEP_INDEX], slots[STEP_REPEAT_DONE], slots[STEP_REPEAT], slots[STEP_X], slots[STEP_Y])
+            if not seq & 1 and slots[PROGRESS_SEQ] == seq:
+                break
+        else:
+            return self._progress
+        if key != self._progress_key:
+            self._progress_key = key
+            index, repeat_number, repeat, x, y = key
+            self._progress = None if index == NONE else (_StepInfo(index, x, y, repeat), repeat_number)
+        return self._progress
+
+    @progress.setter
+    def progress(self, value):
+        slots = self._slots
+        slots[PROGRESS_SEQ] += 1
+        if value is None:
+            slots[STEP_INDEX] = NONE
+        else:
+            step, repeat_number = value
+            slots[STEP_INDEX] = step.index
+            slots[STEP_REPEAT_DONE] = repeat_number
+            slots[STEP_REPEAT] = step.repeat
+            slots[STEP_X] = step.x
+            slots[STEP_Y] = step.y
+        slots[PROGRESS_SEQ] += 1
+
+    @property
+    def message(self):
+        slots = self._slots
+        for _ in range(READ_RETRIES):
+            seq = slots[MESSAGE_SEQ]
+            if seq == self._message_seq:
+                return self._message
+            length = slots[MESSAGE_LEN]
+            data = bytes(self._message_buf[:length]) if length != NONE else None
+            if not seq & 1 and slots[MESSAGE_SEQ] == seq:
+                break
+        else:
+            return self._message
+        self._message_seq = seq
+        self._message = data.decode("utf-8", "ignore") if data is not None else None
+        return self._message
+
+    @message.setter
+    def message(self, value):
+        data = value.encode("utf-8")[:MESSAGE_BYTES] if value is not None else None
+        with self._lock:
+            slots = self._slots
+            slots[MESSAGE_SEQ] += 1
+            if data is None:
+                slots[MESSAGE_LEN] = NONE
+            else:
+                self._message_buf[:len(data)] = data
+                slots[MESSAGE_LEN] = len(data)
+            slots[MESSAGE_SEQ] += 1
+
+    format_progress = RunStatus.format_progress
+
+
+def _make_backend(name):
+    from .input_backend import NullBackend, RecordingBackend
+    if name == "null":
+        return NullBackend()
+    if name == "recording":
+        return RecordingBackend()
+    return None
+
+
+def _run_request(logic, block, request, results):
+    from .action_list import ActionList, ACTIONS_REGISTRY
+    from .click_mode_strategy import get_click_mode_strategy
+    config, actions, stream, backend_name, catch_up, stop_latency, profile = request
+    logic.catch_up_policy = catch_up
+    logic.stop_latency = stop_latency
+    backend = _make_backend(backend_name)
+    try:
+        if stream is not None:
+            path, count = stream
+            action_list = ActionList()
+            plan = StreamingPlan(lambda: action_list.iter_file(path), ACTIONS_REGISTRY, backend, total=count,
+                                 cancel=logic.is_waiting_event)
+        else:
+            plan = compile_plan(actions, ACTIONS_REGISTRY, backend, cancel=logic.is_waiting_event)
+        strategy = get_click_mode_strategy(config.mode)
+        if strategy.prepare(logic, config):
+            with profile if profile is not None else nullcontext():
+                strategy.run(logic, plan)
+            if profile is not None:
+                (logger.warning if profile.skipped else logger.info)(profile.report())
+    except Exception as e:
+        # Unlike a click thread, the child serves later runs too, so it must not die here
+        logic.stop_clicking()
+        logic.status.message = f"Error running actions: {e}"
+    finally:
+        block.slots[STATE] = IDLE
+        if backend_name == "recording":
+            results.put(backend.timestamps[:backend.count].tobytes())
+
+
+def _worker(name, wake, lock, requests, results):
+    """Child process entry point: serve run requests until None is received."""
+    from .cli import HeadlessLogic
+    block = ControlBlock(name)
+    try:
+        logic = HeadlessLogic()
+        logic.is_clicking_event = SharedFlag(block.slots, CLICKING)
+        logic.is_waiting_event = SharedFlag(block.slots, WAKE, wake)
+        logic.is_paused_event = SharedFlag(block.slots, PAUSED)
+        logic.status = SharedRunStatus(block, lock)
+        while True:
+            request = requests.get()
+            if request is None:
+                return
+            _run_request(logic, block, request, results)
+    finally:
+        block.close()
+
+
+class EngineProcess:
+    """
+    Handle on the engine's child process. is_clicking_event, is_waiting_event,
+    is_paused_event and status are the shared run state; a controller sets them exactly as for
+    the in-process engine and calls run() instead of starting a thread.
+    With backend "recording", each run's event timestamps (array("q") bytes)
+    are put on results when it ends.
+    """
+    def __init__(self, context=None):
+        self._context = context or multiprocessing.get_context("spawn")
+        self.block = ControlBlock()
+        self._wake = self._context.Event()
+        self._lock = self._context.Lock()
+        self.is_clicking_event = SharedFlag(self.block.slots, CLICKING)
+        self.is_waiting_event = SharedFlag(self.block.slots, WAKE, self._wake)
+        self.is_paused_event = SharedFlag(self.block.slots, PAUSED)
+        self.status = SharedRunStatus(self.block, self._lock)
+        self._requests = self._context.SimpleQueue()
+        self.results = self._context.SimpleQueue()
+        self.process = None
+
+    def spawn(self):
+        """Start the child process; run() calls this if it has not been done yet."""
+        if self.process is None:
+            self.process = self._context.Process(
+                target=_worker, args=(self.block.name, self._wake, self._lock, self._requests, self.results),
+                name="click-engine", daemon=True)
+            self.process.start()
+
+    @property
+    def running(self):
+        return self.block.slots[STATE] == RUNNING
+
+    def wait_idle(self, timeout):
+        """Wait up to timeout seconds for the current run to end. Returns True once idle."""
+        if not self.running:
+            return True
+        return self._wait_state(IDLE, timeout)
+
+    def _wait_state(self, state, timeout):
+        deadline = time.perf_counter() + timeout
+        while self.block.slots[STATE] != state:
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def run(self, config, actions=None, stream=None, backend="default", catch_up_policy=CATCH_UP_SKIP,
+            stop_latency=DEFAULT_STOP_LATENCY, profile=None):
+        """
+        Start a run of config on actions (action dicts) or stream ((path, count)
+        of a script read during the run), under profile (a LowJitterProfile)
+        if given. The caller has reset status and set is_clicking_event.
+        Raises RuntimeError if the child has died.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.spawn()
+        if not self.process.is_alive():
+            raise RuntimeError("The engine process has exited.")
+        self.block.slots[STATE] = RUNNING
+        self._requests.put((config, None if stream else list(actions or ()), stream, backend,
+                            catch_up_policy, stop_latency, profile))
+
+    def close(self, timeout=1.0):
+        """Stop any run, end the child process and free the control block."""
+        self.is_clicking_event.clear()
+        self.is_paused_event.clear()
+        self.is_waiting_event.set()
+        if self.process is not None:
+            if self.process.is_alive():
+                self._requests.put(None)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self.block.close()
+        self.block.unlink()
@@ -0,0 +1,219 @@
+"""
+Macro recorder turning real mouse input into actions.
+Input hooks append (timestamp_ns, kind, x, y) events to a preallocated ring
+buffer; nothing else happens on the hook threads. On stop, to_actions()
+converts the capture into action dicts with the real intervals between
+events, simplifying movement paths with Ramer-Douglas-Peucker so long
+recordings stay compact. Tests and tools can feed synthetic events through
+record() without installing any hook.
+"""
+import threading
+import time
+from array import array
+
+MOVE = 0
+DOWN = 1
+UP = 2
+KEY_DOWN = 3
+KEY_UP = 4
+
+# Largest distance (pixels) a dropped path point may be from the simplified path
+DEFAULT_TOLERANCE = 2.0
+# Two clicks at the same spot closer together than this become a double click
+DOUBLE_CLICK_NS = 300_000_000
+# A press held longer than this becomes a "press and hold" action
+HOLD_NS = 250_000_000
+# Smallest interval given to a recorded action (intervals must be positive)
+MIN_INTERVAL = 0.001
+
+
+def simplify_path(points, tolerance=DEFAULT_TOLERANCE):
+    """
+    Ramer-Douglas-Peucker simplification of a list of (x, y, ...) points.
+    Returns the sorted indexes of the points to keep; the first and last are always kept.
+    """
+    n = len(points)
+    if n <= 2:
+        return list(range(n))
+    keep = bytearray(n)
+    keep[0] = keep[n - 1] = 1
+    tolerance_sq = tolerance * tolerance
+    # Explicit stack instead of recursion, so long paths cannot hit the recursion limit
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        x0, y0 = points[first][0], points[first][1]
+        dx, dy = points[last][0] - x0, points[last][1] - y0
+        length_sq = dx * dx + dy * dy
+        farthest, farthest_sq = None, tolerance_sq
+        for i in range(first + 1, last):
+            px, py = points[i][0] - x0, points[i][1] - y0
+            if length_sq:
+                cross = px * dy - py * dx
+                dist_sq = cross * cross / length_sq
+            else:
+                dist_sq = px * px + py * py
+            if dist_sq > farthest_sq:
+                farthest, farthest_sq = i, dist_sq
+        if farthest is not None:
+            keep[farthest] = 1
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [i for i in range(n) if keep[i]]
+
+
+class MacroRecorder:
+    """
+    Records input events into a ring buffer of the given capacity; once full,
+    the oldest events are overwritten and counted in overwritten.
+    Call start() to hook the real mouse and keyboard, stop() to unhook them.
+    """
+    def __init__(self, capacity=1 << 20, clock=time.perf_counter_ns):
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive.")
+        self.capacity = capacity
+        self.timestamps = array("q", bytes(8 * capacity))
+        self.kinds = array("b", bytes(capacity))
+        self.xs = array("i", bytes(4 * capacity))
+        self.ys = array("i", bytes(4 * capacity))
+        self.count = 0
+        self.overwritten = 0
+        self.recording = False
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._position = (0, 0)
+        self._hooks = []
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def record(self, kind, x, y, timestamp_ns=None):
+        """Append one event; called from the hook threads."""
+        if timestamp_ns is None:
+            timestamp_ns = self._clock()
+        with self._lock:
+            i = self.count % self.capacity
+            if self.count >= self.capacity:
+                self.overwritten += 1
+            self.timestamps[i] = timestamp_ns
+            self.kinds[i] = kind
+            self.xs[i] = x
+            self.ys[i] = y
+            self.count += 1
+
+    def clear(self):
+        with self._lock:
+            self.count = 0
+            self.overwritten = 0
+
+    def events(self):
+        """Return the buffered (timestamp_ns, kind, x, y) events, oldest first."""
+        with self._lock:
+            n = len(self)
+            start = self.count % self.capacity if self.count > self.capacity else 0
+            order = list(range(start, n)) + list(range(0, start))
+            return [(self.timestamps[i], self.kinds[i], self.xs[i], self.ys[i]) for i in order]
+
+    # --- hooks ---
+    def start(self, position=None):
+        """
+        Clear the buffer and hook the mouse (requires the 'mouse' package) and keyboard.
+        position is the current cursor position, used until the first move event.
+        """
+        import mouse
+        import keyboard
+        self.clear()
+        self._position = tuple(position) if position else mouse.get_position()
+        self._hooks = [(mouse.unhook, mouse.hook(self._on_mouse)),
+                       (keyboard.unhook, keyboard.hook(self._on_key))]
+        self.recording = True
+
+    def stop(self):
+        for unhook, handle in self._hooks:
+            unhook(handle)
+        self._hooks = []
+        self.recording = False
+
+    def _on_mouse(self, event):
+        import mouse
+        if isinstance(event, mouse.MoveEvent):
+            self._position = (event.x, event.y)
+            self.record(MOVE, event.x, event.y)
+        elif isinstance(event, mouse.ButtonEvent) and event.button == mouse.LEFT:
+            x, y = self._position
+            if event.event_type == mouse.UP:
+                self.record(UP, x, y)
+            else:
+                # The second press of a double click arrives as "double"
+                self.record(DOWN, x, y)
+
+    def _on_key(self, event):
+        self.record(KEY_DOWN if event.event_type == "down" else KEY_UP, event.scan_code or 0, 0)
+
+    # --- conversion ---
+    def to_actions(self, events=None, tolerance=DEFAULT_TOLERANCE, drop_last_click=False):
+        """
+        Convert recorded events (by default the buffer) into action dicts.
+        drop_last_click removes the final press, e.g. the click on a Stop button.
+        """
+        if events is None:
+            events = self.events()
+        if drop_last_click:
+            for i in range(len(events) - 1, -1, -1):
+                if events[i][1] == DOWN:
+                    events = events[:i]
+                    break
+        return events_to_actions(events, tolerance)
+
+
+def events_to_actions(events, tolerance=DEFAULT_TOLERANCE):
+    """
+    Convert (timestamp_ns, kind, x, y) events into action dicts.
+    Each action's interval is the time until the next action starts. Moves are
+    simplified per path between presses; moves while the button is held, key
+    events and unmatched releases are not converted.
+    """
+    # [start_ns, end_ns, type, x, y, duration] in time order; end_ns is when the
+    # replayed action returns, which is start_ns except for press and hold.
+    # The engine schedules each action from the start of the one before, so
+    # intervals run start to start and a hold takes up part of its own
+    steps = []
+    path = []
+    pressed = None
+
+    def flush_path():
+        for i in simplify_path(path, tolerance):
+            t, x, y = path[i][2], path[i][0], path[i][1]
+            steps.append([t, t, "move", x, y, 0.0])
+        path.clear()
+
+    for t, kind, x, y in events:
+        if kind == MOVE:
+            if pressed is None:
+                path.append((x, y, t))
+        elif kind == DOWN:
+            flush_path()
+            pressed = (t, x, y)
+        elif kind == UP and pressed is not None:
+            down_t, down_x, down_y = pressed
+            pressed = None
+            if t - down_t > HOLD_NS:
+                steps.append([down_t, t, "press and hold", down_x, down_y, (t - down_t) / 1e9])
+                continue
+            last = steps[-1] if steps else None
+            if last and last[2] == "click" and (last[3], last[4]) == (down_x, down_y) \
+                    and down_t - last[0] <= DOUBLE_CLICK_NS:
+                last[2] = "double click"
+            else:
+                steps.append([down_t, down_t, "click", down_x, down_y, 0.0])
+    flush_path()
+
+    actions = []
+    for i, (start, end, action_type, x, y, duration) in enumerate(steps):
+        next_start = steps[i + 1][0] if i + 1 < len(steps) else end
+        action = {"x": x, "y": y, "interval": max(MIN_INTERVAL, (next_start - start) / 1e9),
+                  "type": action_type, "repeat": 1}
+        if duration:
+            action["duration"] = duration
+        actions.append(action)
+    return actions
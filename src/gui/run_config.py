@@ -0,0 +1,20 @@
+"""
+GUI-free description of a run, passed to the click mode strategies.
+Values may be raw strings from entry widgets or command-line arguments;
+the strategies validate them in prepare().
+"""
+
+RUN_MODES = ("indefinite", "duration", "executions")
+
+
+class RunConfig:
+    """
+    Run mode plus its limits: duration in seconds for "duration" mode,
+    number of passes over the actions for "executions" mode.
+    """
+    __slots__ = ("mode", "duration", "executions")
+
+    def __init__(self, mode="indefinite", duration=None, executions=None):
+        self.mode = mode
+        self.duration = duration
+        self.executions = executions
@@ -0,0 +1,120 @@
+"""
+Low-jitter run profile for the click thread.
+Used as a context manager around a run, LowJitterProfile removes the main
+sources of multi-millisecond spikes in the click cadence:
+- the cyclic garbage collector is frozen and disabled for the run
+- the thread can be pinned to a set of CPUs so it is not migrated
+- the thread can ask for a better nice value or a real-time (SCHED_FIFO)
+  policy, or on Windows a higher thread priority
+Every step is optional and skipped with a reason when the platform or the
+process's permissions do not allow it; everything applied is undone on exit.
+Affinity and priority apply to the thread that enters the profile.
+"""
+import gc
+import os
+import sys
+import threading
+
+
+class LowJitterProfile:
+    """
+    cpus: iterable of CPU numbers to pin the thread to (Linux), or None.
+    nice: nice value to request (lower is higher priority), or None.
+    realtime_priority: SCHED_FIFO priority (1-99) to request, or None.
+    After entering, applied lists what took effect and skipped what did not, with reasons.
+    """
+    def __init__(self, freeze_gc=True, cpus=None, nice=None, realtime_priority=None):
+        self.freeze_gc = freeze_gc
+        self.cpus = set(cpus) if cpus is not None else None
+        self.nice = nice
+        self.realtime_priority = realtime_priority
+        self.applied = []
+        self.skipped = []
+        self._undo = []
+
+    def __enter__(self):
+        self.applied = []
+        self.skipped = []
+        self._undo = []
+        if self.freeze_gc:
+            self._apply("gc", self._freeze_gc)
+        if self.cpus is not None:
+            self._apply("affinity", self._pin)
+        if self.nice is not None:
+            self._apply("nice", self._set_nice)
+        if self.realtime_priority is not None:
+            self._apply("realtime", self._set_realtime)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        while self._undo:
+            try:
+                self._undo.pop()()
+            except OSError:
+                pass
+        return False
+
+    def report(self):
+        parts = [f"applied {', '.join(self.applied) or 'nothing'}"]
+        if self.skipped:
+            parts.append("skipped " + ", ".join(f"{name} ({reason})" for name, reason in self.skipped))
+        return "Low-jitter profile: " + "; ".join(parts)
+
+    def _apply(self, name, step):
+        try:
+            step()
+        except (OSError, AttributeError, NotImplementedError, ValueError) as e:
+            self.skipped.append((name, str(e) or type(e).__name__))
+        else:
+            self.applied.append(name)
+
+    def _freeze_gc(self):
+        was_enabled = gc.isenabled()
+        # Collect now and move survivors out of the tracked generations, so
+        # re-enabling later does not face one huge collection
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+
+        def undo():
+            gc.unfreeze()
+            if was_enabled:
+                gc.enable()
+        self._undo.append(undo)
+
+    def _pin(self):
+        if not hasattr(os, "sched_setaffinity"):
+            raise NotImplementedError("not supported on this platform")
+        previous = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, self.cpus)
+        self._undo.append(lambda: os.sched_setaffinity(0, previous))
+
+    def _set_nice(self):
+        if sys.platform == "win32":
+            self._set_windows_priority()
+            return
+        if not hasattr(os, "setpriority"):
+            raise NotImplementedError("not supported on this platform")
+        # On Linux the nice value of a thread id applies to that thread only
+        who = threading.get_native_id() if sys.platform.startswith("linux") else 0
+        previous = os.getpriority(os.PRIO_PROCESS, who)
+        os.setpriority(os.PRIO_PROCESS, who, self.nice)
+        self._undo.append(lambda: os.setpriority(os.PRIO_PROCESS, who, previous))
+
+    def _set_windows_priority(self):
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        thread = kernel32.GetCurrentThread()
+        previous = kernel32.GetThreadPriority(thread)
+        # THREAD_PRIORITY_HIGHEST for any requested boost
+        if not kernel32.SetThreadPriority(thread, 2):
+            raise OSError("SetThreadPriority failed")
+        self._undo.append(lambda: kernel32.SetThreadPriority(thread, previous))
+
+    def _set_realtime(self):
+        if not hasattr(os, "sched_setscheduler"):
+            raise NotImplementedError("not supported on this platform")
+        policy = os.sched_getscheduler(0)
+        param = os.sched_getparam(0)
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.realtime_priority))
+        self._undo.append(lambda: os.sched_setscheduler(0, policy, param))
@@ -0,0 +1,250 @@
+"""
+Per-action timing statistics of a run.
+The engine records, for every event, how long the action's backend call took
+and how far its start was from the scheduled deadline. Both go into
+fixed-memory log-bucketed (HDR-style) histograms, overall and per action
+type, and into per-step columns (count, total and max) sized once at the
+start of the run for at most MAX_STEPS steps, so memory grows with neither
+run length nor script length. The slowest steps are ranked as events are
+recorded, so the Tk loop reads the live summary for the statistics panel
+without scanning the steps; save() exports the run as JSON or CSV.
+"""
+import csv
+import heapq
+import json
+import time
+from array import array
+
+# Steps with per-step statistics; later steps of longer (e.g. streamed)
+# scripts only count towards the overall and per-type histograms
+MAX_STEPS = 65_536
+
+
+class LogHistogram:
+    """
+    Histogram of non-negative integers (nanoseconds) in fixed memory. Each power
+    of two is split into 2**(precision-1) buckets, so values are reported within
+    about 1/2**(precision-1) of their true size; values above max_value are
+    counted in the last bucket.
+    """
+    def __init__(self, precision=5, max_value=1 << 40):
+        self.precision = precision
+        self._sub = 1 << precision
+        self._half = self._sub >> 1
+        self.max_value = max_value
+        self.counts = array("Q", bytes(8 * (self._index(max_value) + 1)))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value):
+        if value < self._sub:
+            return value
+        shift = value.bit_length() - self.precision
+        return self._sub + (shift - 1) * self._half + ((value >> shift) - self._half)
+
+    def _value_at(self, index):
+        """Midpoint of the values counted in bucket index."""
+        if index < self._sub:
+            return index
+        shift, offset = divmod(index - self._sub, self._half)
+        shift += 1
+        return ((offset + self._half) << shift) + ((1 << shift) >> 1)
+
+    def record(self, value):
+        if value < 0:
+            value = 0
+        elif value > self.max_value:
+            value = self.max_value
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """Value at or below which pct percent of the recorded values fall (0 if empty)."""
+        if not self.count:
+            return 0
+        target = max(1, -(-self.count * pct // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value_at(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        return {"count": self.count, "mean": self.mean(), "p50": self.percentile(50),
+                "p90": self.percentile(90), "p99": self.percentile(99), "max": self.max}
+
+
+class RunStats:
+    """
+    Timing statistics of one run, filled in by run_plan from the click thread.
+    top is the number of steps listed by slowest(); max_steps caps the steps
+    given per-step statistics.
+    """
+    STEP_COLUMNS = ("count", "latency_total", "latency_max", "error_total", "error_max")
+
+    def __init__(self, top=5, max_steps=MAX_STEPS):
+        self.top = top
+        self.max_steps = max_steps
+        self.reset()
+
+    def reset(self, steps=0):
+        self.untracked_steps = max(0, steps - self.max_steps)
+        steps -= self.untracked_steps
+        self.latency = LogHistogram()
+        self.error = LogHistogram()
+        # type -> (latency histogram, error histogram)
+        self.types = {}
+        self.type_names = []
+        self.step_types = array("H", bytes(2 * steps))
+        for name in self.STEP_COLUMNS:
+            setattr(self, name, array("Q", bytes(8 * steps)))
+        # Indexes of the steps with the most total backend time, in no order
+        self._top = []
+        self.started_ns = time.perf_counter_ns()
+        self.last_event_ns = self.started_ns
+
+    def record(self, step, start_error_ns, latency_ns):
+        """Record one event of step: its start error against the deadline and its backend call time."""
+        if start_error_ns < 0:
+            start_error_ns = 0
+        self.latency.record(latency_ns)
+        self.error.record(start_error_ns)
+        histograms = self.types.get(step.type)
+        if histograms is None:
+            histograms = self.types[step.type] = (LogHistogram(), LogHistogram())
+            self.type_names.append(step.type)
+        histograms[0].record(latency_ns)
+        histograms[1].record(start_error_ns)
+        index = step.index
+        if index < len(self.count):
+            self.step_types[index] = self.type_names.index(step.type)
+            self.count[index] += 1
+            self.latency_total[index] += latency_ns
+            self.error_total[index] += start_error_ns
+            if latency_ns > self.latency_max[index]:
+                self.latency_max[index] = latency_ns
+            if start_error_ns > self.error_max[index]:
+                self.error_max[index] = start_error_ns
+            # Totals only grow, so only the step just recorded can enter the ranking
+            top = self._top
+            if index not in top:
+                if len(top) < self.top:
+                    top.append(index)
+                else:
+                    totals = self.latency_total
+                    low = min(top, key=totals.__getitem__)
+                    if totals[index] > totals[low]:
+                        top[top.index(low)] = index
+        self.last_event_ns = time.perf_counter_ns()
+
+    @property
+    def events(self):
+        return self.latency.count
+
+    def events_per_second(self):
+        elapsed = self.last_event_ns - self.started_ns
+        return self.events / (elapsed / 1e9) if elapsed > 0 else 0.0
+
+    def step(self, index):
+        """Statistics of one step as a dict (means in nanoseconds)."""
+        count = self.count[index]
+        return {
+            "index": index,
+            "type": self.type_names[self.step_types[index]] if count else None,
+            "count": count,
+            "latency_mean": self.latency_total[index] / count if count else 0.0,
+            "latency_max": self.latency_max[index],
+            "latency_total": self.latency_total[index],
+            "error_mean": self.error_total[index] / count if count else 0.0,
+            "error_max": self.error_max[index],
+        }
+
+    def slowest(self, n=None):
+        """The steps with the most total backend time, slowest first."""
+        totals = self.latency_total
+        n = n or self.top
+        if n <= self.top:
+            indexes = sorted(self._top, key=totals.__getitem__, reverse=True)[:n]
+        else:
+            indexes = heapq.nlargest(n, range(len(totals)), key=totals.__getitem__)
+        return [self.step(i) for i in indexes if self.count[i]]
+
+    def format_summary(self):
+        return (f"{self.events_per_second():.1f} events/s  "
+                f"start error p50 {self.error.percentile(50) / 1000:.0f} us, "
+                f"p99 {self.error.percentile(99) / 1000:.0f} us  "
+                f"call p99 {self.latency.percentile(99) / 1000:.0f} us")
+
+    def format_slowest(self):
+        return "\n".join(f"#{s['index'] + 1} {s['type']}: {s['latency_mean'] / 1000:.0f} us avg, "
+                         f"{s['latency_max'] / 1000:.0f} us max, {s['count']} events"
+                         for s in self.slowest())
+
+    def to_dict(self):
+        return {
+            "events": self.events,
+            "duration_s": (self.last_event_ns - self.started_ns) / 1e9,
+            "events_per_s": self.events_per_second(),
+            "latency_ns": self.latency.summary(),
+            "start_error_ns": self.error.summary(),
+            "types": {name: {"latency_ns": latency.summary(), "start_error_ns": error.summary()}
+                      for name, (latency, error) in self.types.items()},
+            "steps": [self.step(i) for i in range(len(self.count)) if self.count[i]],
+            "untracked_steps": self.untracked_steps,
+        }
+
+    def save(self, file_path):
+        """Write the statistics to file_path: per-step rows for .csv, everything as JSON otherwise."""
+        if file_path.lower().endswith(".csv"):
+            fields = ["index", "type", "count", "latency_mean", "latency_max", "latency_total",
+                      "error_mean", "error_max"]
+            with open(file_path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for i in range(len(self.count)):
+                    if self.count[i]:
+                        writer.writerow(self.step(i))
+        else:
+            with open(file_path, "w") as f:
+                json.dump(self.to_dict(), f, indent=2)
+
+
+# Refresh rate of the statistics panel
+STATS_REFRESH_HZ = 2
+
+
+class StatsPoller:
+    """
+    Copies a RunStats summary and its slowest steps into two labels from the
+    Tk loop via master.after, refresh_hz times per second, only when new
+    events have been recorded.
+    """
+    def __init__(self, master, summary_label, slowest_label, stats, refresh_hz=STATS_REFRESH_HZ):
+        if refresh_hz <= 0:
+            raise ValueError("Refresh rate must be positive.")
+        self.master = master
+        self.summary_label = summary_label
+        self.slowest_label = slowest_label
+        self.stats = stats
+        self.refresh_hz = refresh_hz
+        self._events = 0
+
+    def start(self):
+        self.poll()
+
+    def poll(self):
+        stats = self.stats
+        if stats.events != self._events:
+            self._events = stats.events
+            if self._events:
+                self.summary_label.config(text=stats.format_summary())
+                self.slowest_label.config(text=stats.format_slowest())
+        self.master.after(int(1000 / self.refresh_hz), self.poll)
@@ -0,0 +1,85 @@
+"""
+Run status shared between the click thread and the Tk main loop.
+The click thread only assigns attributes (a single atomic store each), and the
+Tk loop reads them at a fixed frame rate, so no Tk call is made per click.
+"""
+
+# Default label refresh rate while the window is open
+STATUS_REFRESH_HZ = 20
+
+
+class RunStatus:
+    """
+    Latest progress and message of the current run.
+    progress is a (PlanStep, repeat_number) tuple replaced on every event and
+    events counts the events of the run, passes the completed passes over
+    the plan, and first_event_ns is the
+    perf_counter_ns time the first one was emitted; stop_requested_ns is when
+    a stop was requested and stop_latency_ns how long the engine took to halt;
+    message, once set, takes priority over progress until the next reset().
+    """
+    __slots__ = ("progress", "message", "total", "generation", "events", "passes", "first_event_ns",
+                 "stop_requested_ns", "stop_latency_ns")
+
+    def __init__(self):
+        self.generation = 0
+        self.reset()
+
+    def reset(self, total=0):
+        self.generation += 1
+        self.progress = None
+        self.message = None
+        self.total = total
+        self.events = 0
+        self.passes = 0
+        self.first_event_ns = None
+        self.stop_requested_ns = None
+        self.stop_latency_ns = None
+
+    def format_progress(self, progress):
+        step, repeat_number = progress
+        return f"Running action {step.index+1}/{self.total} (repeat {repeat_number}/{step.repeat}) at ({step.x},{step.y})"
+
+
+class StatusPoller:
+    """
+    Copies RunStatus into a label from the Tk loop via master.after, at most
+    refresh_hz times per second and only when the status has changed.
+    on_progress, if given, is called with each new progress (None at the start of a run).
+    """
+    def __init__(self, master, label, status, refresh_hz=STATUS_REFRESH_HZ, on_progress=None):
+        if refresh_hz <= 0:
+            raise ValueError("Refresh rate must be positive.")
+        self.master = master
+        self.label = label
+        self.status = status
+        self.refresh_hz = refresh_hz
+        self.on_progress = on_progress
+        self._generation = None
+        self._last_progress = None
+        self._last_message = None
+
+    def start(self):
+        self.poll()
+
+    def poll(self):
+        status = self.status
+        if status.generation != self._generation:
+            self._generation = status.generation
+            self._last_progress = None
+            self._last_message = None
+            if self.on_progress:
+                self.on_progress(None)
+        message = status.message
+        if message is not None:
+            if message is not self._last_message:
+                self._last_message = message
+                self.label.config(text=message)
+        else:
+            progress = status.progress
+            if progress is not None and progress is not self._last_progress:
+                self._last_progress = progress
+                self.label.config(text=status.format_progress(progress))
+                if self.on_progress:
+                    self.on_progress(progress)
+        self.master.after(int(1000 / self.refresh_hz), self.poll)
@@ -0,0 +1,123 @@
+"""
+Opt-in timeline tracing of a run.
+When logic.run_trace is set, run_plan records a span for each action call,
+condition poll, interval wait and pass over the plan into a RunTrace: a ring
+buffer of preallocated arrays, so a long run keeps only its most recent
+capacity spans and recording allocates nothing per event. With tracing off,
+run_plan calls the untraced functions directly and pays nothing.
+write() dumps the buffer as Chrome trace-event JSON, which Perfetto
+(ui.perfetto.dev) and chrome://tracing open as a timeline.
+"""
+import os
+import threading
+import time
+from array import array
+
+# Spans kept by default; older ones are overwritten
+DEFAULT_TRACE_CAPACITY = 1 << 16
+
+# Span names that are not action types
+WAIT = "wait"
+POLL = "poll"
+PASS = "pass"
+
+# Stored for spans without a step index
+NO_ARG = -1
+
+
+class RunTrace:
+    """
+    Ring buffer of (name, start, end, arg) spans on the perf_counter_ns clock.
+    arg is the step index for action, poll and wait spans and the pass number
+    for pass spans. recorded counts every span added since the last reset().
+    """
+    def __init__(self, capacity=DEFAULT_TRACE_CAPACITY, clock=time.perf_counter_ns):
+        if capacity <= 0:
+            raise ValueError("Trace capacity must be positive.")
+        self.capacity = capacity
+        self._clock = clock
+        self.names = array("H", bytes(2 * capacity))
+        self.starts = array("q", bytes(8 * capacity))
+        self.ends = array("q", bytes(8 * capacity))
+        self.args = array("q", bytes(8 * capacity))
+        self._name_ids = {}
+        self.name_table = []
+        self.reset()
+
+    def reset(self):
+        """Forget every span and take the calling thread as the traced one."""
+        self._next = 0
+        self.recorded = 0
+        self.origin_ns = self._clock()
+        self.tid = threading.get_native_id()
+
+    def intern(self, name):
+        """Return the id under which spans named name are stored."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.name_table)
+            self.name_table.append(name)
+        return name_id
+
+    def add(self, name_id, start_ns, end_ns, arg=NO_ARG):
+        i = self._next
+        self.names[i] = name_id
+        self.starts[i] = start_ns
+        self.ends[i] = end_ns
+        self.args[i] = arg
+        i += 1
+        self._next = 0 if i == self.capacity else i
+        self.recorded += 1
+
+    def wrap(self, name, func, arg=NO_ARG):
+        """Return func wrapped to record a span named name around every call."""
+        name_id = self.intern(name)
+        add = self.add
+        clock = self._clock
+
+        def traced(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(name_id, start, clock(), arg)
+        return traced
+
+    def __len__(self):
+        return min(self.recorded, self.capacity)
+
+    @property
+    def dropped(self):
+        """Spans overwritten because the buffer was full."""
+        return self.recorded - len(self)
+
+    def spans(self):
+        """Yield the kept (name, start_ns, end_ns, arg) spans, oldest first."""
+        count = len(self)
+        first = self._next if self.recorded > self.capacity else 0
+        for n in range(count):
+            i = (first + n) % self.capacity
+            yield self.name_table[self.names[i]], self.starts[i], self.ends[i], self.args[i]
+
+    def to_chrome_trace(self):
+        """The kept spans as a Chrome trace-event dict (complete "X" events, microseconds)."""
+        pid = os.getpid()
+        origin = self.origin_ns
+        events = [
+            {"ph": "M", "name": "process_name", "pid": pid, "tid": self.tid, "args": {"name": "auto clicker"}},
+            {"ph": "M", "name": "thread_name", "pid": pid, "tid": self.tid, "args": {"name": "click loop"}},
+        ]
+        for name, start, end, arg in self.spans():
+            event = {"ph": "X", "name": name, "cat": name if name in (WAIT, POLL, PASS) else "action",
+                     "pid": pid, "tid": self.tid, "ts": (start - origin) / 1000, "dur": (end - start) / 1000}
+            if arg != NO_ARG:
+                event["args"] = {"pass" if name == PASS else "step": arg}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"recorded": self.recorded, "dropped": self.dropped}}
+
+    def write(self, file_path):
+        # The engine imports this module on every run; json is only needed here
+        import json
+        with open(file_path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
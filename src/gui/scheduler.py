@@ -0,0 +1,103 @@
+"""
+Deadline scheduler for the run engine.
+Tracks absolute deadlines on the monotonic perf_counter_ns clock so the time
+spent executing actions does not add to each interval, and waits with a
+coarse event wait followed by a short spin so sub-millisecond intervals are met.
+Condition polling also goes through the scheduler, so time spent waiting for
+a condition shifts the schedule instead of counting as lateness.
+"""
+import sys
+import time
+
+# Catch-up policies for when the engine falls behind its deadlines
+CATCH_UP_SKIP = "skip"    # drop missed slots and re-anchor on the current time
+CATCH_UP_BURST = "burst"  # keep the original deadlines and run late events back to back
+
+# Final stretch of each wait that is spun instead of slept. Windows timers are
+# only accurate to about one 15.6 ms tick, so spin for longer there.
+DEFAULT_SPIN_NS = 16_000_000 if sys.platform == "win32" else 1_000_000
+
+
+class DeadlineScheduler:
+    """
+    Waits for consecutive absolute deadlines. The wake event interrupts a wait
+    immediately (set it on stop).
+    """
+    def __init__(self, wake_event, catch_up=CATCH_UP_SKIP, spin_ns=DEFAULT_SPIN_NS, clock=time.perf_counter_ns):
+        if catch_up not in (CATCH_UP_SKIP, CATCH_UP_BURST):
+            raise ValueError(f"Unknown catch-up policy: {catch_up}")
+        self._wake_event = wake_event
+        self._catch_up = catch_up
+        self._spin_ns = spin_ns
+        self._clock = clock
+        self.deadline = 0
+        self.skipped = 0
+
+    def start(self):
+        """Anchor the schedule on the current time."""
+        self.deadline = self._clock()
+        self.skipped = 0
+        return self.deadline
+
+    def wait(self, interval_ns):
+        """
+        Advance the deadline by interval_ns and wait until it is reached.
+        Returns True if the wake event interrupted the wait.
+        """
+        clock = self._clock
+        deadline = self.deadline + interval_ns
+        self.deadline = deadline
+        remaining = deadline - clock()
+        if remaining <= 0:
+            if self._catch_up == CATCH_UP_SKIP and -remaining >= interval_ns:
+                self.deadline = deadline - remaining
+                self.skipped += 1
+            return self._wake_event.is_set()
+        return self._sleep(deadline, remaining)
+
+    def wait_until(self, deadline):
+        """
+        Wait until the absolute perf_counter_ns deadline, which becomes the
+        current one. Returns True if the wake event interrupted the wait.
+        """
+        self.deadline = deadline
+        remaining = deadline - self._clock()
+        if remaining <= 0:
+            return self._wake_event.is_set()
+        return self._sleep(deadline, remaining)
+
+    def _sleep(self, deadline, remaining):
+        # Sleep on the wake event, then spin the last spin_ns for precision
+        if remaining > self._spin_ns:
+            if self._wake_event.wait((remaining - self._spin_ns) / 1e9):
+                return True
+        clock = self._clock
+        is_set = self._wake_event.is_set
+        while clock() < deadline:
+            if is_set():
+                return True
+        return False
+
+    def poll(self, check, poll_ns, timeout_ns=0):
+        """
+        Call check() every poll_ns until it returns True or timeout_ns has
+        passed (0 checks once). The schedule is shifted by the time spent, so
+        the next interval starts when polling ends. Returns True if check
+        passed, False on timeout or if the wake event interrupted.
+        """
+        clock = self._clock
+        start = clock()
+        end = start + timeout_ns
+        next_check = start
+        try:
+            while True:
+                if check():
+                    return True
+                next_check += poll_ns
+                now = clock()
+                if now >= end:
+                    return False
+                if self._wake_event.wait(max(0, min(next_check, end) - now) / 1e9):
+                    return False
+        finally:
+            self.deadline += clock() - start
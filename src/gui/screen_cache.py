@@ -0,0 +1,187 @@
+"""
+Short-lived screenshot cache and pixel probes for condition actions.
+Condition actions watch the screen regions they read. A FrameCache refresh
+grabs the smallest rectangle covering every watched region, so conditions
+checked within max_age of each other share one capture. Each refresh is
+compared with the previous capture and watches whose region overlaps the
+changed (dirty) rectangle are flagged. Pixel probes are compared against a
+capture all at once with NumPy.
+
+Requires numpy; screenshots use Pillow's ImageGrab unless another source is given.
+A probe spec is "RRGGBB" (the pixel at the action's position) or a ";"-separated
+list of "x,y=RRGGBB" entries; add "~N" to accept N levels of difference per channel.
+"""
+import time
+import weakref
+import numpy as np
+
+# Captures younger than this many seconds are reused instead of grabbing the screen again
+DEFAULT_MAX_AGE = 0.01
+
+
+def grab_rgb(region):
+    """Default screenshot source: an (H, W, 3) uint8 array of region (left, top, width, height)."""
+    from PIL import ImageGrab
+    left, top, width, height = region
+    return np.asarray(ImageGrab.grab(bbox=(left, top, left + width, top + height)).convert("RGB"))
+
+
+def union(a, b):
+    """Smallest (left, top, width, height) rectangle covering a and b."""
+    left, top = min(a[0], b[0]), min(a[1], b[1])
+    right, bottom = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return left, top, right - left, bottom - top
+
+
+def intersection(a, b):
+    """Overlap of rectangles a and b, or None."""
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    if right <= left or bottom <= top:
+        return None
+    return left, top, right - left, bottom - top
+
+
+def diff_region(previous, current):
+    """Bounding (left, top, width, height) of the pixels that differ between two equal-sized frames, or None."""
+    changed = previous != current
+    if changed.ndim == 3:
+        changed = changed.any(axis=2)
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not rows.size:
+        return None
+    cols = np.flatnonzero(changed.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1)
+
+
+def _crop(frame, frame_region, region):
+    left, top = region[0] - frame_region[0], region[1] - frame_region[1]
+    return frame[top:top + region[3], left:left + region[2]]
+
+
+class Watch:
+    """A region read by a condition; changed is set when a refresh finds it altered."""
+    __slots__ = ("region", "changed", "__weakref__")
+
+    def __init__(self, region):
+        self.region = region
+        self.changed = False
+
+    def take_changed(self):
+        """Return whether the region changed since the last call, and reset the flag."""
+        changed, self.changed = self.changed, False
+        return changed
+
+
+class FrameCache:
+    """
+    Shares screen captures between condition actions. grab is a callable taking
+    a (left, top, width, height) region and returning its pixels as an array.
+    Watches are held weakly, so regions of discarded plans stop being captured.
+    """
+    def __init__(self, grab=None, max_age=DEFAULT_MAX_AGE, clock=time.perf_counter):
+        self._grab = grab or grab_rgb
+        self.max_age = max_age
+        self._clock = clock
+        self._watches = weakref.WeakSet()
+        self.frame = None
+        self.region = None
+        self.captured_at = None
+        self.captures = 0
+
+    def watch(self, region):
+        """Include region in every capture and return a Watch tracking its changes."""
+        watch = Watch(tuple(region))
+        self._watches.add(watch)
+        return watch
+
+    def grab(self, region):
+        """Return the pixels of region, refreshing the capture if it is stale or does not cover region."""
+        if (self.frame is None or self._clock() - self.captured_at >= self.max_age
+                or intersection(self.region, region) != tuple(region)):
+            self.refresh(region)
+        return _crop(self.frame, self.region, region)
+
+    def refresh(self, region=None):
+        """Capture the rectangle covering region and every watched region, flagging changed watches."""
+        watches = list(self._watches)
+        bounds = tuple(region) if region is not None else None
+        for watch in watches:
+            bounds = watch.region if bounds is None else union(bounds, watch.region)
+        if bounds is None:
+            return
+        frame = np.asarray(self._grab(bounds))
+        if self.frame is not None:
+            overlap = intersection(self.region, bounds)
+            dirty = None
+            if overlap is not None:
+                dirty = diff_region(_crop(self.frame, self.region, overlap), _crop(frame, bounds, overlap))
+            if dirty is not None:
+                dirty = (dirty[0] + overlap[0], dirty[1] + overlap[1], dirty[2], dirty[3])
+                for watch in watches:
+                    if intersection(watch.region, dirty) is not None:
+                        watch.changed = True
+        self.frame = frame
+        self.region = bounds
+        self.captured_at = self._clock()
+        self.captures += 1
+
+
+_default_frame_cache = None
+
+
+def get_default_frame_cache():
+    """Return the frame cache shared by condition actions that are not given one."""
+    global _default_frame_cache
+    if _default_frame_cache is None:
+        _default_frame_cache = FrameCache()
+    return _default_frame_cache
+
+
+class PixelProbes:
+    """
+    Colour targets at screen positions, checked together against one capture.
+    region is the smallest rectangle containing every probe.
+    """
+    def __init__(self, points, colors, tolerances):
+        if not points:
+            raise ValueError("No pixel probes given.")
+        xs = np.array([p[0] for p in points])
+        ys = np.array([p[1] for p in points])
+        left, top = int(xs.min()), int(ys.min())
+        self.region = (left, top, int(xs.max()) - left + 1, int(ys.max()) - top + 1)
+        self._cols = xs - left
+        self._rows = ys - top
+        self._colors = np.array(colors, dtype=np.int16)
+        self._tolerances = np.array(tolerances, dtype=np.int16)
+
+    def __len__(self):
+        return len(self._cols)
+
+    @classmethod
+    def parse(cls, spec, x=0, y=0):
+        """Parse a probe spec; entries without a position probe (x, y). Raises ValueError."""
+        points, colors, tolerances = [], [], []
+        for entry in spec.split(";"):
+            entry = entry.strip()
+            if not entry:
+                continue
+            position, sep, color = entry.rpartition("=")
+            color, _, tolerance = color.strip().lstrip("#").partition("~")
+            try:
+                px, py = (int(v) for v in position.split(",")) if sep else (x, y)
+                rgb = bytes.fromhex(color)
+                tolerance = int(tolerance) if tolerance else 0
+            except ValueError:
+                raise ValueError(f"Invalid pixel probe: {entry}") from None
+            if len(rgb) != 3 or tolerance < 0:
+                raise ValueError(f"Invalid pixel probe: {entry}")
+            points.append((px, py))
+            colors.append(tuple(rgb))
+            tolerances.append(tolerance)
+        return cls(points, colors, tolerances)
+
+    def matches(self, frame):
+        """True if every probe is within tolerance in frame, the pixels of self.region."""
+        pixels = frame[self._rows, self._cols, :3].astype(np.int16)
+        return bool((np.abs(pixels - self._colors).max(axis=1) <= self._tolerances).all())
@@ -1,5 +1,5 @@
-from tkinter import Label, Button, Entry, Radiobutton, StringVar, ttk, Toplevel, Canvas
-import pyautogui
+from tkinter import Label, Button, Entry, Radiobutton, StringVar, ttk
+from .preview_overlay import create_overlay_window
 
 class WindowGUI:
     """
@@ -24,7 +24,8 @@ class WindowGUI:
         self.stop_button = Button(self.start_stop_frame, text="Stop (F10)")
         self.stop_button.grid(row=0, column=1, padx=2)
 
-        mouse_x, mouse_y = pyautogui.position()
+        # Ask Tk for the pointer; importing pyautogui here would delay the first frame
+        mouse_x, mouse_y = master.winfo_pointerxy()
 
         self.run_mode_var = StringVar(value="indefinite")
         self.run_mode_frame = ttk.Frame(master)
@@ -52,11 +53,15 @@ class WindowGUI:
 
         self.action_table_label = Label(master, text="Action List", font=("Segoe UI", 10, "bold"))
         self.action_table_label.pack(pady=(10,0))
-        self.action_table = ttk.Treeview(master, columns=("x", "y", "interval", "type", "repeat"), show="headings", selectmode="browse", height=6)
-        for col in ("x", "y", "interval", "type", "repeat"):
+        self.action_table_frame = ttk.Frame(master)
+        self.action_table_frame.pack(pady=8)
+        self.action_table = ttk.Treeview(self.action_table_frame, columns=("x", "y", "interval", "type", "repeat", "track"), show="headings", selectmode="browse", height=6)
+        for col in ("x", "y", "interval", "type", "repeat", "track"):
             self.action_table.heading(col, text=col.capitalize())
             self.action_table.column(col, width=80, anchor="center")
-        self.action_table.pack(pady=8)
+        self.action_table.pack(side="left")
+        self.action_table_scrollbar = ttk.Scrollbar(self.action_table_frame, orient="vertical")
+        self.action_table_scrollbar.pack(side="right", fill="y")
 
         self.action_controls_frame = ttk.Frame(master)
         self.action_controls_frame.pack()
@@ -77,16 +82,32 @@ class WindowGUI:
         self.save_actions_btn.grid(row=0, column=0, padx=2)
         self.load_actions_btn = Button(self.save_load_frame, text="Load Actions")
         self.load_actions_btn.grid(row=0, column=1, padx=2)
+        self.record_btn = Button(self.save_load_frame, text="Record")
+        self.record_btn.grid(row=0, column=2, padx=2)
 
         # Expose mouse_x, mouse_y for default action
         self.default_mouse_x = mouse_x
         self.default_mouse_y = mouse_y
         # Preview bubbles state and button
         self.preview_enabled = False
-        self.preview_bubbles = []
+        # One overlay window draws every marker; created on first use
+        self.preview_window = None
+        self.preview_overlay = None
+        # Optional callable returning the (x, y) positions to preview
+        self.preview_source = None
         self.preview_button = Button(master, text="Enable Preview (F8)", command=self.toggle_preview)
         self.preview_button.pack(pady=(8,0))
 
+        # Live run statistics, refreshed by the logic while a run is going
+        self.stats_frame = ttk.LabelFrame(master, text="Run Statistics")
+        self.stats_frame.pack(pady=(8,4), padx=8, fill="x")
+        self.stats_label = Label(self.stats_frame, text="No run yet", font=("Segoe UI", 9), anchor="w")
+        self.stats_label.pack(fill="x")
+        self.slowest_label = Label(self.stats_frame, text="", font=("Segoe UI", 9), anchor="w", justify="left")
+        self.slowest_label.pack(fill="x")
+        self.export_stats_btn = Button(self.stats_frame, text="Export Stats")
+        self.export_stats_btn.pack(pady=(2,2))
+
     def toggle_preview(self):
         self.preview_enabled = not self.preview_enabled
         self.preview_button.config(text=("Disable Preview (F8)" if self.preview_enabled else "Enable Preview (F8)"))
@@ -97,57 +118,32 @@ class WindowGUI:
 
     def show_preview_bubbles(self, positions=None):
         """
-        Show semi-transparent bubbles at given positions. If positions is None, use all actions in table.
+        Show markers at the given (x, y) positions on the preview overlay. If positions
+        is None, use preview_source() when set, else the actions shown in the table.
         """
-        self.hide_preview_bubbles()
-        if positions is None and hasattr(self, 'action_table'):
-            positions = []
-            for item in self.action_table.get_children():
-                vals = self.action_table.item(item, 'values')
-                if len(vals) >= 2:
-                    try:
-                        x, y = int(vals[0]), int(vals[1])
-                        positions.append((x, y))
-                    except Exception:
-                        continue
-        for x, y in positions:
-            bubble = self._create_bubble(x, y)
-            self.preview_bubbles.append(bubble)
+        if positions is None:
+            if self.preview_source is not None:
+                positions = self.preview_source()
+            else:
+                positions = []
+                for item in self.action_table.get_children():
+                    vals = self.action_table.item(item, 'values')
+                    if len(vals) >= 2:
+                        try:
+                            positions.append((int(vals[0]), int(vals[1])))
+                        except Exception:
+                            continue
+        if self.preview_window is None:
+            self.preview_window, self.preview_overlay = create_overlay_window(self.master)
+        else:
+            self.preview_window.deiconify()
+        self.preview_overlay.update((idx, x, y) for idx, (x, y) in enumerate(positions))
 
     def hide_preview_bubbles(self):
-        for bubble in self.preview_bubbles:
-            try:
-                bubble.destroy()
-            except Exception:
-                pass
-        self.preview_bubbles = []
-
-    def _create_bubble(self, x, y, size=40, alpha=0.4):
-        """
-        Create a semi-transparent Toplevel window as a bubble overlay at (x, y).
-        """
-        bubble = Toplevel(self.master)
-        bubble.overrideredirect(True)
-        bubble.attributes('-topmost', True)
-        bubble.attributes('-alpha', alpha)
-        bubble.wm_attributes('-transparentcolor','#000000')
-        bubble.geometry(f"{size}x{size}+{x-size//2}+{y-size//2}")
-        # Draw a circle using Canvas
-        canvas = Canvas(bubble, width=size, height=size, highlightthickness=0, bg='#000000')
-        canvas.pack()
-        # Draw filled circle (bubble) with border
-        circle_color = '#00aaff'  # Light blue, can be changed
-        border_color = '#005577'  # Darker blue for border
-        border_width = 2
-        canvas.create_oval(border_width, border_width, size-border_width, size-border_width,
-                          fill=circle_color, outline=border_color, width=border_width)
-        # Draw crosshairs
-        crosshair_color = '#ffffff'  # White crosshairs
-        crosshair_width = 2
-        center = size // 2
-        offset = size // 4
-        # Vertical line
-        canvas.create_line(center, border_width, center, size-border_width, fill=crosshair_color, width=crosshair_width)
-        # Horizontal line
-        canvas.create_line(border_width, center, size-border_width, center, fill=crosshair_color, width=crosshair_width)
-        return bubble
+        if self.preview_window is not None:
+            self.preview_window.withdraw()
+
+    def highlight_preview(self, index):
+        """Highlight the marker of action index (None clears it) without redrawing the preview."""
+        if self.preview_enabled and self.preview_overlay is not None:
+            self.preview_overlay.highlight(index)
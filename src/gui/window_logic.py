@@ -1,20 +1,59 @@
+import logging
+import os
 import threading
-import pyautogui
-import keyboard
 import time
+from contextlib import nullcontext
 from tkinter import filedialog, Entry
-from .action_list import ActionList, ACTIONS_REGISTRY
+from .action_list import ActionList, ACTIONS_REGISTRY, STREAMING_THRESHOLD_BYTES
+from .binary_script import BINARY_EXTENSION
+from .action_table import ActionTableView, COLUMNS
 from .click_mode_strategy import get_click_mode_strategy
+from .run_config import RunConfig
+from .engine import compile_plan, StreamingPlan, DEFAULT_STOP_LATENCY, pause_run, resume_run
+from .scheduler import CATCH_UP_SKIP
+from .run_status import RunStatus, StatusPoller
+from .run_stats import RunStats, StatsPoller
+from .position_sampler import PositionSampler
+from .recorder import MacroRecorder
+from .commands import (CommandDispatcher, LatencyStats, START, STOP, PICK_POSITION, SET_POSITION,
+                       TOGGLE_PREVIEW)
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_FILETYPES = [("CSV files", "*.csv"), ("Binary scripts", "*" + BINARY_EXTENSION)]
+STATS_FILETYPES = [("JSON files", "*.json"), ("CSV files", "*.csv")]
 
 class WindowLogic:
     """
     Handles business logic, event handling, clicker state, and file I/O for the Auto Clicker GUI tool.
     Wires up event handlers to widgets from WindowGUI.
+    With an EngineProcess, runs happen in its child process and the run
+    flags and status live in its shared control block.
     """
-    def __init__(self, gui):
+    def __init__(self, gui, engine_process=None):
         self.gui = gui
-        self.is_clicking_event = threading.Event()
-        self.is_waiting_event = threading.Event()
+        self.engine_process = engine_process
+        if engine_process is not None:
+            self.is_clicking_event = engine_process.is_clicking_event
+            self.is_waiting_event = engine_process.is_waiting_event
+            self.is_paused_event = engine_process.is_paused_event
+        else:
+            self.is_clicking_event = threading.Event()
+            self.is_waiting_event = threading.Event()
+            self.is_paused_event = threading.Event()
+        self.catch_up_policy = CATCH_UP_SKIP
+        # Stops that take longer than this many seconds are reported on the label
+        self.stop_latency = DEFAULT_STOP_LATENCY
+        # Optional LowJitterProfile applied to the click thread for each run
+        self.run_profile = None
+        # Optional RunTrace of each run, written to trace_path when the run ends
+        self.run_trace = None
+        self.trace_path = None
+        # Optional EngineMetrics kept by the engine for a metrics endpoint
+        self.metrics = None
+        # None selects the default input backend (XTest on X11, else pyautogui)
+        self.input_backend = None
+        self.status = engine_process.status if engine_process is not None else RunStatus()
         self.click_thread = None
         self._picking_position = False
         self._execution_limit = None
@@ -29,7 +68,8 @@ class WindowLogic:
             "repeat": 1
         }
         self.action_list = ActionList(default_action)
-        self._refresh_action_table()
+        # The table view applies ActionList change events itself
+        self.table_view = ActionTableView(gui.action_table, gui.action_table_scrollbar, self.action_list)
         # Wire up widget commands
         gui.start_button.config(command=self.start_clicking)
         gui.stop_button.config(command=self.stop_clicking)
@@ -40,61 +80,104 @@ class WindowLogic:
         gui.pick_position_button.config(command=self.enable_position_pick)
         gui.save_actions_btn.config(command=self._save_actions)
         gui.load_actions_btn.config(command=self._load_actions)
+        gui.record_btn.config(command=self.toggle_recording)
+        gui.export_stats_btn.config(command=self._export_stats)
         gui.indefinite_radio.config(command=self._update_run_mode)
         gui.duration_radio.config(command=self._update_run_mode)
         gui.executions_radio.config(command=self._update_run_mode)
         gui.action_table.bind("<Double-1>", self._edit_action_cell)
-        gui.action_table.bind("<<TreeviewSelect>>", self._on_table_select)
+        gui.action_table.bind("<<TreeviewSelect>>", self._on_table_select, add="+")
         gui.master.protocol("WM_DELETE_WINDOW", self._on_close)
-        self.register_hotkeys()
-        self._update_mouse_position_label()
+        # Preview markers follow the action list, not just the rows shown in the table
+        gui.preview_source = self._preview_positions
+        self._preview_refresh_pending = False
+        self.action_list.add_listener(self._on_actions_changed)
+        # Hotkeys only post commands; they are handled here on the Tk loop, except
+        # stop, which halts the click thread straight from the hook thread
+        self.commands = CommandDispatcher(gui.master, busy=self.is_clicking_event.is_set)
+        self.commands.register(START, self._on_start_key)
+        self.commands.register(STOP, immediate=self._on_stop_command)
+        self.commands.register(PICK_POSITION, lambda command: self.enable_position_pick())
+        self.commands.register(SET_POSITION, lambda command: self.set_position_from_mouse())
+        self.commands.register(TOGGLE_PREVIEW, lambda command: self.toggle_preview())
+        self.commands.start()
+        # Hotkey-to-first-click and hotkey-to-halt times, printed after each run
+        self.latency = LatencyStats()
+        self._start_posted_ns = None
+        self._stop_posted_ns = None
+        # Hooking the keyboard is slow; do it once the window has been drawn
+        gui.master.after_idle(self.register_hotkeys)
+        # One sampler serves the position label, the picker and the recorder
+        self.position_sampler = PositionSampler(gui.master, on_error=self._show_mouse_position_error)
+        self.position_sampler.subscribe(self._update_mouse_position_label)
+        # The first sample imports pyautogui, so it too waits for the first frame
+        gui.master.after_idle(self.position_sampler.start)
+        if engine_process is not None:
+            # Spawning imports the engine in a new interpreter; keep it off the first frame
+            gui.master.after_idle(engine_process.spawn)
+        # Created on first use; its event buffer is preallocated
+        self.recorder = None
+        # The click thread never touches widgets; progress reaches the label here
+        self.status_poller = StatusPoller(gui.master, gui.label, self.status, on_progress=self._on_run_progress)
+        self.status_poller.start()
+        # Per-action timing is recorded by run_plan in this process only
+        if engine_process is None:
+            self.run_stats = RunStats()
+            self.stats_poller = StatsPoller(gui.master, gui.stats_label, gui.slowest_label, self.run_stats)
+            self.stats_poller.start()
+        else:
+            self.run_stats = None
+            gui.stats_label.config(text="Per-action statistics are not recorded by the process engine")
+            gui.export_stats_btn.config(state="disabled")
 
     def toggle_preview(self):
         self.gui.toggle_preview()
 
-    def _update_mouse_position_label(self):
-        try:
-            x, y = pyautogui.position()
-            self.gui.mouse_position_label.config(text=f"Mouse Position: ({x}, {y})")
-        except Exception:
-            self.gui.mouse_position_label.config(text="Mouse Position: (error)")
-        self.gui.master.after(100, self._update_mouse_position_label)
+    def _preview_positions(self):
+        return ((act["x"], act["y"]) for act in self.action_list.iter_actions())
+
+    def _on_actions_changed(self, event, index=None, new_index=None):
+        # Coalesce bursts of edits into one overlay update
+        if self.gui.preview_enabled and not self._preview_refresh_pending:
+            self._preview_refresh_pending = True
+            self.gui.master.after_idle(self._refresh_preview)
 
-    def _refresh_action_table(self):
-        self.gui.action_table.delete(*self.gui.action_table.get_children())
-        for i, action in enumerate(self.action_list.get_actions()):
-            self.gui.action_table.insert("", "end", iid=str(i), values=(action["x"], action["y"], action["interval"], action["type"], action["repeat"]))
+    def _refresh_preview(self):
+        self._preview_refresh_pending = False
+        if self.gui.preview_enabled:
+            self.gui.show_preview_bubbles()
+
+    def _on_run_progress(self, progress):
+        self.gui.highlight_preview(progress[0].index if progress else None)
+
+    def _update_mouse_position_label(self, x, y):
+        self.gui.mouse_position_label.config(text=f"Mouse Position: ({x}, {y})")
+
+    def _show_mouse_position_error(self, error):
+        self.gui.mouse_position_label.config(text="Mouse Position: (error)")
 
     def _add_action(self):
         self.action_list.add_action()
-        self._refresh_action_table()
 
     def _remove_action(self):
-        sel = self.gui.action_table.selection()
-        if sel:
-            idx = int(sel[0])
+        idx = self.table_view.selected_index()
+        if idx is not None:
             self.action_list.remove_action(idx)
-            self._refresh_action_table()
 
     def _move_action_up(self):
-        sel = self.gui.action_table.selection()
-        if sel:
-            idx = int(sel[0])
+        idx = self.table_view.selected_index()
+        if idx is not None:
             self.action_list.move_action_up(idx)
-            self._refresh_action_table()
-            self.gui.action_table.selection_set(str(idx-1))
+            self.table_view.select(idx-1)
 
     def _move_action_down(self):
-        sel = self.gui.action_table.selection()
-        if sel:
-            idx = int(sel[0])
+        idx = self.table_view.selected_index()
+        if idx is not None:
             self.action_list.move_action_down(idx)
-            self._refresh_action_table()
-            self.gui.action_table.selection_set(str(idx+1))
+            self.table_view.select(idx+1)
 
     def _on_table_select(self, event=None):
-        sel = self.gui.action_table.selection()
-        if sel:
+        if self.table_view.selected_index() is not None:
             self.gui.pick_position_button.config(state="normal")
         else:
             self.gui.pick_position_button.config(state="disabled")
@@ -107,13 +190,13 @@ class WindowLogic:
         col = self.gui.action_table.identify_column(event.x)
         if not row_id or not col:
             return
-        idx = int(row_id)
+        idx = self.table_view.index_of(row_id)
         col_idx = int(col.replace("#", "")) - 1
-        col_name = ("x", "y", "interval", "type", "repeat")[col_idx]
+        col_name = COLUMNS[col_idx]
         x0, y0, width, height = self.gui.action_table.bbox(row_id, col)
         edit_win = Entry(self.gui.action_table, width=8)
         edit_win.place(x=x0, y=y0, width=width, height=height)
-        edit_win.insert(0, str(self.action_list.get_actions()[idx][col_name]))
+        edit_win.insert(0, str(self.action_list.get_action(idx).get(col_name, 0)))
         edit_win.focus()
         def save_edit(event=None):
             val = edit_win.get()
@@ -122,37 +205,90 @@ class WindowLogic:
                     val = int(val)
                 elif col_name == "interval":
                     val = float(val)
-                elif col_name == "repeat":
+                elif col_name in ("repeat", "track"):
                     val = int(val)
+                self.action_list.edit_action(idx, col_name, val)
             except Exception:
-                edit_win.destroy()
-                return
-            self.action_list.edit_action(idx, col_name, val)
+                pass
             edit_win.destroy()
-            self._refresh_action_table()
         edit_win.bind("<Return>", save_edit)
         edit_win.bind("<FocusOut>", lambda e: edit_win.destroy())
 
     def _save_actions(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=SCRIPT_FILETYPES)
         if not file_path:
             return
-        error = self.action_list.save_to_csv(file_path)
+        error = self.action_list.save_to_file(file_path)
         if error:
             self.gui.label.config(text=f"Error saving actions: {error}")
         else:
             self.gui.label.config(text=f"Actions saved to {file_path}")
 
+    def _export_stats(self):
+        if self.run_stats is None or not self.run_stats.events:
+            self.gui.label.config(text="No run statistics to export.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=STATS_FILETYPES)
+        if not file_path:
+            return
+        try:
+            self.run_stats.save(file_path)
+        except OSError as e:
+            self.gui.label.config(text=f"Error saving stats: {e}")
+        else:
+            self.gui.label.config(text=f"Run statistics saved to {file_path}")
+
     def _load_actions(self):
-        file_path = filedialog.askopenfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        file_path = filedialog.askopenfilename(defaultextension=".csv", filetypes=SCRIPT_FILETYPES)
         if not file_path:
             return
-        actions, error = self.action_list.load_from_csv(file_path)
+        self.load_script(file_path)
+
+    def load_script(self, file_path):
+        """
+        Load the script at file_path, or stream it during runs if it is large,
+        and report the result on the label. Returns (count, error) like
+        ActionList.load_from_file. Must be called on the Tk loop.
+        """
+        try:
+            streaming = os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES
+        except OSError as e:
+            count, error = 0, str(e)
+        else:
+            if streaming:
+                count, error = self.action_list.stream_from_file(file_path)
+            else:
+                count, error = self.action_list.load_from_file(file_path)
         if error:
             self.gui.label.config(text=f"Error loading actions: {error}")
+        elif streaming:
+            self.gui.label.config(text=f"Streaming {count} actions from {file_path}")
+        else:
+            self.gui.label.config(text=f"Actions loaded from {file_path}")
+        return count, error
+
+    def toggle_recording(self):
+        """Start recording mouse input, or stop and replace the actions with the recording."""
+        if self.recorder is None:
+            self.recorder = MacroRecorder()
+        if not self.recorder.recording:
+            try:
+                self.recorder.start(self.position_sampler.position())
+            except Exception as e:
+                self.gui.label.config(text=f"Error starting recorder: {e}")
+                return
+            self.gui.record_btn.config(text="Stop Recording")
+            self.gui.label.config(text="Recording...")
             return
-        self._refresh_action_table()
-        self.gui.label.config(text=f"Actions loaded from {file_path}")
+        self.recorder.stop()
+        self.gui.record_btn.config(text="Record")
+        # The last press is the click on the Stop Recording button itself
+        actions = self.recorder.to_actions(drop_last_click=True)
+        if not actions:
+            self.gui.label.config(text="Nothing was recorded.")
+            return
+        self.action_list.set_actions(actions)
+        self.gui.label.config(text=f"Recorded {len(actions)} actions.")
 
     def _update_run_mode(self):
         mode = self.gui.run_mode_var.get()
@@ -167,53 +303,96 @@ class WindowLogic:
             self.gui.executions_entry.config(state='disabled')
 
     def register_hotkeys(self):
-        keyboard.add_hotkey('f7',  self.enable_position_pick)
-        keyboard.add_hotkey('f8',  self.toggle_preview)
-        keyboard.add_hotkey('f9',  self._on_start_key)
-        keyboard.add_hotkey('f10', self._on_stop_key)
+        import keyboard
+        post = self.commands.post
+        keyboard.add_hotkey('f7',  post, args=(PICK_POSITION,))
+        keyboard.add_hotkey('f8',  post, args=(TOGGLE_PREVIEW,))
+        keyboard.add_hotkey('f9',  post, args=(START,))
+        keyboard.add_hotkey('f10', post, args=(STOP,))
+        self._hotkeys_registered = True
 
     def remove_hotkeys(self):
+        # The window can be closed before the deferred registration has run
+        if not getattr(self, "_hotkeys_registered", False):
+            return
+        self._hotkeys_registered = False
+        import keyboard
         keyboard.remove_hotkey('f7')
         keyboard.remove_hotkey('f8')
         keyboard.remove_hotkey('f9')
         keyboard.remove_hotkey('f10')
 
-    def _on_start_key(self, event=None):
+    def _on_start_key(self, command=None):
+        if command is not None and not self.is_clicking_event.is_set():
+            self._start_posted_ns = command.posted_ns
         self.start_clicking()
+        if not self.is_clicking_event.is_set():
+            # Not started (invalid actions or settings); nothing to measure
+            self._start_posted_ns = None
         self.gui.label.config(text="Clicking... (Started via F9)")
 
     def _on_stop_key(self, event=None):
         self.stop_clicking()
 
+    def _on_stop_command(self, command):
+        # Runs on the keyboard hook thread: only thread-safe state is touched
+        if self.is_clicking_event.is_set():
+            self._stop_posted_ns = command.posted_ns
+        self.stop_clicking()
+
+    def _record_latency(self):
+        """Record the hotkey latencies of the run that just ended; called on the click thread."""
+        halted_ns = time.perf_counter_ns()
+        start_ns, self._start_posted_ns = self._start_posted_ns, None
+        stop_ns, self._stop_posted_ns = self._stop_posted_ns, None
+        first_ns = self.status.first_event_ns
+        if start_ns is not None and first_ns is not None:
+            self.latency.record("hotkey to first click", first_ns - start_ns)
+        if stop_ns is not None:
+            self.latency.record("hotkey to halt", halted_ns - stop_ns)
+        if start_ns is not None or stop_ns is not None:
+            logger.debug("Hotkey latency: %s", self.latency.summary())
+
     def _on_close(self):
         self.remove_hotkeys()
+        self.commands.stop()
+        if self.engine_process is not None:
+            self.engine_process.close()
         self.gui.master.destroy()
 
     def enable_position_pick(self):
         if not self._picking_position:
             self._picking_position = True
+            self.position_sampler.request_fast("pick")
             self.gui.label.config(text="Move mouse to desired position and press F6 to select")
-            keyboard.add_hotkey('f6', self.set_position_from_mouse)
+            import keyboard
+            keyboard.add_hotkey('f6', self.commands.post, args=(SET_POSITION,))
 
     def set_position_from_mouse(self, event=None):
         if self._picking_position:
-            x, y = pyautogui.position()
-            sel = self.gui.action_table.selection()
-            if sel:
-                idx = int(sel[0])
+            # Sampled at the fast rate while picking, so this is at most a frame old
+            x, y = self.position_sampler.position(max_age=0.1)
+            idx = self.table_view.selected_index()
+            if idx is not None:
                 self.action_list.edit_action(idx, "x", x)
                 self.action_list.edit_action(idx, "y", y)
-                self._refresh_action_table()
-                self.gui.action_table.selection_set(str(idx))
+                self.table_view.select(idx)
             self._picking_position = False
+            self.position_sampler.release_fast("pick")
+            import keyboard
             keyboard.remove_hotkey('f6')
             self.gui.label.config(text="Auto Clicker Tool")
 
     def start_clicking(self):
         print("Clicking started.")
+        if self.engine_process is not None and not self.engine_process.wait_idle(self.stop_latency):
+            # The previous run is still halting; setting the flag now would resume it
+            self.status.message = "Still stopping the previous run."
+            return
         if not self.is_clicking_event.is_set():
+            self.is_paused_event.clear()
+            self.is_waiting_event.clear()
             self.is_clicking_event.set()
-            actions_to_run = self.action_list.get_actions() if self.action_list.get_actions() else None
             if not self.action_list.validate_actions():
                 self.gui.label.config(text=f"Invalid action found. Check actions list.")
                 self.is_clicking_event.clear()
@@ -223,35 +402,113 @@ class WindowLogic:
             if self.gui.preview_enabled:
                 self.gui.show_preview_bubbles()
 
-            self._strategy = get_click_mode_strategy(self.gui.run_mode_var.get())
-            if not self._strategy.prepare(self):
+            self.status.reset()
+            config = self._run_config()
+            self._strategy = get_click_mode_strategy(config.mode)
+            if not self._strategy.prepare(self, config):
+                # prepare() left the reason in status.message for the poller
                 self.is_clicking_event.clear()
                 return
 
             self.gui.label.config(text="Clicking...")
 
-            self._click_actions = [dict(act) for act in actions_to_run]
+            if self.action_list.stream_path:
+                # Large scripts are read from disk during the run, never copied
+                self._click_stream = (self.action_list.stream_path, self.action_list.stream_count)
+                self._click_actions = None
+            else:
+                self._click_stream = None
+                # O(1) copy-on-write snapshot; edits during the run do not affect it
+                self._click_actions = self.action_list.snapshot()
 
+            if self.engine_process is not None:
+                self._start_process_run(config)
+                return
             self.click_thread = threading.Thread(target=self._click_loop, daemon=True)
             self.click_thread.start()
 
+    def _start_process_run(self, config):
+        # The input backend is chosen in the child; only its default is supported there
+        try:
+            self.engine_process.run(config, actions=self._click_actions, stream=self._click_stream,
+                                    catch_up_policy=self.catch_up_policy, stop_latency=self.stop_latency,
+                                    profile=self.run_profile)
+        except RuntimeError as e:
+            self.is_clicking_event.clear()
+            self.status.message = f"Error starting engine: {e}"
+
+    def start_run(self, mode=None, duration=None, executions=None):
+        """
+        Fill in the run mode and limits as if entered by hand, then start
+        clicking. Returns whether a run started. Must be called on the Tk loop.
+        """
+        if mode is not None:
+            self.gui.run_mode_var.set(mode)
+            self._update_run_mode()
+        for entry, value in ((self.gui.duration_entry, duration), (self.gui.executions_entry, executions)):
+            if value is not None:
+                state = entry.cget("state")
+                entry.config(state="normal")
+                entry.delete(0, "end")
+                entry.insert(0, str(value))
+                entry.config(state=state)
+        self.start_clicking()
+        return self.is_clicking_event.is_set()
+
+    def pause_clicking(self):
+        pause_run(self)
+
+    def resume_clicking(self):
+        resume_run(self)
+
+    def _run_config(self):
+        return RunConfig(self.gui.run_mode_var.get(),
+                         duration=self.gui.duration_entry.get(),
+                         executions=self.gui.executions_entry.get())
+
     def stop_clicking(self):
         print("Clicking stopped.")
+        # Timestamped first so the engine can measure how long the halt takes
+        self.status.stop_requested_ns = time.perf_counter_ns()
         self.is_clicking_event.clear()
-        self.gui.label.config(text="Stopped")
+        self.is_paused_event.clear()
+        # Wake the click thread out of any pending interval wait
+        self.is_waiting_event.set()
+        # May be called from the click thread, so report through the status slot
+        self.status.message = "Stopped"
 
-    def _click_loop(self):
+    def _build_plan(self):
+        stream = getattr(self, "_click_stream", None)
+        if stream:
+            stream_path, count = stream
+            return StreamingPlan(lambda: self.action_list.iter_file(stream_path),
+                                 ACTIONS_REGISTRY, self.input_backend, total=count, cancel=self.is_waiting_event)
         actions = self._click_actions if hasattr(self, "_click_actions") else None
-        # Instantiate action instances before the loop
-        action_instances = []
-        if actions:
-            for idx, act in enumerate(actions):
-                action_type = act.get("type", "click").lower()
-                action_cls = ACTIONS_REGISTRY.get(action_type)
-                if not action_cls:
-                    raise ValueError(f"Unknown action type at index {idx}: {action_type}")
-                action_instances.append(action_cls())
-
-        self._strategy.run(self, actions, action_instances)
-        while not self.is_clicking_event.is_set():
-            self.is_waiting_event.wait(0.1)
+        # Compile the actions once so the loop does no per-click parsing
+        return compile_plan(actions, ACTIONS_REGISTRY, self.input_backend, cancel=self.is_waiting_event)
+
+    def _click_loop(self):
+        profile = self.run_profile
+        try:
+            with profile if profile is not None else nullcontext():
+                self._strategy.run(self, self._build_plan())
+            if profile is not None:
+                # Settings the system refused are worth a warning; the rest is routine
+                (logger.warning if profile.skipped else logger.info)(profile.report())
+        except ValueError as e:
+            self.stop_clicking()
+            self.status.message = f"Error running actions: {e}"
+        finally:
+            self._record_latency()
+            self._write_trace()
+
+    def _write_trace(self):
+        if self.run_trace is None or not self.trace_path:
+            return
+        try:
+            self.run_trace.write(self.trace_path)
+        except OSError as e:
+            logger.error("Error writing trace to %s: %s", self.trace_path, e)
+            self.status.message = f"Error writing trace: {e}"
+        else:
+            logger.info("Trace of %d spans written to %s", len(self.run_trace), self.trace_path)
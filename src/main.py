@@ -1,17 +1,70 @@
-
+import argparse
+import multiprocessing
 import tkinter as tk
+from gui.cli import make_profile, parse_cpus
 from gui.window_gui import WindowGUI
 from gui.window_logic import WindowLogic
 
-def main():
+def main(argv=None):
     """
     Entry point for the Auto Clicker GUI tool.
     Initializes Tkinter root and launches the main window.
     """
+    parser = argparse.ArgumentParser(description='Auto Clicker GUI tool.')
+    parser.add_argument('--engine', choices=("thread", "process"), default="thread",
+                        help='Run the click loop on a thread of the GUI process or in its own process')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Record a timeline of each run and write it to FILE as Chrome trace JSON')
+    parser.add_argument('--control-port', type=int, metavar='PORT',
+                        help='Accept control commands from scripts on this localhost TCP port (0 picks one)')
+    parser.add_argument('--control-socket', metavar='PATH',
+                        help='Accept control commands from scripts on this Unix socket')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--low-jitter', action='store_true',
+                        help='Disable garbage collection during runs and apply the settings below to the click thread')
+    parser.add_argument('--cpus', type=parse_cpus, help='With --low-jitter, pin the click thread to these CPUs, e.g. 2,3')
+    parser.add_argument('--nice', type=int, help='With --low-jitter, nice value to request for the click thread')
+    parser.add_argument('--realtime', type=int, metavar='PRIORITY',
+                        help='With --low-jitter, request SCHED_FIFO at this priority (usually needs privileges)')
+    args = parser.parse_args(argv)
+    if args.trace and args.engine == "process":
+        parser.error("--trace needs --engine thread")
+    if args.metrics_port is not None and args.engine == "process":
+        parser.error("--metrics-port needs --engine thread")
+    engine_process = None
+    if args.engine == "process":
+        from gui.process_engine import EngineProcess
+        engine_process = EngineProcess()
     root = tk.Tk()
     gui = WindowGUI(root)
-    logic = WindowLogic(gui)
+    logic = WindowLogic(gui, engine_process)
+    logic.run_profile = make_profile(args)
+    if args.trace:
+        from gui.run_trace import RunTrace
+        logic.run_trace = RunTrace()
+        logic.trace_path = args.trace
+    server = None
+    if args.control_port is not None or args.control_socket:
+        from gui.control_server import ControlServer
+        # Commands that touch widgets are run on the Tk loop by the dispatcher
+        server = ControlServer(logic, call=logic.commands.call, port=args.control_port or 0,
+                               path=args.control_socket)
+        print(f"Control server listening on {server.start()}")
+    metrics_server = None
+    if args.metrics_port is not None:
+        from gui.metrics import EngineMetrics, MetricsServer
+        logic.metrics = EngineMetrics()
+        metrics_server = MetricsServer(logic.metrics, port=args.metrics_port)
+        host, port = metrics_server.start()
+        print(f"Metrics at http://{host}:{port}/metrics")
     root.mainloop()
+    if server is not None:
+        server.stop()
+    if metrics_server is not None:
+        metrics_server.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Needed for the engine process in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+    main()
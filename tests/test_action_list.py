@@ -0,0 +1,186 @@
+"""
+Unit tests for ActionList file loading and streaming.
+Covers:
+1. iter_csv yields typed actions and names the first invalid row
+2. load_from_csv reports the invalid row number
+3. stream_from_file validates CSV without keeping rows in memory
+4. Saving re-streams the source file and refuses to overwrite it
+5. Save/load choose CSV or binary by extension, with O(1) access to streamed binary scripts
+6. Listeners receive fine-grained change events
+7. Columnar storage round-trips actions and snapshots are copy-on-write
+8. Track numbers and poll intervals load from CSV, are validated and are only reported when set
+"""
+import sys
+import pytest
+sys.path.insert(0, 'src')
+from gui.action_list import ActionList
+
+HEADER = "x,y,interval,type,repeat\n"
+
+
+def write_csv(tmp_path, rows, name="actions.csv"):
+    path = tmp_path / name
+    path.write_text(HEADER + "".join(rows))
+    return str(path)
+
+
+def test_iter_csv_yields_typed_actions(tmp_path):
+    """Should convert each row to typed values."""
+    path = write_csv(tmp_path, ["1,2,0.5,Click,3\n"])
+    assert list(ActionList().iter_csv(path)) == [{"x": 1, "y": 2, "interval": 0.5, "type": "click", "repeat": 3}]
+
+
+def test_iter_csv_reports_first_bad_row(tmp_path):
+    """Should raise ValueError naming the first invalid row."""
+    path = write_csv(tmp_path, ["1,2,0.5,click,1\n", "1,2,0.5,click,1\n", "1,2,-1,click,1\n", "x,2,0.5,click,1\n"])
+    with pytest.raises(ValueError, match="row 4"):
+        list(ActionList().iter_csv(path))
+
+
+def test_load_from_csv_reports_row(tmp_path):
+    """load_from_csv should return the row number of the invalid line."""
+    path = write_csv(tmp_path, ["1,2,0.5,click,1\n", "1,2,0.5,click,0\n"])
+    actions, error = ActionList().load_from_csv(path)
+    assert actions is None
+    assert "row 3" in error
+
+
+def test_stream_from_file(tmp_path):
+    """stream_from_file should count rows and iterate them from disk."""
+    path = write_csv(tmp_path, [f"{i},{i},0.1,click,1\n" for i in range(100)])
+    action_list = ActionList({"x": 0, "y": 0, "interval": 0.1, "type": "click", "repeat": 1})
+    count, error = action_list.stream_from_file(path)
+    assert (count, error) == (100, None)
+    assert action_list.get_actions() == []
+    assert [a["x"] for a in action_list.iter_actions()] == list(range(100))
+    action_list.add_action()
+    assert action_list.stream_path is None
+
+
+def test_stream_from_file_invalid(tmp_path):
+    """An invalid file should not replace the current actions."""
+    path = write_csv(tmp_path, ["1,2,0.5,click,1\n", "bad\n"])
+    action_list = ActionList({"x": 0, "y": 0, "interval": 0.1, "type": "click", "repeat": 1})
+    count, error = action_list.stream_from_file(path)
+    assert count is None and "row 3" in error
+    assert action_list.stream_path is None
+    assert len(action_list.get_actions()) == 1
+
+
+def test_save_streamed_actions(tmp_path):
+    """Saving while streaming should copy the source rows, but never onto the source."""
+    path = write_csv(tmp_path, [f"{i},{i},0.1,click,1\n" for i in range(5)])
+    action_list = ActionList()
+    action_list.stream_from_file(path)
+    assert action_list.save_to_csv(path) is not None
+    copy = str(tmp_path / "copy.csv")
+    assert action_list.save_to_csv(copy) is None
+    assert list(ActionList().iter_csv(copy)) == list(action_list.iter_csv(path))
+
+
+def test_binary_round_trip_by_extension(tmp_path):
+    """save_to_file/load_from_file should use the binary format for .acb files."""
+    actions = [{"x": i, "y": -i, "interval": 0.25, "type": "double click" if i % 2 else "click", "repeat": i + 1} for i in range(10)]
+    action_list = ActionList()
+    action_list.set_actions(list(actions))
+    path = str(tmp_path / "actions.acb")
+    assert action_list.save_to_file(path) is None
+    with open(path, "rb") as f:
+        assert f.read(4) == b"ACB1"
+    loaded = ActionList()
+    assert loaded.load_from_file(path) == (10, None)
+    assert loaded.get_actions() == actions
+
+
+def test_stream_binary_random_access(tmp_path):
+    """A streamed binary script should support O(1) lookups and iteration."""
+    path = str(tmp_path / "actions.acb")
+    source = ActionList()
+    source.set_actions([{"x": i, "y": i, "interval": 0.1, "type": "click", "repeat": 1} for i in range(1000)])
+    source.save_to_file(path)
+    action_list = ActionList()
+    assert action_list.stream_from_file(path) == (1000, None)
+    assert action_list.get_action(750)["x"] == 750
+    assert sum(1 for _ in action_list.iter_actions()) == 1000
+    assert action_list.save_to_file(path) is not None
+    action_list.set_actions([])
+    assert action_list.stream_path is None
+
+
+def test_change_events():
+    """Each edit should notify listeners with its event and indexes."""
+    events = []
+    action_list = ActionList()
+    action_list.add_listener(lambda *e: events.append(e))
+    action_list.add_action()
+    action_list.add_action()
+    action_list.edit_action(1, "x", 5)
+    action_list.move_action_up(1)
+    action_list.move_action_up(0)
+    action_list.remove_action(0)
+    action_list.set_actions([])
+    assert events == [
+        ("insert", 0, None),
+        ("insert", 1, None),
+        ("update", 1, None),
+        ("move", 1, 0),
+        ("delete", 0, None),
+        ("reset", None, None),
+    ]
+
+
+def test_columns_round_trip():
+    """Actions should come back from the columns as the dicts that went in."""
+    actions = [
+        {"x": 1, "y": -2, "interval": 0.5, "type": "click", "repeat": 3},
+        {"x": 4, "y": 5, "interval": 0.25, "type": "press and hold", "repeat": 1, "duration": 1.5},
+        {"x": 6, "y": 7, "interval": 0.1, "type": "custom", "repeat": 1},
+    ]
+    action_list = ActionList()
+    action_list.set_actions(actions)
+    assert action_list.get_actions() == actions
+    assert action_list.get_action(1) == actions[1]
+    assert action_list.validate_actions()
+    action_list.edit_action(0, "repeat", 0)
+    assert not action_list.validate_actions()
+    with pytest.raises(ValueError):
+        action_list.edit_action(0, "x", 2 ** 40)
+
+
+def test_snapshot_is_copy_on_write():
+    """Edits after snapshot() should not change the snapshot, and should copy only once."""
+    action_list = ActionList()
+    action_list.set_actions([{"x": i, "y": i, "interval": 0.1, "type": "click", "repeat": 1} for i in range(5)])
+    snapshot = action_list.snapshot()
+    columns = action_list._columns
+    action_list.edit_action(0, "x", 100)
+    action_list.remove_action(4)
+    assert action_list._columns is not columns
+    copied = action_list._columns
+    action_list.add_action()
+    assert action_list._columns is copied
+    assert [a["x"] for a in snapshot] == [0, 1, 2, 3, 4]
+    assert snapshot[0]["x"] == 0 and len(snapshot) == 5
+    assert [a["x"] for a in action_list.get_actions()] == [100, 1, 2, 3, 0]
+
+
+def test_tracks_and_poll_from_csv(tmp_path):
+    """The track and poll columns should be optional, range-checked and kept through save/load."""
+    path = tmp_path / "tracks.csv"
+    path.write_text("x,y,interval,type,repeat,track,poll\n1,2,0.5,click,1,,\n3,4,0.5,click,1,2,0.01\n")
+    action_list = ActionList()
+    assert action_list.load_from_file(str(path)) == (2, None)
+    assert action_list.needs_wide_records()
+    assert "track" not in action_list.get_action(0) and "poll" not in action_list.get_action(0)
+    assert action_list.get_action(1)["track"] == 2
+    assert action_list.get_action(1)["poll"] == 0.01
+    saved = str(tmp_path / "saved.csv")
+    assert action_list.save_to_file(saved) is None
+    assert ActionList().load_from_file(saved) == (2, None)
+    bad = tmp_path / "bad.csv"
+    bad.write_text("x,y,interval,type,repeat,track\n1,2,0.5,click,1,70000\n")
+    assert ActionList().load_from_file(str(bad))[1] is not None
+    bad.write_text("x,y,interval,type,repeat,poll\n1,2,0.5,click,1,-1\n")
+    assert ActionList().load_from_file(str(bad))[1] is not None
+    action_list.set_actions([{"x": 0, "y": 0, "interval": 0.1, "type": "click", "repeat": 1}])
+    assert not action_list.needs_wide_records()
@@ -0,0 +1,151 @@
+"""
+Unit tests for ActionTableView.
+Covers:
+1. ActionList edits are applied as single-row Treeview operations
+2. Lists above the threshold render a fixed window of rows that follows scrolling
+3. Selection is tracked by action index in both modes
+"""
+import itertools
+import sys
+sys.path.insert(0, 'src')
+from gui.action_list import ActionList
+from gui.action_table import ActionTableView
+
+
+class FakeTree:
+    """Minimal stand-in for ttk.Treeview that counts row operations."""
+    def __init__(self, height=6):
+        self.height = height
+        self.rows = []
+        self.values = {}
+        self.selected = ()
+        self.ops = 0
+        self._ids = itertools.count()
+    def cget(self, key):
+        return self.height
+    def config(self, **kwargs):
+        pass
+    def bind(self, *args, **kwargs):
+        pass
+    def get_children(self):
+        return tuple(self.rows)
+    def insert(self, parent, index, iid=None, values=()):
+        self.ops += 1
+        iid = iid or f"I{next(self._ids)}"
+        self.rows.insert(len(self.rows) if index == "end" else index, iid)
+        self.values[iid] = tuple(values)
+        return iid
+    def delete(self, *iids):
+        self.ops += 1
+        for iid in iids:
+            self.rows.remove(iid)
+            del self.values[iid]
+    def item(self, iid, values=()):
+        self.ops += 1
+        self.values[iid] = tuple(values)
+    def move(self, iid, parent, index):
+        self.ops += 1
+        self.rows.remove(iid)
+        self.rows.insert(index, iid)
+    def index(self, iid):
+        return self.rows.index(iid)
+    def selection(self):
+        return self.selected
+    def selection_set(self, iid):
+        self.selected = (iid,)
+    def selection_remove(self, *iids):
+        self.selected = ()
+    def see(self, iid):
+        pass
+    def yview(self, *args):
+        pass
+    def shown(self):
+        return [self.values[iid] for iid in self.rows]
+
+
+class FakeScrollbar:
+    def __init__(self):
+        self.position = None
+    def config(self, **kwargs):
+        pass
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+def make_actions(count):
+    return [{"x": i, "y": i, "interval": 0.1, "type": "click", "repeat": 1} for i in range(count)]
+
+
+def make_view(count, threshold=100):
+    action_list = ActionList()
+    action_list.set_actions(make_actions(count))
+    tree = FakeTree()
+    view = ActionTableView(tree, FakeScrollbar(), action_list, virtual_threshold=threshold)
+    return action_list, tree, view
+
+
+def test_edits_are_incremental():
+    """Each edit should cost one Treeview operation and keep rows in order."""
+    action_list, tree, view = make_view(50)
+    tree.ops = 0
+    action_list.add_action({"x": 99, "y": 99, "interval": 0.1, "type": "click", "repeat": 1})
+    action_list.remove_action(0)
+    action_list.edit_action(3, "x", 1234)
+    action_list.move_action_down(3)
+    assert tree.ops == 4
+    assert [v[0] for v in tree.shown()] == [a["x"] for a in action_list.get_actions()]
+
+
+def test_selection_by_index_normal_mode():
+    """select() and selected_index() should use action indexes."""
+    action_list, tree, view = make_view(10)
+    view.select(4)
+    assert view.selected_index() == 4
+    action_list.move_action_up(4)
+    view.select(3)
+    assert view.index_of(tree.selected[0]) == 3
+
+
+def test_virtual_mode_renders_window():
+    """Large lists should only render page_size rows, whatever their length."""
+    action_list, tree, view = make_view(100_000)
+    assert view.virtual
+    assert len(tree.rows) == 6
+    assert [v[0] for v in tree.shown()] == [0, 1, 2, 3, 4, 5]
+    tree.ops = 0
+    view._on_scrollbar("moveto", "0.5")
+    assert [v[0] for v in tree.shown()] == list(range(50_000, 50_006))
+    assert tree.ops == 6
+    assert view.scrollbar.position[0] == 0.5
+
+
+def test_virtual_mode_edits_are_bounded():
+    """Edits in a virtual table should only refresh the visible window."""
+    action_list, tree, view = make_view(100_000)
+    tree.ops = 0
+    action_list.edit_action(2, "x", -1)
+    action_list.remove_action(0)
+    assert tree.ops == 12
+    assert tree.shown()[1][0] == -1
+
+
+def test_virtual_selection_survives_scrolling():
+    """The selected action should stay selected when scrolled out and back."""
+    action_list, tree, view = make_view(100_000)
+    view.select(70_000)
+    assert view.index_of(tree.selected[0]) == 70_000
+    view._on_scrollbar("moveto", "0")
+    assert tree.selected == ()
+    assert view.selected_index() == 70_000
+    action_list.remove_action(0)
+    assert view.selected_index() == 69_999
+
+
+def test_threshold_switches_mode():
+    """Crossing the threshold should switch between normal and virtual rendering."""
+    action_list, tree, view = make_view(100, threshold=100)
+    assert not view.virtual
+    action_list.add_action()
+    assert view.virtual and len(tree.rows) == 6
+    action_list.remove_action(0)
+    assert not view.virtual and len(tree.rows) == 100
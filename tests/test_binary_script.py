@@ -0,0 +1,111 @@
+"""
+Unit tests for the binary action-script format.
+Covers:
+1. write_binary/BinaryScript round trip and O(1) indexing
+2. Iteration from a start index and invalid record detection
+3. Rejection of non-script and truncated files
+4. CSV <-> binary conversion
+5. The wide layout is used only when asked for, and tracks and poll intervals survive conversion
+"""
+import struct
+import sys
+import pytest
+sys.path.insert(0, 'src')
+from gui.binary_script import BinaryScript, write_binary, convert, RECORD, WIDE_RECORD, HEADER
+from gui.action_list import ActionList
+
+
+def make_actions(count):
+    return [{"x": i, "y": i * 2, "interval": 0.01 * (i + 1), "type": "click", "repeat": 1 + i % 3} for i in range(count)]
+
+
+def test_round_trip_and_indexing(tmp_path):
+    """Records should read back identically, by index and by iteration."""
+    path = str(tmp_path / "s.acb")
+    actions = make_actions(500)
+    assert write_binary(path, iter(actions)) == 500
+    script = BinaryScript(path)
+    try:
+        assert len(script) == 500
+        assert script[0] == actions[0]
+        assert script[-1] == actions[-1]
+        assert script[321] == actions[321]
+        assert list(script) == actions
+        assert list(script.iter_actions(start=495)) == actions[495:]
+        with pytest.raises(IndexError):
+            script[500]
+    finally:
+        script.close()
+
+
+def test_record_size_is_compact(tmp_path):
+    """Each action should take one fixed 32-byte record."""
+    path = tmp_path / "s.acb"
+    write_binary(str(path), make_actions(1000))
+    assert RECORD.size == 32
+    assert path.stat().st_size == HEADER.size + 1000 * RECORD.size + len(b"click")
+
+
+def test_invalid_record_is_reported(tmp_path):
+    """Iteration should name the index of an invalid record."""
+    actions = make_actions(3)
+    actions[1]["interval"] = 0
+    path = str(tmp_path / "s.acb")
+    write_binary(path, actions)
+    script = BinaryScript(path)
+    try:
+        with pytest.raises(ValueError, match="index 1"):
+            list(script)
+    finally:
+        script.close()
+
+
+def test_rejects_bad_files(tmp_path):
+    """Should reject files without the magic header and truncated scripts."""
+    bad = tmp_path / "bad.acb"
+    bad.write_bytes(b"x,y,interval,type,repeat\n" * 4)
+    with pytest.raises(ValueError):
+        BinaryScript(str(bad))
+    path = tmp_path / "s.acb"
+    write_binary(str(path), make_actions(10))
+    path.write_bytes(path.read_bytes()[:HEADER.size + 3 * RECORD.size])
+    with pytest.raises(ValueError):
+        BinaryScript(str(path))
+
+
+def test_convert_csv_binary(tmp_path):
+    """Converting CSV to binary and back should preserve the actions."""
+    csv_path = tmp_path / "a.csv"
+    csv_path.write_text("x,y,interval,type,repeat,template\n1,2,0.5,click,3,\n4,5,0.25,click image,1,\"ok.png@0,0,10,10\"\n")
+    assert convert(str(csv_path), str(tmp_path / "a.acb")) == 2
+    assert convert(str(tmp_path / "a.acb"), str(tmp_path / "b.csv")) == 2
+    action_list = ActionList()
+    assert list(action_list.iter_csv(str(tmp_path / "b.csv"))) == list(action_list.iter_csv(str(csv_path)))
+    assert BinaryScript(str(tmp_path / "a.acb"))[1]["template"] == "ok.png@0,0,10,10"
+
+
+def test_wide_layout(tmp_path):
+    """Tracks and poll intervals need the wide record; without it such actions are refused."""
+    actions = make_actions(4)
+    actions[2]["track"] = 7
+    actions[3]["poll"] = 0.01
+    with pytest.raises(ValueError):
+        write_binary(str(tmp_path / "plain.acb"), actions)
+    path = tmp_path / "s.acb"
+    write_binary(str(path), actions, wide=True)
+    assert path.stat().st_size == HEADER.size + 4 * WIDE_RECORD.size + len(b"click")
+    script = BinaryScript(str(path))
+    try:
+        assert script.wide
+        assert list(script) == actions
+    finally:
+        script.close()
+    csv_path = tmp_path / "t.csv"
+    csv_path.write_text("x,y,interval,type,repeat,track\n1,2,0.5,click,3,0\n4,5,0.25,click,1,2\n")
+    assert convert(str(csv_path), str(tmp_path / "t.acb")) == 2
+    script = BinaryScript(str(tmp_path / "t.acb"))
+    try:
+        assert script.wide
+        assert [a.get("track", 0) for a in script] == [0, 2]
+    finally:
+        script.close()
@@ -0,0 +1,103 @@
+"""
+Unit tests for the headless CLI runner.
+Covers:
+1. Executions mode runs the script the requested number of times
+2. Invalid scripts and run limits are reported with non-zero exit codes
+3. Running a script never imports tkinter
+4. --stats-out writes per-action timing at the end of the run
+5. --trace writes a Chrome trace of the run
+6. Optional features are only imported when their flags are set
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+from gui import cli
+
+HEADER = "x,y,interval,type,repeat\n"
+
+
+def write_script(tmp_path, rows):
+    path = tmp_path / "actions.csv"
+    path.write_text(HEADER + "".join(rows))
+    return str(path)
+
+
+def make_args(script, **overrides):
+    args = dict(script=script, mode="executions", duration=None, executions=3,
+                stats_interval=0, catch_up="skip", stop_latency=0.05, backend="null")
+    args.update(overrides)
+    return SimpleNamespace(**args)
+
+
+def test_executions_mode_runs_script(tmp_path):
+    """Should run every action executions times and report completion."""
+    script = write_script(tmp_path, ["1,1,0.001,click,2\n", "2,2,0.001,move,1\n"])
+    out = io.StringIO()
+    assert cli.run(make_args(script), out) == 0
+    lines = out.getvalue().splitlines()
+    assert " 9 events" in lines[-2]
+    assert lines[-1] == "Completed 3 executions."
+
+
+def test_errors_are_reported(tmp_path):
+    """Bad scripts and bad limits should print a message and fail."""
+    bad = write_script(tmp_path, ["1,1,-1,click,1\n"])
+    out = io.StringIO()
+    assert cli.run(make_args(bad), out) == 1
+    assert "row 2" in out.getvalue()
+    good = write_script(tmp_path, ["1,1,0.001,click,1\n"])
+    out = io.StringIO()
+    assert cli.run(make_args(good, executions=0), out) == 2
+    assert "Invalid executions" in out.getvalue()
+
+
+def test_stats_out_writes_json(tmp_path):
+    """--stats-out should record every event and save the stats when the run ends."""
+    script = write_script(tmp_path, ["1,1,0.001,click,2\n", "2,2,0.001,move,1\n"])
+    stats_path = tmp_path / "stats.json"
+    out = io.StringIO()
+    assert cli.run(make_args(script, stats_out=str(stats_path)), out) == 0
+    assert "events/s" in out.getvalue()
+    data = json.loads(stats_path.read_text())
+    assert data["events"] == 9
+    assert [step["count"] for step in data["steps"]] == [6, 3]
+
+
+def test_trace_writes_chrome_json(tmp_path):
+    """--trace should write the run's spans as trace-event JSON."""
+    script = write_script(tmp_path, ["1,1,0.001,click,2\n"])
+    trace_path = tmp_path / "trace.json"
+    out = io.StringIO()
+    assert cli.run(make_args(script, trace=str(trace_path)), out) == 0
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    assert sum(e["name"] == "click" for e in events) == 6
+    assert "written to" in out.getvalue()
+
+
+def test_cli_does_not_import_tkinter(tmp_path):
+    """A full run through the module entry point should leave tkinter unimported."""
+    script = write_script(tmp_path, ["1,1,0.001,click,1\n"])
+    code = ("import sys, runpy; sys.argv = ['cli', %r, '--mode', 'executions', '--executions', '1', "
+            "'--backend', 'null']\n"
+            "try:\n    runpy.run_module('gui.cli', run_name='__main__')\n"
+            "except SystemExit as e:\n    assert e.code == 0, e.code\n"
+            "assert 'tkinter' not in sys.modules\n") % script
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.abspath("src"),
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert "Completed 1 executions." in result.stderr
+
+
+def test_optional_features_are_imported_lazily():
+    """Importing the CLI should not load stats, profiles, metrics or http.server."""
+    code = ("import sys; import gui.cli\n"
+            "loaded = [m for m in ('gui.metrics', 'gui.run_profile', 'gui.run_stats', "
+            "'http.server') if m in sys.modules]\n"
+            "assert not loaded, loaded\n")
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.abspath("src"),
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
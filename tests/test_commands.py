@@ -0,0 +1,180 @@
+"""
+Unit tests for the hotkey command dispatcher and latency stats.
+Covers:
+1. Posted commands are handled on the next drain, in order, and draining reschedules itself
+2. Immediate handlers run on the posting thread without waiting for a drain
+3. Unknown commands are rejected
+4. LatencyStats keeps count, min, max and mean per name
+5. A stop posted from another thread halts run_plan promptly and the first event is timestamped
+6. call() runs a function on the next drain and resolves its Future with the result or error
+7. Drains slow down while idle and speed up while busy or handling commands
+8. post() and call() wake the Tk loop with a virtual event that drains the queue
+"""
+import threading
+import time
+import sys
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+from gui.commands import CommandDispatcher, LatencyStats, START, STOP, WAKE_EVENT
+from gui.engine import compile_plan, run_plan, STOPPED
+from gui.action_list import ACTIONS_REGISTRY
+from gui.input_backend import RecordingBackend
+from gui.run_status import RunStatus
+
+
+class DummyMaster:
+    def __init__(self):
+        self.after_calls = []
+        self.cancelled = []
+        self.bindings = {}
+        self.events = []
+    def bind(self, sequence, func):
+        self.bindings[sequence] = func
+    def event_generate(self, sequence, when=None):
+        self.events.append((sequence, when))
+    def after(self, ms, func):
+        self.after_calls.append((ms, func))
+        return len(self.after_calls)
+    def after_cancel(self, after_id):
+        self.cancelled.append(after_id)
+
+
+def test_commands_are_handled_on_drain():
+    """Handlers should only run when the Tk loop drains the queue."""
+    master = DummyMaster()
+    dispatcher = CommandDispatcher(master, poll_ms=4)
+    handled = []
+    dispatcher.register(START, lambda command: handled.append(command.name))
+    dispatcher.register(STOP, lambda command: handled.append(command.name))
+    dispatcher.post(START)
+    dispatcher.post(STOP)
+    assert handled == []
+    dispatcher.start()
+    assert handled == [START, STOP]
+    assert master.after_calls == [(4, dispatcher.drain)]
+    dispatcher.stop()
+    assert master.cancelled == [1]
+
+
+def test_immediate_handler_runs_on_posting_thread():
+    """Immediate handlers should run inside post(), on the caller's thread."""
+    dispatcher = CommandDispatcher(DummyMaster())
+    threads = []
+    dispatcher.register(STOP, immediate=lambda command: threads.append(threading.current_thread()))
+    poster = threading.Thread(target=dispatcher.post, args=(STOP,))
+    poster.start()
+    poster.join()
+    assert threads == [poster]
+    # Nothing is queued for commands without a Tk handler
+    dispatcher.drain()
+
+
+def test_call_runs_on_drain():
+    """call() should defer the function to the drain and hand back its result or exception."""
+    dispatcher = CommandDispatcher(DummyMaster())
+    ran = []
+    ok = dispatcher.call(lambda a, b: ran.append(threading.current_thread()) or a + b, 2, 3)
+    failed = dispatcher.call(int, "x")
+    assert not ok.done() and ran == []
+    dispatcher.drain()
+    assert ok.result(0) == 5
+    assert ran == [threading.current_thread()]
+    with pytest.raises(ValueError):
+        failed.result(0)
+
+
+def test_idle_drains_are_slower():
+    """With nothing queued and no run active, drains should use the idle interval."""
+    master = DummyMaster()
+    running = [False]
+    dispatcher = CommandDispatcher(master, poll_ms=4, idle_poll_ms=50, busy=lambda: running[0])
+    dispatcher.register(START, lambda command: None)
+    dispatcher.drain()
+    dispatcher.post(START)
+    dispatcher.drain()
+    running[0] = True
+    dispatcher.drain()
+    assert [ms for ms, _ in master.after_calls] == [50, 4, 4]
+    with pytest.raises(ValueError):
+        CommandDispatcher(master, idle_poll_ms=0)
+
+
+def test_post_wakes_the_loop():
+    """Each queued command should generate a wake event whose binding drains the queue."""
+    master = DummyMaster()
+    dispatcher = CommandDispatcher(master)
+    handled = []
+    dispatcher.register(START, lambda command: handled.append(command.name))
+    dispatcher.register(STOP, immediate=lambda command: None)
+    dispatcher.start()
+    dispatcher.post(STOP)
+    assert master.events == []
+    dispatcher.post(START)
+    future = dispatcher.call(lambda: 7)
+    assert master.events == [(WAKE_EVENT, "tail")] * 2
+    master.bindings[WAKE_EVENT](None)
+    assert handled == [START]
+    assert future.result(0) == 7
+    # The safety poll is left as it was
+    assert len(master.after_calls) == 1
+
+
+def test_lost_wake_is_ignored():
+    """A wake that Tk refuses should not stop the command from being queued."""
+    class NoLoopMaster(DummyMaster):
+        def event_generate(self, sequence, when=None):
+            raise RuntimeError("main thread is not in main loop")
+    dispatcher = CommandDispatcher(NoLoopMaster())
+    handled = []
+    dispatcher.register(START, lambda command: handled.append(command.name))
+    dispatcher.post(START)
+    dispatcher.drain()
+    assert handled == [START]
+
+
+def test_unknown_command():
+    """Posting an unregistered command should raise ValueError."""
+    with pytest.raises(ValueError):
+        CommandDispatcher(DummyMaster()).post("jump")
+    with pytest.raises(ValueError):
+        CommandDispatcher(DummyMaster(), poll_ms=0)
+
+
+def test_latency_stats():
+    """Should aggregate samples per name and summarize them in milliseconds."""
+    stats = LatencyStats()
+    assert stats.get("stop") is None
+    for ns in (1_000_000, 3_000_000, 2_000_000):
+        stats.record("stop", ns)
+    assert stats.get("stop") == (3, 1_000_000, 3_000_000, 2_000_000)
+    assert stats.summary() == "stop 2.00 ms (min 1.00, max 3.00, n=3)"
+
+
+def test_stop_from_hook_thread_halts_run():
+    """A stop posted from another thread should end a long interval wait within milliseconds."""
+    logic = SimpleNamespace(is_clicking_event=threading.Event(), is_waiting_event=threading.Event(),
+                            status=RunStatus())
+    logic.is_clicking_event.set()
+
+    def halt(command):
+        logic.is_clicking_event.clear()
+        logic.is_waiting_event.set()
+
+    dispatcher = CommandDispatcher(DummyMaster())
+    dispatcher.register(STOP, immediate=halt)
+    plan = compile_plan([{"x": 1, "y": 2, "interval": 10.0, "type": "click", "repeat": 1}],
+                        ACTIONS_REGISTRY, RecordingBackend(capacity=4))
+    before = time.perf_counter_ns()
+    result = []
+    runner = threading.Thread(target=lambda: result.append(run_plan(logic, plan)))
+    runner.start()
+    while logic.status.first_event_ns is None:
+        time.sleep(0.001)
+    assert logic.status.first_event_ns >= before
+    command = threading.Thread(target=dispatcher.post, args=(STOP,))
+    posted = time.perf_counter()
+    command.start()
+    runner.join(1.0)
+    assert result == [STOPPED]
+    assert time.perf_counter() - posted < 0.1
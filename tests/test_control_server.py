@@ -0,0 +1,253 @@
+"""
+Unit tests for the local control server.
+Covers:
+1. Status queries, unknown commands and malformed lines get JSON replies
+2. load and start run a script through the logic; stop halts it
+3. pause and resume hold and release a run
+4. Subscribers receive progress events
+5. Many concurrent clients are served
+6. Commands that touch widgets go through the call hook
+7. Unix socket transport, which never removes a file that is not a socket
+8. Unexpected handler errors are replied to without dropping the client
+"""
+import json
+import socket
+import sys
+import threading
+import time
+import pytest
+sys.path.insert(0, 'src')
+from gui.cli import HeadlessLogic, load_plan
+from gui.click_mode_strategy import get_click_mode_strategy
+from gui.control_server import ControlServer
+from gui.input_backend import NullBackend
+from gui.run_config import RunConfig
+
+HEADER = "x,y,interval,type,repeat\n"
+
+
+class ScriptLogic(HeadlessLogic):
+    """HeadlessLogic with the load_script/start_run methods the server drives."""
+    def __init__(self):
+        super().__init__()
+        self.plan = None
+        self.thread = None
+
+    def load_script(self, file_path):
+        try:
+            self.plan = load_plan(file_path, NullBackend(), cancel=self.is_waiting_event)
+        except (OSError, ValueError) as e:
+            return 0, str(e)
+        return len(self.plan), None
+
+    def start_run(self, mode=None, duration=None, executions=None):
+        config = RunConfig(mode or "indefinite", duration=duration, executions=executions)
+        strategy = get_click_mode_strategy(config.mode)
+        self.start_clicking()
+        if self.plan is None or not strategy.prepare(self, config):
+            self.is_clicking_event.clear()
+            return False
+        self.thread = threading.Thread(target=strategy.run, args=(self, self.plan), daemon=True)
+        self.thread.start()
+        return True
+
+
+class Client:
+    def __init__(self, address, family=socket.AF_INET):
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(5)
+        self.sock.connect(address)
+        self.file = self.sock.makefile("rwb")
+        self.next_id = 0
+
+    def send_line(self, line):
+        self.file.write(line)
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def request(self, cmd, **fields):
+        self.next_id += 1
+        return self.send_line(json.dumps({"id": self.next_id, "cmd": cmd, **fields}).encode() + b"\n")
+
+    def read_message(self):
+        return json.loads(self.file.readline())
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def make(logic=None, **kwargs):
+        srv = ControlServer(logic or ScriptLogic(), progress_hz=50, **kwargs)
+        srv.start()
+        servers.append(srv)
+        return srv
+    yield make
+    for srv in servers:
+        srv.logic.stop_clicking()
+        srv.stop()
+
+
+def write_script(tmp_path, rows):
+    path = tmp_path / "actions.csv"
+    path.write_text(HEADER + "".join(rows))
+    return str(path)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise AssertionError("Timed out")
+        time.sleep(0.005)
+
+
+def test_status_and_errors(server):
+    """Replies should echo the id; bad requests should fail without dropping the connection."""
+    client = Client(server().address)
+    reply = client.request("status")
+    assert reply["ok"] and reply["id"] == 1
+    assert reply["result"]["clicking"] is False
+    assert client.request("fly")["error"] == "Unknown command: fly"
+    assert client.send_line(b"not json\n")["ok"] is False
+    assert client.send_line(b"[1, 2]\n")["error"] == "Request must be a JSON object."
+    assert client.request("load")["ok"] is False
+    assert client.request("status")["ok"]
+    client.close()
+
+
+def test_load_start_and_stop(server, tmp_path):
+    """A script loaded and started remotely should run; stop should halt it."""
+    srv = server()
+    client = Client(srv.address)
+    script = write_script(tmp_path, ["1,1,0.001,click,2\n"])
+    assert client.request("load", path=script)["result"] == {"count": 1}
+    assert client.request("load", path=str(tmp_path / "missing.csv"))["ok"] is False
+    reply = client.request("start", mode="executions", executions=3)
+    assert reply["ok"]
+    srv.logic.thread.join(5)
+    assert client.request("status")["result"]["events"] == 6
+    reply = client.request("start", mode="executions", executions=0)
+    assert not reply["ok"] and "executions" in reply["error"]
+    assert client.request("start", mode="indefinite")["ok"]
+    wait_for(lambda: srv.logic.status.events > 0)
+    assert client.request("stop")["result"]["clicking"] is False
+    srv.logic.thread.join(5)
+    assert not srv.logic.thread.is_alive()
+    client.close()
+
+
+def test_pause_and_resume(server, tmp_path):
+    """Pausing should hold the run with no events until resumed."""
+    srv = server()
+    client = Client(srv.address)
+    client.request("load", path=write_script(tmp_path, ["1,1,0.002,click,1\n"]))
+    client.request("start")
+    wait_for(lambda: srv.logic.status.events > 0)
+    assert client.request("pause")["result"]["paused"] is True
+    time.sleep(0.05)
+    held = srv.logic.status.events
+    time.sleep(0.1)
+    assert srv.logic.status.events == held
+    assert client.request("status")["result"]["message"] == "Paused"
+    assert client.request("resume")["result"]["paused"] is False
+    wait_for(lambda: srv.logic.status.events > held + 5)
+    client.request("stop")
+    srv.logic.thread.join(5)
+    assert not srv.logic.thread.is_alive()
+    client.close()
+
+
+def test_subscribers_get_progress(server, tmp_path):
+    """A subscribed client should receive progress events while the run advances."""
+    srv = server()
+    client = Client(srv.address)
+    client.request("load", path=write_script(tmp_path, ["1,1,0.002,click,1\n"]))
+    assert client.request("subscribe")["ok"]
+    client.request("start")
+    events = []
+    while len(events) < 3:
+        message = client.read_message()
+        if message.get("event") == "progress":
+            events.append(message)
+    assert events[-1]["clicking"] is True
+    assert events[-1]["events"] > 0
+    client.request("stop")
+    client.close()
+
+
+def test_many_clients(server):
+    """Many simultaneous connections should each be answered."""
+    srv = server()
+    clients = [Client(srv.address) for _ in range(50)]
+    wait_for(lambda: srv.clients == 50)
+    assert all(c.request("status")["ok"] for c in clients)
+    for c in clients:
+        c.close()
+    wait_for(lambda: srv.clients == 0)
+
+
+def test_widget_commands_use_call_hook(server, tmp_path):
+    """load and start should be run through the call hook, not on the server thread."""
+    calls = []
+
+    def call(func, *args):
+        calls.append(func.__name__)
+        from gui.control_server import call_now
+        return call_now(func, *args)
+    srv = server(call=call)
+    client = Client(srv.address)
+    client.request("load", path=write_script(tmp_path, ["1,1,0.001,click,1\n"]))
+    client.request("start", mode="executions", executions=1)
+    client.request("status")
+    client.request("stop")
+    assert calls == ["load_script", "start_run"]
+    client.close()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not available")
+def test_unix_socket(server, tmp_path):
+    """The server should also listen on a Unix socket, removing it when stopped."""
+    path = str(tmp_path / "clicker.sock")
+    srv = server(path=path)
+    client = Client(path, socket.AF_UNIX)
+    assert client.request("status")["ok"]
+    client.close()
+    srv.stop()
+    assert not (tmp_path / "clicker.sock").exists()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not available")
+def test_socket_path_must_be_a_socket(server, tmp_path):
+    """A regular file at the socket path should be refused and kept; a stale socket should be replaced."""
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    srv = ControlServer(ScriptLogic(), path=str(path))
+    with pytest.raises(FileExistsError):
+        srv.start()
+    assert path.read_text() == "keep me"
+    stale = str(tmp_path / "stale.sock")
+    leftover = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    leftover.bind(stale)
+    leftover.close()
+    client = Client(server(path=stale).address, socket.AF_UNIX)
+    assert client.request("status")["ok"]
+    client.close()
+
+
+def test_unexpected_errors_are_replied(server):
+    """An unexpected exception from a handler should become an error reply on a live connection."""
+    srv = server()
+
+    def broken():
+        raise ZeroDivisionError("division by zero")
+    srv.logic.pause_clicking = broken
+    client = Client(srv.address)
+    reply = client.request("pause")
+    assert reply == {"id": 1, "ok": False, "error": "division by zero"}
+    assert client.request("status")["ok"]
+    client.close()
@@ -0,0 +1,373 @@
+"""
+Unit tests for the run engine (compile_plan and run_plan).
+Covers:
+1. Actions are parsed and typed once into PlanSteps
+2. Unknown action types raise ValueError
+3. run_plan honours max_passes, time_limit and stop
+4. Strategies delegate to the shared engine loop
+5. Event spacing follows the interval on a recording backend
+6. StreamingPlan keeps bounded read-ahead, stops its reader and re-raises errors
+7. Stop halts long holds and intervals within the stop latency bound, releasing held buttons
+8. Pause holds the run mid-interval; resume continues it and stop ends it while paused
+9. Tracks run side by side from one loop, each counting its own passes
+10. A pause resumed before the engine sees it does not break the schedule
+"""
+import threading
+import time
+import tracemalloc
+import sys
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+from gui.run_status import RunStatus
+from gui.engine import compile_plan, run_plan, StreamingPlan, STOPPED, COMPLETED, TIME_UP, pause_run, resume_run
+from gui.click_mode_strategy import ExecutionsMode, IndefiniteMode
+from gui.action_list import ACTIONS_REGISTRY
+from gui.input_backend import RecordingBackend
+
+
+class RecordingAction:
+    calls = []
+
+    def __init__(self, backend=None):
+        pass
+
+    def execute(self, x, y, interval=0.1, repeat=1):
+        RecordingAction.calls.append((x, y))
+
+
+REGISTRY = {"click": RecordingAction}
+
+
+def make_logic():
+    logic = SimpleNamespace()
+    logic.is_clicking_event = threading.Event()
+    logic.is_clicking_event.set()
+    logic.is_waiting_event = threading.Event()
+    logic.status = RunStatus()
+    logic.stop_clicking = logic.is_clicking_event.clear
+    return logic
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    RecordingAction.calls = []
+
+
+def test_compile_plan_converts_types():
+    """Should convert string fields to typed values once."""
+    plan = compile_plan([{"x": "10", "y": "20", "interval": "0.5", "type": "Click", "repeat": "3"}], REGISTRY)
+    step = plan.steps[0]
+    assert (step.x, step.y, step.interval, step.repeat, step.type) == (10, 20, 0.5, 3, "click")
+    assert callable(step.execute)
+
+
+def test_compile_plan_unknown_type():
+    """Should raise ValueError for an unknown action type."""
+    with pytest.raises(ValueError):
+        compile_plan([{"x": 0, "y": 0, "interval": 0.1, "type": "bogus"}], REGISTRY)
+
+
+def test_run_plan_max_passes():
+    """Should run each step repeat times per pass and stop after max_passes."""
+    plan = compile_plan([
+        {"x": 1, "y": 1, "interval": 0.01, "type": "click", "repeat": 2},
+        {"x": 2, "y": 2, "interval": 0.01, "type": "click", "repeat": 1},
+    ], REGISTRY)
+    assert run_plan(make_logic(), plan, max_passes=3) == COMPLETED
+    assert RecordingAction.calls == [(1, 1), (1, 1), (2, 2)] * 3
+
+
+def test_run_plan_time_limit():
+    """Should return TIME_UP once the time limit has elapsed."""
+    plan = compile_plan([{"x": 1, "y": 1, "interval": 0.01, "type": "click"}], REGISTRY)
+    assert run_plan(make_logic(), plan, time_limit=0) == TIME_UP
+    assert len(RecordingAction.calls) == 1
+
+
+def test_run_plan_stopped_and_empty():
+    """Should return STOPPED when clicking is cleared or the plan is empty."""
+    logic = make_logic()
+    logic.is_clicking_event.clear()
+    plan = compile_plan([{"x": 1, "y": 1, "interval": 0.01, "type": "click"}], REGISTRY)
+    assert run_plan(logic, plan) == STOPPED
+    assert run_plan(make_logic(), compile_plan([], REGISTRY)) == STOPPED
+    assert RecordingAction.calls == []
+
+
+def test_executions_mode_runs_limit():
+    """ExecutionsMode should run the plan exactly the execution limit."""
+    logic = make_logic()
+    logic._execution_limit = 4
+    plan = compile_plan([{"x": 5, "y": 6, "interval": 0.01, "type": "click"}], REGISTRY)
+    ExecutionsMode().run(logic, plan)
+    assert len(RecordingAction.calls) == 4
+    assert not logic.is_clicking_event.is_set()
+    assert logic.status.message == "Completed 4 executions."
+
+
+def test_indefinite_mode_stops_on_clear():
+    """IndefiniteMode should return once clicking is cleared."""
+    logic = make_logic()
+    class StopAfterThree(RecordingAction):
+        def execute(self, x, y, interval=0.1, repeat=1):
+            RecordingAction.calls.append((x, y))
+            if len(RecordingAction.calls) == 3:
+                logic.is_clicking_event.clear()
+    plan = compile_plan([{"x": 0, "y": 0, "interval": 0.01, "type": "click"}], {"click": StopAfterThree})
+    IndefiniteMode().run(logic, plan)
+    assert len(RecordingAction.calls) == 3
+
+
+def test_run_plan_event_spacing():
+    """Recorded events should be spaced by the interval without accumulating drift."""
+    backend = RecordingBackend(capacity=100)
+    plan = compile_plan([{"x": 1, "y": 2, "interval": 0.002, "type": "click", "repeat": 20}], ACTIONS_REGISTRY, backend)
+    run_plan(make_logic(), plan, max_passes=1)
+    stamps = backend.timestamps[:backend.count]
+    assert backend.count == 20
+    # 19 intervals of 2 ms, measured between first and last event
+    assert 37_000_000 <= stamps[-1] - stamps[0] < 80_000_000
+
+
+@pytest.mark.parametrize("action", [
+    {"x": 3, "y": 4, "interval": 0.001, "type": "press and hold", "repeat": 1, "duration": 30.0},
+    {"x": 3, "y": 4, "interval": 30.0, "type": "click", "repeat": 5},
+])
+def test_stop_latency_bound(action):
+    """Stop should halt a long hold or interval within the bound and never leave the button down."""
+    backend = RecordingBackend(capacity=100)
+    logic = make_logic()
+    logic.stop_latency = 0.05
+    plan = compile_plan([action], ACTIONS_REGISTRY, backend, cancel=logic.is_waiting_event)
+    result = []
+    runner = threading.Thread(target=lambda: result.append(run_plan(logic, plan)))
+    runner.start()
+    while not backend.count:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    logic.status.stop_requested_ns = time.perf_counter_ns()
+    logic.is_clicking_event.clear()
+    logic.is_waiting_event.set()
+    runner.join(1.0)
+    assert result == [STOPPED]
+    assert logic.status.stop_latency_ns < 50_000_000
+    assert logic.status.message is None
+    kinds = list(backend.kinds[:backend.count])
+    assert kinds.count(RecordingBackend.DOWN) == kinds.count(RecordingBackend.UP)
+
+
+def test_late_stop_is_reported():
+    """A stop that overruns the bound should be reported in the status message."""
+    logic = make_logic()
+    logic.stop_latency = 0.001
+    class SlowAction(RecordingAction):
+        def execute(self, x, y, interval=0.1, repeat=1):
+            logic.status.stop_requested_ns = time.perf_counter_ns()
+            logic.is_clicking_event.clear()
+            time.sleep(0.01)
+    plan = compile_plan([{"x": 0, "y": 0, "interval": 0.01, "type": "click"}], {"click": SlowAction})
+    assert run_plan(logic, plan) == STOPPED
+    assert "over the 1 ms stop latency bound" in logic.status.message
+
+
+def test_pause_resume_and_stop_while_paused():
+    """A paused run should emit nothing until resumed, and a stop should end it while paused."""
+    logic = make_logic()
+    logic.is_paused_event = threading.Event()
+    plan = compile_plan([{"x": 0, "y": 0, "interval": 0.002, "type": "click"}], REGISTRY)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(run_plan(logic, plan)))
+    thread.start()
+    while not RecordingAction.calls:
+        time.sleep(0.001)
+    pause_run(logic)
+    assert logic.status.message == "Paused"
+    time.sleep(0.02)
+    held = len(RecordingAction.calls)
+    time.sleep(0.05)
+    assert len(RecordingAction.calls) == held
+    resume_run(logic)
+    assert logic.status.message is None
+    deadline = time.perf_counter() + 2
+    while len(RecordingAction.calls) < held + 5 and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    assert len(RecordingAction.calls) >= held + 5
+    pause_run(logic)
+    time.sleep(0.01)
+    logic.is_clicking_event.clear()
+    logic.is_waiting_event.set()
+    thread.join(1)
+    assert result == [STOPPED]
+
+
+@pytest.mark.parametrize("track", [0, 1])
+def test_resume_before_pause_is_seen_keeps_spacing(track):
+    """A pause resumed before the engine sees it should leave the interval spacing intact."""
+    logic = make_logic()
+    logic.is_paused_event = threading.Event()
+    actions = [{"x": 0, "y": 0, "interval": 0.02, "type": "click"}]
+    if track:
+        actions.append({"x": 1, "y": 0, "interval": 0.02, "type": "click", "track": track})
+    stamps = []
+
+    class StampAction(RecordingAction):
+        def execute(self, x, y, interval=0.1, repeat=1):
+            stamps.append((x, time.perf_counter()))
+    plan = compile_plan(actions, {"click": StampAction})
+    thread = threading.Thread(target=run_plan, args=(logic, plan))
+    thread.start()
+    while not stamps:
+        time.sleep(0.001)
+    pause_run(logic)
+    resume_run(logic)
+    time.sleep(0.2)
+    logic.is_clicking_event.clear()
+    logic.is_waiting_event.set()
+    thread.join(1)
+    times = [t for x, t in stamps if x == 0]
+    assert 5 <= len(times) <= 12
+    # An extra click or a restarted schedule would shift every later click by
+    # a whole interval; scheduling jitter stays well under half of one
+    for i, t in enumerate(times):
+        assert abs((t - times[0]) - i * 0.02) < 0.01, (i, t - times[0])
+
+
+def generate_actions(count, produced=None):
+
+    for i in range(count):
+        if produced is not None:
+            produced.append(i)
+        yield {"x": i, "y": i, "interval": 0.01, "type": "click", "repeat": 1}
+
+
+def test_streaming_plan_yields_all_steps():
+    """A streaming pass should yield every action in order, once per pass."""
+    plan = StreamingPlan(lambda: generate_actions(1000), REGISTRY, total=1000, chunk_size=64)
+    assert len(plan) == 1000
+    for _ in range(2):
+        assert [step.x for step in plan] == list(range(1000))
+
+
+def test_streaming_plan_memory_is_flat():
+    """Peak memory should not grow with the number of streamed actions."""
+    def peak_for(count):
+        plan = StreamingPlan(lambda: generate_actions(count), REGISTRY, total=count)
+        tracemalloc.start()
+        for _ in plan:
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+    assert peak_for(100_000) < 2 * peak_for(10_000)
+
+
+def test_streaming_plan_bounded_read_ahead():
+    """The reader should stay within its read-ahead bound and stop when the pass ends early."""
+    produced = []
+    plan = StreamingPlan(lambda: generate_actions(100_000, produced), REGISTRY, chunk_size=10, max_chunks=2)
+    passes = iter(plan)
+    next(passes)
+    time.sleep(0.1)
+    assert len(produced) <= 10 * (2 + 2)
+    passes.close()
+    time.sleep(0.3)
+    stopped_at = len(produced)
+    time.sleep(0.2)
+    assert len(produced) == stopped_at
+
+
+def test_streaming_plan_reraises_source_errors():
+    """Errors from the source should surface in the iterating thread."""
+    def bad_source():
+        yield {"x": 0, "y": 0, "interval": 0.01, "type": "click"}
+        raise ValueError("Invalid action in CSV at row 3.")
+    plan = StreamingPlan(bad_source, REGISTRY, total=2)
+    with pytest.raises(ValueError, match="row 3"):
+        list(plan)
+
+
+def test_tracks_are_interleaved_by_deadline():
+    """Steps on different tracks should run concurrently, each on its own schedule."""
+    logic = make_logic()
+    plan = compile_plan([
+        {"x": 0, "y": 0, "interval": 0.01, "type": "click", "repeat": 4},
+        {"x": 1, "y": 0, "interval": 0.025, "type": "click", "repeat": 2, "track": 1},
+    ], REGISTRY)
+    assert [[step.x for step in steps] for steps in plan.tracks] == [[0], [1]]
+    started = time.perf_counter()
+    assert run_plan(logic, plan, max_passes=2) == COMPLETED
+    elapsed = time.perf_counter() - started
+    xs = [x for x, _ in RecordingAction.calls]
+    assert xs.count(0) == 8 and xs.count(1) == 4
+    # Track 1 starts alongside track 0 instead of after it
+    assert xs[:2] == [0, 1]
+    assert elapsed < 0.15
+    assert logic.status.passes == 2
+    assert logic.status.events == 12
+
+
+def test_tracks_pass_counts_and_conditions():
+    """status.passes should count passes done by every track; a false condition should not block other tracks."""
+    logic = make_logic()
+    ready = threading.Event()
+    plan = compile_plan([
+        {"x": 0, "y": 0, "interval": 0.002, "type": "click"},
+        {"x": 1, "y": 0, "interval": 0.002, "type": "click", "track": 2},
+    ], REGISTRY)
+    gated = plan.steps[1]
+    gated.check = ready.is_set
+    gated.poll_ns = 1_000_000
+    gated.timeout_ns = 10**10
+    thread = threading.Thread(target=run_plan, args=(logic, plan, 5))
+    thread.start()
+    time.sleep(0.05)
+    assert all(x == 0 for x, _ in RecordingAction.calls)
+    assert logic.status.passes == 0
+    ready.set()
+    thread.join(2)
+    assert not thread.is_alive()
+    xs = [x for x, _ in RecordingAction.calls]
+    assert xs.count(0) == 5 and xs.count(1) == 5
+    assert logic.status.passes == 5
+
+
+def test_tracks_pause_and_stop():
+    """Pausing a multi-track run should hold every track; stop should end it."""
+    logic = make_logic()
+    logic.is_paused_event = threading.Event()
+    plan = compile_plan([
+        {"x": 0, "y": 0, "interval": 0.002, "type": "click"},
+        {"x": 1, "y": 0, "interval": 0.003, "type": "click", "track": 1},
+    ], REGISTRY)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(run_plan(logic, plan)))
+    thread.start()
+    while len(RecordingAction.calls) < 4:
+        time.sleep(0.001)
+    pause_run(logic)
+    time.sleep(0.02)
+    held = len(RecordingAction.calls)
+    time.sleep(0.05)
+    assert len(RecordingAction.calls) == held
+    resume_run(logic)
+    deadline = time.perf_counter() + 2
+    while len(RecordingAction.calls) < held + 5 and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    logic.status.stop_requested_ns = time.perf_counter_ns()
+    logic.is_clicking_event.clear()
+    logic.is_waiting_event.set()
+    thread.join(1)
+    assert result == [STOPPED]
+    assert len(RecordingAction.calls) >= held + 5
+    assert logic.status.stop_latency_ns is not None
+
+
+def test_streaming_plan_rejects_tracks():
+    """A streamed script with an action off track 0 should fail with its position."""
+    def source():
+        yield {"x": 0, "y": 0, "interval": 0.01, "type": "click"}
+        yield {"x": 0, "y": 0, "interval": 0.01, "type": "click", "track": 3}
+    plan = StreamingPlan(source, REGISTRY, total=2)
+    with pytest.raises(ValueError, match="Action 2 is on track 3"):
+        list(plan)
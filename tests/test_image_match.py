@@ -0,0 +1,107 @@
+"""
+Unit tests for template matching and the click image action, on synthetic images.
+Covers:
+1. NCC finds a template in a noisy screenshot and rejects absent ones
+2. Coarse-to-fine pyramid search agrees with full-resolution search
+3. Template specs parse optional search regions
+4. ImageClickAction clicks the match centre plus offset, caching the prepared template
+5. Template and duration fields survive compilation, CSV and binary scripts
+"""
+import sys
+import pytest
+sys.path.insert(0, 'src')
+np = pytest.importorskip("numpy")
+from gui.image_match import PreparedTemplate, parse_template_spec
+from gui.action_list import ActionList, ImageClickAction, ACTIONS_REGISTRY
+from gui.engine import compile_plan
+from gui.input_backend import RecordingBackend
+
+
+def make_screen(seed=0, shape=(240, 320)):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 255, shape)
+
+
+def make_smooth_screen(seed=0):
+    """Blocky image with structure at several scales, like a screen of UI elements."""
+    rng = np.random.default_rng(seed)
+    return np.rint(np.kron(rng.uniform(0, 255, (60, 80)), np.ones((4, 4))) * 0.7 + rng.uniform(0, 76, (240, 320)))
+
+
+def test_match_finds_template():
+    """The best NCC match should be the template's true position."""
+    screen = make_screen()
+    template = screen[100:132, 200:240].copy()
+    assert PreparedTemplate(template, levels=1).match(screen)[:2] == (200, 100)
+
+
+def test_match_rejects_absent_template():
+    """A template that is not on screen should score below the threshold."""
+    screen = make_screen()
+    other = make_screen(seed=1, shape=(32, 32))
+    assert PreparedTemplate(other).match(screen) is None
+
+
+def test_pyramid_matches_full_resolution():
+    """Pyramid search should land on the same position as a single-level search."""
+    rng = np.random.default_rng(2)
+    # Smooth image so coarse levels keep enough structure to match
+    screen = np.kron(rng.uniform(0, 255, (60, 80)), np.ones((4, 4)))
+    template = screen[64:112, 128:192].copy()
+    full = PreparedTemplate(template, levels=1).match(screen)
+    coarse = PreparedTemplate(template, levels=3).match(screen)
+    assert coarse[:2] == full[:2] == (128, 64)
+    assert coarse[2] > 0.99
+
+
+def test_parse_template_spec():
+    """Specs should split off an optional left,top,width,height region."""
+    assert parse_template_spec("ok.png") == ("ok.png", None)
+    assert parse_template_spec("dir@home/ok.png@10,20,300,200") == ("dir@home/ok.png", (10, 20, 300, 200))
+    with pytest.raises(ValueError):
+        parse_template_spec("ok.png@0,0,0,10")
+
+
+def test_click_image_action(tmp_path):
+    """Should click the match centre plus offset and prepare the template once."""
+    from PIL import Image
+    screen = make_smooth_screen()
+    path = tmp_path / "t.png"
+    Image.fromarray(screen[41:73, 61:101].astype(np.uint8)).save(path)
+    regions = []
+
+    def source(region):
+        regions.append(region)
+        left, top, width, height = region or (0, 0, 320, 240)
+        return screen[top:top + height, left:left + width]
+
+    backend = RecordingBackend(capacity=10)
+    action = ImageClickAction(backend, screen=source)
+    action.execute(5, -5, template=str(path))
+    action.execute(0, 0, template=f"{path}@50,30,100,80")
+    assert [e[2:] for e in backend.events()] == [(86, 52), (81, 57)]
+    assert regions == [None, (50, 30, 100, 80)]
+    assert len(action._templates) == 2
+    backend.clear()
+    action.execute(0, 0, template=f"{path}@200,150,100,80")
+    assert backend.events() == []
+    with pytest.raises(ValueError):
+        action.execute(0, 0)
+
+
+def test_step_fields_are_bound(tmp_path):
+    """compile_plan should pass template and duration to actions that declare them."""
+    actions = [{"x": 1, "y": 2, "interval": 0.1, "type": "click image", "repeat": 1,
+                "template": "ok.png@0,0,10,10", "duration": 2.5},
+               {"x": 1, "y": 2, "interval": 0.1, "type": "press and hold", "repeat": 1, "duration": 0.5}]
+    plan = compile_plan(actions, ACTIONS_REGISTRY, RecordingBackend(capacity=1))
+    assert plan.steps[0].execute.keywords == {"template": "ok.png@0,0,10,10", "duration": 2.5}
+    assert plan.steps[1].execute.keywords == {"duration": 0.5}
+    action_list = ActionList()
+    action_list.set_actions(actions)
+    for name in ("a.csv", "a.acb"):
+        path = str(tmp_path / name)
+        assert action_list.save_to_file(path) is None
+        loaded = ActionList()
+        loaded.load_from_file(path)
+        assert loaded.get_actions() == actions
@@ -0,0 +1,113 @@
+"""
+Unit tests for the input backend layer.
+Covers:
+1. Actions emit their events through the backend and flush once per execute
+2. Default click/double_click composition on InputBackend
+3. RecordingBackend timestamps events into its preallocated buffer
+4. XTestBackend against a local Xvfb server (skipped when Xvfb is unavailable)
+"""
+import os
+import shutil
+import subprocess
+import sys
+import time
+import pytest
+sys.path.insert(0, 'src')
+from gui.input_backend import InputBackend, RecordingBackend
+from gui.action_list import ClickAction, DoubleClickAction, PressAndHoldAction, MoveAction
+
+
+class FakeBackend(InputBackend):
+    def __init__(self):
+        self.events = []
+    def mouse_down(self, x, y, button="left"):
+        self.events.append(("down", x, y, button))
+    def mouse_up(self, x, y, button="left"):
+        self.events.append(("up", x, y, button))
+    def move(self, x, y):
+        self.events.append(("move", x, y))
+    def flush(self):
+        self.events.append(("flush",))
+
+
+def test_click_action_uses_backend():
+    """ClickAction should click repeat times, then flush once."""
+    backend = FakeBackend()
+    ClickAction(backend).execute(5, 6, repeat=2)
+    assert backend.events == [("down", 5, 6, "left"), ("up", 5, 6, "left")] * 2 + [("flush",)]
+
+
+def test_double_click_action_uses_backend():
+    """DoubleClickAction should emit two clicks per repeat."""
+    backend = FakeBackend()
+    DoubleClickAction(backend).execute(1, 2)
+    assert backend.events == [("down", 1, 2, "left"), ("up", 1, 2, "left")] * 2 + [("flush",)]
+
+
+def test_press_and_hold_flushes_before_hold():
+    """PressAndHoldAction should flush the press before sleeping."""
+    backend = FakeBackend()
+    PressAndHoldAction(backend).execute(3, 4, duration=0)
+    assert backend.events == [("down", 3, 4, "left"), ("flush",), ("up", 3, 4, "left"), ("flush",)]
+
+
+def test_move_action_uses_backend():
+    """MoveAction should move the pointer once, then flush."""
+    backend = FakeBackend()
+    MoveAction(backend).execute(9, 10, repeat=3)
+    assert backend.events == [("move", 9, 10), ("flush",)]
+
+
+def test_recording_backend_records_events():
+    """RecordingBackend should store kind, position and increasing timestamps."""
+    backend = RecordingBackend(capacity=10)
+    ClickAction(backend).execute(7, 8, repeat=2)
+    backend.mouse_down(1, 1)
+    events = backend.events()
+    assert [e[1:] for e in events] == [(RecordingBackend.CLICK, 7, 8)] * 2 + [(RecordingBackend.DOWN, 1, 1)]
+    assert events[0][0] <= events[1][0] <= events[2][0]
+
+
+def test_recording_backend_drops_beyond_capacity():
+    """Events past capacity should be counted as dropped, not stored."""
+    backend = RecordingBackend(capacity=3)
+    for i in range(5):
+        backend.click(i, i)
+    assert backend.count == 3
+    assert backend.dropped == 2
+    backend.clear()
+    assert backend.count == 0 and backend.events() == []
+
+
+@pytest.fixture
+def xvfb_display():
+    pytest.importorskip("Xlib")
+    if not shutil.which("Xvfb"):
+        pytest.skip("Xvfb is not installed")
+    name = ":87"
+    proc = subprocess.Popen(["Xvfb", name, "-screen", "0", "640x480x24"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # Wait for the server socket
+    for _ in range(50):
+        if os.path.exists(f"/tmp/.X11-unix/X{name[1:]}"):
+            break
+        time.sleep(0.05)
+    yield name
+    proc.terminate()
+    proc.wait()
+
+
+def test_xtest_backend_moves_pointer(xvfb_display):
+    """XTestBackend should move the pointer once its requests are flushed."""
+    from gui.input_backend import XTestBackend
+    backend = XTestBackend(xvfb_display)
+    try:
+        for i in range(100):
+            backend.click(10 + i, 20)
+        backend.sync()
+        pointer = backend._display.screen().root.query_pointer()
+        assert (pointer.root_x, pointer.root_y) == (109, 20)
+        with pytest.raises(ValueError):
+            backend.click(0, 0, button="side")
+    finally:
+        backend.close()
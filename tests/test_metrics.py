@@ -0,0 +1,137 @@
+"""
+Unit tests for the engine metrics and their HTTP endpoint.
+Covers:
+1. run_plan counts events by type, executions, runs, mode and start errors
+2. Exceptions from actions are counted and re-raised
+3. Stops are recorded, with late stops counted
+4. render() produces valid exposition text with escaped labels
+5. MetricsServer serves /metrics and 404s elsewhere
+6. Executions mode records the executions done
+"""
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+from gui.metrics import EngineMetrics, MetricsServer
+from gui.run_status import RunStatus
+from gui.engine import compile_plan, run_plan
+from gui.click_mode_strategy import ExecutionsMode
+from gui.run_config import RunConfig
+
+
+class NoopAction:
+    def __init__(self, backend=None):
+        pass
+
+    def execute(self, x, y, interval=0.1, repeat=1):
+        pass
+
+
+class FailingAction(NoopAction):
+    def execute(self, x, y, interval=0.1, repeat=1):
+        raise OSError("backend gone")
+
+
+REGISTRY = {"click": NoopAction, "move": NoopAction, "fail": FailingAction}
+
+
+def make_logic():
+    logic = SimpleNamespace(is_clicking_event=threading.Event(), is_waiting_event=threading.Event(),
+                            status=RunStatus(), metrics=EngineMetrics())
+    logic.is_clicking_event.set()
+    logic.stop_clicking = logic.is_clicking_event.clear
+    return logic
+
+
+def make_plan():
+    return compile_plan([
+        {"x": 1, "y": 1, "interval": 0.001, "type": "click", "repeat": 3},
+        {"x": 2, "y": 2, "interval": 0.001, "type": "move", "repeat": 1},
+    ], REGISTRY)
+
+
+def test_run_plan_keeps_counters():
+    """Counters should reflect every event, pass and run."""
+    logic = make_logic()
+    run_plan(logic, make_plan(), max_passes=2)
+    run_plan(logic, make_plan(), time_limit=0.001)
+    metrics = logic.metrics
+    assert metrics.events_by_type["click"] >= 6
+    assert metrics.events_by_type["move"] >= 2
+    assert metrics.executions >= 2
+    assert metrics.runs == 2
+    assert metrics.mode == "duration"
+    assert metrics.running is False
+    assert metrics.start_error.count == sum(metrics.events_by_type.values())
+
+
+def test_errors_are_counted():
+    """An exception from an action should be counted and propagated."""
+    logic = make_logic()
+    plan = compile_plan([{"x": 0, "y": 0, "interval": 0.001, "type": "fail"}], REGISTRY)
+    with pytest.raises(OSError):
+        run_plan(logic, plan)
+    assert logic.metrics.errors == 1
+    assert logic.metrics.running is False
+
+
+def test_stops_are_recorded():
+    """A requested stop should add a stop latency sample; one over the bound counts as late."""
+    logic = make_logic()
+    logic.stop_latency = 0.0
+
+    class Stopper(NoopAction):
+        def execute(self, x, y, interval=0.1, repeat=1):
+            logic.status.stop_requested_ns = time.perf_counter_ns()
+            logic.is_clicking_event.clear()
+    plan = compile_plan([{"x": 0, "y": 0, "interval": 0.001, "type": "click"}], {"click": Stopper})
+    run_plan(logic, plan)
+    assert logic.metrics.stop_latency.count == 1
+    assert logic.metrics.late_stops == 1
+
+
+def test_render_format():
+    """render() should emit HELP/TYPE headers, escaped labels and summary series."""
+    metrics = EngineMetrics()
+    metrics.events_by_type['say "hi"'] = 3
+    metrics.run_started(None, None)
+    metrics.start_error.record(2_000_000)
+    text = metrics.render()
+    assert text.endswith("\n")
+    assert 'autoclicker_events_total{type="say \\"hi\\""} 3' in text
+    assert "# TYPE autoclicker_start_error_seconds summary" in text
+    assert 'autoclicker_run_mode{mode="indefinite"} 1' in text
+    assert 'autoclicker_run_mode{mode="executions"} 0' in text
+    assert "autoclicker_start_error_seconds_count 1" in text
+    assert "autoclicker_running 1" in text
+    for line in text.splitlines():
+        assert line.startswith("#") or len(line.rsplit(" ", 1)) == 2
+
+
+def test_metrics_server():
+    """The server should render metrics on /metrics and 404 other paths."""
+    metrics = EngineMetrics()
+    metrics.executions = 7
+    server = MetricsServer(metrics)
+    host, port = server.start()
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "autoclicker_executions_total 7" in response.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+    finally:
+        server.stop()
+
+
+def test_executions_done_is_recorded():
+    """ExecutionsMode should record how many executions were completed."""
+    logic = make_logic()
+    strategy = ExecutionsMode()
+    assert strategy.prepare(logic, RunConfig("executions", executions=3))
+    strategy.run(logic, make_plan())
+    assert logic._executions_done == 3
@@ -0,0 +1,132 @@
+"""
+Unit tests for PositionSampler.
+Covers:
+1. Subscribers are only notified when the position changes
+2. The sampling interval switches between idle and fast rates
+3. Sampling pauses while the window is hidden and resumes on <Map>
+4. position() serves cached samples and refreshes stale ones
+5. A failing query reports an error and sampling carries on
+"""
+import sys
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+from gui.position_sampler import PositionSampler
+
+
+class DummyMaster:
+    def __init__(self):
+        self.after_calls = []
+        self.cancelled = []
+        self.bindings = {}
+        self.window_state = "normal"
+    def after(self, ms, func):
+        self.after_calls.append((ms, func))
+        return f"after#{len(self.after_calls)}"
+    def after_cancel(self, after_id):
+        self.cancelled.append(after_id)
+    def bind(self, sequence, func, add=None):
+        self.bindings[sequence] = func
+    def state(self):
+        return self.window_state
+
+
+class FakeCursor:
+    def __init__(self):
+        self.pos = (0, 0)
+        self.queries = 0
+    def __call__(self):
+        self.queries += 1
+        return self.pos
+
+
+def make_sampler(**kwargs):
+    master, cursor = DummyMaster(), FakeCursor()
+    now = [0.0]
+    sampler = PositionSampler(master, query=cursor, clock=lambda: now[0], **kwargs)
+    return sampler, master, cursor, now
+
+
+def test_subscribers_notified_on_change():
+    """Callbacks should run for the first sample and then only on movement."""
+    sampler, master, cursor, _ = make_sampler()
+    seen = []
+    sampler.subscribe(lambda x, y: seen.append((x, y)))
+    sampler.start()
+    sampler.poll()
+    cursor.pos = (5, 6)
+    sampler.poll()
+    assert seen == [(0, 0), (5, 6)]
+    assert cursor.queries == 3
+
+
+def test_rate_switches_with_fast_requests():
+    """request_fast should shorten the interval until released."""
+    sampler, master, _, _ = make_sampler(idle_ms=250, fast_ms=16)
+    sampler.start()
+    assert master.after_calls[-1][0] == 250
+    sampler.request_fast("pick")
+    assert master.cancelled == ["after#1"]
+    assert master.after_calls[-1][0] == 16
+    sampler.poll()
+    assert master.after_calls[-1][0] == 16
+    sampler.release_fast("pick")
+    sampler.poll()
+    assert master.after_calls[-1][0] == 250
+
+
+def test_pauses_while_hidden():
+    """A hidden window should stop sampling until it is mapped again."""
+    sampler, master, cursor, _ = make_sampler()
+    sampler.start()
+    master.window_state = "iconic"
+    calls = len(master.after_calls)
+    sampler.poll()
+    assert sampler.paused and len(master.after_calls) == calls
+    assert cursor.queries == 1
+    master.window_state = "normal"
+    master.bindings["<Map>"](SimpleNamespace(widget=master))
+    assert not sampler.paused and cursor.queries == 2
+    assert len(master.after_calls) == calls + 1
+
+
+def test_position_uses_cache():
+    """position() should reuse the latest sample unless it is older than max_age."""
+    sampler, master, cursor, now = make_sampler()
+    sampler.start()
+    cursor.pos = (7, 8)
+    assert sampler.position() == (0, 0)
+    now[0] = 0.05
+    assert sampler.position(max_age=0.1) == (0, 0)
+    now[0] = 0.2
+    assert sampler.position(max_age=0.1) == (7, 8)
+    assert sampler.latest == (7, 8, 0.2)
+
+
+def test_rejects_bad_intervals():
+    """Non-positive intervals should raise ValueError."""
+    with pytest.raises(ValueError):
+        PositionSampler(DummyMaster(), query=FakeCursor(), idle_ms=0)
+
+
+def test_query_errors_keep_sampling():
+    """A query that raises should be reported and rescheduled, and recovery should notify subscribers."""
+    errors, seen = [], []
+    master, cursor = DummyMaster(), FakeCursor()
+
+    def query():
+        if cursor.pos is None:
+            raise OSError("display gone")
+        return cursor()
+    sampler = PositionSampler(master, query=query, on_error=errors.append)
+    sampler.subscribe(lambda x, y: seen.append((x, y)))
+    sampler.start()
+    cursor.pos = None
+    sampler.poll()
+    assert isinstance(sampler.error, OSError) and len(errors) == 1
+    assert len(master.after_calls) == 2
+    cursor.pos = (0, 0)
+    sampler.poll()
+    assert sampler.error is None
+    assert seen == [(0, 0), (0, 0)]
+    assert len(master.after_calls) == 3
@@ -0,0 +1,136 @@
+"""
+Unit tests for the preview overlay.
+Covers:
+1. cluster_positions culls off-screen points and merges nearby ones
+2. update() reuses canvas items and hides surplus markers
+3. highlight() recolours one marker and survives updates
+4. on_layout receives the marker boxes used to shape the overlay
+5. MarkerWindows pools one small window per marker and hides with the preview
+"""
+import itertools
+import sys
+sys.path.insert(0, 'src')
+from gui.preview_overlay import (PreviewOverlay, MarkerWindows, cluster_positions, MARKER_COLOR, HIGHLIGHT_COLOR,
+                                 LABEL_MARGIN)
+
+
+class FakeCanvas:
+    """Records canvas items and counts item creation."""
+    def __init__(self):
+        self.items = {}
+        self.created = 0
+        self._ids = itertools.count(1)
+    def _create(self, **options):
+        self.created += 1
+        item = next(self._ids)
+        self.items[item] = dict(options, state="normal")
+        return item
+    def create_oval(self, *coords, **options):
+        return self._create(kind="oval", **options)
+    def create_line(self, *coords, **options):
+        return self._create(kind="line", **options)
+    def create_text(self, *coords, **options):
+        return self._create(kind="text", **options)
+    def coords(self, item, *coords):
+        self.items[item]["coords"] = coords
+    def itemconfig(self, item, **options):
+        self.items[item].update(options)
+    def visible_ovals(self):
+        return [i for i in self.items.values() if i["kind"] == "oval" and i["state"] == "normal"]
+
+
+BOUNDS = (0, 0, 1920, 1080)
+
+
+def test_cluster_positions_culls_and_merges():
+    """Off-screen points should be dropped and points in one cell merged."""
+    markers, marker_of = cluster_positions(
+        [(0, 100, 100), (1, 105, 110), (2, -5, 10), (3, 500, 2000), (4, 900, 500)], BOUNDS, radius=40)
+    assert markers == [[100, 100, 2], [900, 500, 1]]
+    assert marker_of == {0: 0, 1: 0, 4: 1}
+
+
+def test_update_reuses_items():
+    """Moving markers should not create canvas items; fewer markers are hidden."""
+    canvas = FakeCanvas()
+    overlay = PreviewOverlay(canvas, BOUNDS)
+    overlay.update((i, i * 50, 10) for i in range(10))
+    created = canvas.created
+    assert len(canvas.visible_ovals()) == 10
+    overlay.update((i, i * 50, 300) for i in range(10))
+    assert canvas.created == created
+    overlay.update((i, i * 50, 10) for i in range(3))
+    assert len(canvas.visible_ovals()) == 3 and overlay.marker_count == 3
+    assert canvas.created == created
+
+
+def test_dense_positions_bounded_markers():
+    """Many actions on the same spot should produce a single marker."""
+    canvas = FakeCanvas()
+    overlay = PreviewOverlay(canvas, BOUNDS)
+    overlay.update((i, 200, 200) for i in range(10_000))
+    assert overlay.marker_count == 1
+    assert [i["text"] for i in canvas.items.values() if i["kind"] == "text"] == ["10000"]
+
+
+def test_highlight_recolours_marker():
+    """highlight() should move the highlight colour between markers."""
+    canvas = FakeCanvas()
+    overlay = PreviewOverlay(canvas, BOUNDS)
+    overlay.update((i, i * 100, 10) for i in range(3))
+    overlay.highlight(1)
+    assert [o["fill"] for o in canvas.visible_ovals()] == [MARKER_COLOR, HIGHLIGHT_COLOR, MARKER_COLOR]
+    overlay.highlight(2)
+    assert [o["fill"] for o in canvas.visible_ovals()] == [MARKER_COLOR, MARKER_COLOR, HIGHLIGHT_COLOR]
+    overlay.update([(0, 0, 10), (2, 500, 10)])
+    assert [o["fill"] for o in canvas.visible_ovals()] == [MARKER_COLOR, HIGHLIGHT_COLOR]
+    overlay.highlight(None)
+    assert [o["fill"] for o in canvas.visible_ovals()] == [MARKER_COLOR, MARKER_COLOR]
+
+
+def test_on_layout_reports_marker_boxes():
+    """Each update should report one box per marker, padded for the count label."""
+    layouts = []
+    overlay = PreviewOverlay(FakeCanvas(), (100, 0, 1920, 1080), size=40, on_layout=layouts.append)
+    overlay.update([(0, 200, 300), (1, 205, 305), (2, 600, 50)])
+    extent = 40 + 2 * LABEL_MARGIN
+    assert layouts[-1] == [(100 - extent // 2, 300 - extent // 2, extent, extent),
+                           (500 - extent // 2, 50 - extent // 2, extent, extent)]
+    overlay.update([])
+    assert layouts[-1] == []
+
+
+class FakeWindow:
+    def __init__(self):
+        self.shown = False
+        self.geometry_spec = None
+    def geometry(self, spec):
+        self.geometry_spec = spec
+    def deiconify(self):
+        self.shown = True
+    def withdraw(self):
+        self.shown = False
+
+
+def test_marker_windows_fallback():
+    """Markers should reuse pooled windows, follow the preview's visibility and keep the highlight."""
+    made = []
+
+    def make_window(master, size):
+        made.append((FakeWindow(), FakeCanvas()))
+        return made[-1]
+    markers = MarkerWindows(None, BOUNDS, size=40, make_window=make_window)
+    markers.update([(0, 100, 100), (1, 300, 100)])
+    assert [w.geometry_spec for w, _ in made] == ["40x40+80+80", "40x40+280+80"]
+    assert all(w.shown for w, _ in made)
+    markers.highlight(1)
+    assert made[1][1].visible_ovals()[0]["fill"] == HIGHLIGHT_COLOR
+    markers.update([(1, 500, 500)])
+    assert len(made) == 2 and markers.marker_count == 1
+    assert (made[0][0].shown, made[1][0].shown) == (True, False)
+    assert made[0][1].visible_ovals()[0]["fill"] == HIGHLIGHT_COLOR
+    markers.withdraw()
+    markers.update([(0, 100, 100)])
+    assert not made[0][0].shown
+    markers.deiconify()
+    assert made[0][0].shown
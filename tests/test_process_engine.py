@@ -0,0 +1,157 @@
+"""
+Unit tests for the out-of-process engine and its shared-memory control block.
+Covers:
+1. SharedFlag mirrors threading.Event and wakes waiters through its event
+2. SharedRunStatus round-trips counters, progress and messages, returning stable objects
+3. Readers fall back to the last value when a write never finishes
+4. StatusPoller drives the label from a SharedRunStatus unchanged
+5. A child process runs a plan to completion, publishing counters to the block
+6. Stop reaches the child through the block and halts a long interval promptly
+"""
+import multiprocessing
+import threading
+import time
+import sys
+from array import array
+import pytest
+sys.path.insert(0, 'src')
+from gui.process_engine import (ControlBlock, SharedFlag, SharedRunStatus, EngineProcess, WAKE, MESSAGE_BYTES,
+                                PROGRESS_SEQ, MESSAGE_SEQ, STEP_X)
+from gui.run_config import RunConfig
+from gui.run_status import StatusPoller
+from gui.engine import PlanStep
+
+
+class DummyMaster:
+    def after(self, ms, func):
+        pass
+
+
+class DummyLabel:
+    def __init__(self):
+        self.texts = []
+    def config(self, **kwargs):
+        self.texts.append(kwargs.get('text'))
+
+
+@pytest.fixture
+def block():
+    block = ControlBlock()
+    yield block
+    block.close()
+    block.unlink()
+
+
+def test_shared_flag(block):
+    """set/clear/wait should behave like threading.Event across attachments."""
+    event = multiprocessing.get_context("spawn").Event()
+    flag = SharedFlag(block.slots, WAKE, event)
+    other = ControlBlock(block.name)
+    try:
+        view = SharedFlag(other.slots, WAKE)
+        assert not view.is_set()
+        assert flag.wait(0.01) is False
+        threading.Timer(0.02, flag.set).start()
+        assert flag.wait(5.0) is True
+        assert view.is_set()
+        flag.clear()
+        assert not view.is_set() and not event.is_set()
+    finally:
+        other.close()
+
+
+def test_shared_run_status(block):
+    """Values written through one view should be read back through another, as stable objects."""
+    status = SharedRunStatus(block, threading.Lock())
+    reader = SharedRunStatus(block, threading.Lock())
+    status.reset(total=3)
+    assert (reader.progress, reader.message, reader.first_event_ns, reader.total) == (None, None, None, 3)
+    status.events = 7
+    status.passes = 2
+    status.progress = (PlanStep(1, "click", 10, 20, 0.1, 4, None), 2)
+    progress = reader.progress
+    assert progress is reader.progress
+    assert reader.format_progress(progress) == "Running action 2/3 (repeat 2/4) at (10,20)"
+    status.message = "Completed 2 executions."
+    message = reader.message
+    assert message == "Completed 2 executions." and message is reader.message
+    status.message = "x" * 1000
+    assert len(reader.message) == MESSAGE_BYTES
+    generation = reader.generation
+    status.reset()
+    assert (reader.generation, reader.events, reader.passes, reader.progress, reader.message) == \
+        (generation + 1, 0, 0, None, None)
+
+
+def test_torn_write_returns_last_value(block):
+    """A sequence counter left odd by a dead writer should not hang the reader."""
+    status = SharedRunStatus(block, threading.Lock())
+    reader = SharedRunStatus(block, threading.Lock())
+    status.reset(total=1)
+    status.progress = (PlanStep(0, "click", 1, 2, 0.1, 1, None), 1)
+    status.message = "Running"
+    progress, message = reader.progress, reader.message
+    block.slots[PROGRESS_SEQ] += 1
+    block.slots[MESSAGE_SEQ] += 1
+    block.slots[STEP_X] = 99
+    assert reader.progress is progress
+    assert reader.message == "Running"
+
+
+def test_status_poller_reads_shared_status(block):
+    """StatusPoller should show progress and messages from the control block."""
+    status = SharedRunStatus(block, threading.Lock())
+    status.reset(total=1)
+    label = DummyLabel()
+    poller = StatusPoller(DummyMaster(), label, status)
+    status.progress = (PlanStep(0, "click", 1, 2, 0.1, 1, None), 1)
+    poller.poll()
+    poller.poll()
+    status.message = "Stopped"
+    poller.poll()
+    assert label.texts == ["Running action 1/1 (repeat 1/1) at (1,2)", "Stopped"]
+
+
+def start(engine, config, actions):
+    engine.status.reset()
+    engine.is_waiting_event.clear()
+    engine.is_clicking_event.set()
+    engine.run(config, actions=actions, backend="recording")
+
+
+def test_child_runs_plan_to_completion():
+    """The child should run every pass and publish events, passes and the completion message."""
+    engine = EngineProcess()
+    try:
+        actions = [{"x": 1, "y": 2, "interval": 0.001, "type": "click", "repeat": 2},
+                   {"x": 3, "y": 4, "interval": 0.001, "type": "move", "repeat": 1}]
+        start(engine, RunConfig("executions", executions=3), actions)
+        assert engine.wait_idle(30.0)
+        assert engine.status.events == 9
+        assert engine.status.passes == 3
+        assert engine.status.message == "Completed 3 executions."
+        assert not engine.is_clicking_event.is_set()
+        stamps = array("q")
+        stamps.frombytes(engine.results.get())
+        assert len(stamps) == 9
+    finally:
+        engine.close()
+    assert not engine.process.is_alive()
+
+
+def test_stop_halts_child_promptly():
+    """Clearing the shared flag and waking the child should end a long interval wait."""
+    engine = EngineProcess()
+    try:
+        start(engine, RunConfig("indefinite"), [{"x": 1, "y": 2, "interval": 30.0, "type": "click", "repeat": 1}])
+        deadline = time.perf_counter() + 30.0
+        while engine.status.events == 0 and time.perf_counter() < deadline:
+            time.sleep(0.005)
+        assert engine.status.first_event_ns is not None
+        engine.status.stop_requested_ns = time.perf_counter_ns()
+        engine.is_clicking_event.clear()
+        engine.is_waiting_event.set()
+        assert engine.wait_idle(1.0)
+        assert engine.status.stop_latency_ns < 50_000_000
+    finally:
+        engine.close()
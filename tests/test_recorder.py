@@ -0,0 +1,119 @@
+"""
+Unit tests for the macro recorder, fed with synthetic event streams.
+Covers:
+1. simplify_path keeps corners and drops points within tolerance
+2. The ring buffer keeps the newest events in order once full
+3. Clicks, double clicks and holds become actions with real intervals
+4. Long movement recordings compress to a handful of move actions
+5. drop_last_click removes the click that stopped the recording
+6. A replayed recording keeps the recorded start times, holds included
+"""
+import math
+import sys
+import threading
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+from gui.recorder import (MacroRecorder, events_to_actions, simplify_path,
+                          MOVE, DOWN, UP, KEY_DOWN)
+from gui.action_list import ActionList, ACTIONS_REGISTRY
+from gui.engine import compile_plan, run_plan
+from gui.input_backend import RecordingBackend
+from gui.run_status import RunStatus
+
+MS = 1_000_000
+
+
+def test_simplify_path_keeps_corners():
+    """A right-angle path should reduce to its three corners."""
+    points = [(i, 0) for i in range(100)] + [(99, i) for i in range(1, 100)]
+    assert simplify_path(points, tolerance=0.5) == [0, 99, 198]
+    assert simplify_path([(0, 0)]) == [0]
+
+
+def test_simplify_path_respects_tolerance():
+    """Points further than the tolerance from the line should be kept."""
+    points = [(0, 0), (5, 1), (10, 0)]
+    assert simplify_path(points, tolerance=2.0) == [0, 2]
+    assert simplify_path(points, tolerance=0.5) == [0, 1, 2]
+
+
+def test_ring_buffer_keeps_newest():
+    """Once full, the oldest events should be overwritten and counted."""
+    recorder = MacroRecorder(capacity=4)
+    for i in range(6):
+        recorder.record(MOVE, i, i, timestamp_ns=i)
+    assert [e[2] for e in recorder.events()] == [2, 3, 4, 5]
+    assert recorder.overwritten == 2 and len(recorder) == 4
+    recorder.clear()
+    assert recorder.events() == []
+
+
+def test_clicks_become_actions():
+    """Clicks should keep the time to the next action as their interval."""
+    events = [
+        (0, DOWN, 10, 10), (20 * MS, UP, 10, 10),
+        (500 * MS, DOWN, 30, 40), (520 * MS, UP, 30, 40),
+        (600 * MS, DOWN, 30, 40), (610 * MS, UP, 30, 40),
+        (1000 * MS, KEY_DOWN, 5, 0),
+        (2000 * MS, DOWN, 50, 50), (2600 * MS, UP, 50, 50),
+        (2700 * MS, DOWN, 60, 60), (2710 * MS, UP, 60, 60),
+    ]
+    actions = events_to_actions(events)
+    assert [(a["type"], a["x"], a["y"]) for a in actions] == [
+        ("click", 10, 10), ("double click", 30, 40), ("press and hold", 50, 50), ("click", 60, 60)]
+    assert [a["interval"] for a in actions] == pytest.approx([0.5, 1.5, 0.7, 0.001])
+    assert actions[2]["duration"] == pytest.approx(0.6)
+
+
+def test_long_recording_is_compact():
+    """Ten minutes of 1 kHz movement along straight strokes should give few actions."""
+    recorder = MacroRecorder(capacity=600_000)
+    t = 0
+    for stroke in range(10):
+        angle = stroke * math.pi / 5
+        for i in range(60_000):
+            x = int(500 + math.cos(angle) * i / 200)
+            y = int(500 + math.sin(angle) * i / 200)
+            recorder.record(MOVE, x, y, timestamp_ns=t)
+            t += MS
+    recorder.record(DOWN, 0, 0, timestamp_ns=t)
+    recorder.record(UP, 0, 0, timestamp_ns=t + MS)
+    actions = recorder.to_actions()
+    assert len(actions) < 100
+    assert actions[-1]["type"] == "click"
+    assert sum(a["interval"] for a in actions[:-2]) == pytest.approx(t / 1e9, rel=0.01)
+    action_list = ActionList()
+    action_list.set_actions(actions)
+    assert action_list.validate_actions()
+
+
+def test_drop_last_click():
+    """drop_last_click should drop the final press and anything after it."""
+    recorder = MacroRecorder(capacity=16)
+    for i, kind in enumerate([DOWN, UP, MOVE, DOWN, UP]):
+        recorder.record(kind, i, i, timestamp_ns=i * 100 * MS)
+    assert [a["type"] for a in recorder.to_actions()] == ["click", "move", "click"]
+    assert [a["type"] for a in recorder.to_actions(drop_last_click=True)] == ["click", "move"]
+
+
+def test_replay_keeps_recorded_times():
+    """Actions after a press and hold should replay at their recorded offsets."""
+    events = [
+        (0, DOWN, 1, 1), (500 * MS, UP, 1, 1),
+        (1000 * MS, DOWN, 2, 2), (1010 * MS, UP, 2, 2),
+        (1600 * MS, DOWN, 3, 3), (1610 * MS, UP, 3, 3),
+    ]
+    actions = events_to_actions(events)
+    assert [a["type"] for a in actions] == ["press and hold", "click", "click"]
+    backend = RecordingBackend(capacity=16)
+    logic = SimpleNamespace(is_clicking_event=threading.Event(), is_waiting_event=threading.Event(),
+                            status=RunStatus())
+    logic.is_clicking_event.set()
+    run_plan(logic, compile_plan(actions, ACTIONS_REGISTRY, backend), max_passes=1)
+    stamps = backend.timestamps[:backend.count]
+    kinds = backend.kinds[:backend.count]
+    starts = [t for t, kind in zip(stamps, kinds) if kind in (RecordingBackend.DOWN, RecordingBackend.CLICK)]
+    assert len(starts) == 3
+    offsets = [(t - starts[0]) / 1e9 for t in starts]
+    assert offsets == pytest.approx([0.0, 1.0, 1.6], abs=0.03)
@@ -0,0 +1,63 @@
+"""
+Unit tests for the low-jitter run profile.
+Covers:
+1. The cyclic GC is disabled and frozen during the run and restored afterwards
+2. Steps the platform or permissions refuse are skipped with a reason, not raised
+3. Affinity and nice changes are undone on exit
+4. CPU lists parse for the command line
+"""
+import gc
+import os
+import sys
+import pytest
+sys.path.insert(0, 'src')
+from gui.run_profile import LowJitterProfile
+from gui.cli import parse_cpus
+
+
+def test_gc_frozen_during_run():
+    """GC should be off inside the profile and back on, unfrozen, after it."""
+    assert gc.isenabled()
+    with LowJitterProfile() as profile:
+        assert not gc.isenabled()
+        assert gc.get_freeze_count() > 0
+    assert gc.isenabled()
+    assert gc.get_freeze_count() == 0
+    assert profile.applied == ["gc"]
+
+
+def test_refused_steps_are_skipped(monkeypatch):
+    """A PermissionError from the OS should be recorded, and the other steps still applied."""
+    def refuse(*args):
+        raise PermissionError("Operation not permitted")
+    monkeypatch.setattr(os, "sched_setaffinity", refuse, raising=False)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0}, raising=False)
+    monkeypatch.setattr(os, "sched_setscheduler", refuse, raising=False)
+    monkeypatch.setattr(os, "sched_getscheduler", lambda pid: 0, raising=False)
+    monkeypatch.setattr(os, "sched_getparam", lambda pid: None, raising=False)
+    with LowJitterProfile(cpus=[0], realtime_priority=10) as profile:
+        pass
+    assert profile.applied == ["gc"]
+    assert [name for name, reason in profile.skipped] == ["affinity", "realtime"]
+    assert "affinity (Operation not permitted)" in profile.report()
+    assert gc.isenabled()
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="no CPU affinity on this platform")
+def test_affinity_and_nice_restored():
+    """Pinning and a worse nice value are always allowed, and should be undone on exit."""
+    before_cpus = os.sched_getaffinity(0)
+    before_nice = os.getpriority(os.PRIO_PROCESS, 0)
+    cpu = min(before_cpus)
+    with LowJitterProfile(freeze_gc=False, cpus=[cpu], nice=before_nice) as profile:
+        assert os.sched_getaffinity(0) == {cpu}
+    assert profile.applied == ["affinity", "nice"]
+    assert os.sched_getaffinity(0) == before_cpus
+    assert os.getpriority(os.PRIO_PROCESS, 0) == before_nice
+
+
+def test_parse_cpus():
+    """CPU lists should accept single numbers and ranges."""
+    assert parse_cpus("0-2,5") == {0, 1, 2, 5}
+    with pytest.raises(Exception):
+        parse_cpus("a")
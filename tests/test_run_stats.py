@@ -0,0 +1,189 @@
+"""
+Unit tests for LogHistogram, RunStats and StatsPoller.
+Covers:
+1. Histogram percentiles stay within the bucket precision and memory is fixed
+2. Out-of-range values are clamped
+3. run_plan records one sample per event, per step and per type, when run_stats is set
+4. slowest() ranks steps by total backend time, kept up to date as events are recorded
+5. Stats export to JSON and CSV
+6. The poller only redraws when new events were recorded
+7. Per-step memory is capped for very long scripts
+"""
+import csv
+import json
+import random
+import sys
+import threading
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+from gui.run_stats import LogHistogram, RunStats, StatsPoller
+from gui.run_status import RunStatus
+from gui.engine import compile_plan, run_plan
+
+
+class NoopAction:
+    def __init__(self, backend=None):
+        pass
+
+    def execute(self, x, y, interval=0.1, repeat=1):
+        pass
+
+
+REGISTRY = {"click": NoopAction, "move": NoopAction}
+
+
+class DummyMaster:
+    def __init__(self):
+        self.after_calls = []
+    def after(self, ms, func):
+        self.after_calls.append((ms, func))
+
+
+class DummyLabel:
+    def __init__(self):
+        self.texts = []
+    def config(self, **kwargs):
+        self.texts.append(kwargs.get('text'))
+
+
+def make_logic(run_stats):
+    logic = SimpleNamespace()
+    logic.is_clicking_event = threading.Event()
+    logic.is_clicking_event.set()
+    logic.is_waiting_event = threading.Event()
+    logic.status = RunStatus()
+    logic.run_stats = run_stats
+    return logic
+
+
+def step(index, type_="click"):
+    return SimpleNamespace(index=index, type=type_)
+
+
+def test_histogram_percentiles_within_precision():
+    """Percentiles should be within the relative bucket error of the exact values."""
+    rng = random.Random(1)
+    values = sorted(rng.randint(0, 50_000_000) for _ in range(20000))
+    histogram = LogHistogram()
+    size = len(histogram.counts)
+    for value in values:
+        histogram.record(value)
+    assert len(histogram.counts) == size
+    for pct in (50, 90, 99):
+        exact = values[int(len(values) * pct / 100) - 1]
+        assert histogram.percentile(pct) == pytest.approx(exact, rel=0.07)
+    assert histogram.max == values[-1]
+    assert histogram.count == len(values)
+
+
+def test_histogram_small_values_are_exact():
+    """Values below the sub-bucket count should be kept exactly."""
+    histogram = LogHistogram()
+    for value in (3, 3, 7):
+        histogram.record(value)
+    assert histogram.percentile(50) == 3
+    assert histogram.percentile(100) == 7
+
+
+def test_histogram_clamps_out_of_range():
+    """Negative values count as zero and huge ones land in the last bucket."""
+    histogram = LogHistogram(max_value=1 << 20)
+    histogram.record(-5)
+    histogram.record(1 << 30)
+    assert histogram.percentile(1) == 0
+    assert histogram.max == 1 << 20
+    assert LogHistogram().percentile(50) == 0
+
+
+def test_run_plan_records_each_event():
+    """run_plan should record every event per step and per type."""
+    stats = RunStats()
+    logic = make_logic(stats)
+    plan = compile_plan([
+        {"x": 1, "y": 1, "interval": 0.001, "type": "click", "repeat": 2},
+        {"x": 2, "y": 2, "interval": 0.001, "type": "move", "repeat": 1},
+    ], REGISTRY)
+    run_plan(logic, plan, max_passes=3)
+    assert stats.events == 9
+    assert list(stats.count) == [6, 3]
+    assert stats.types["click"][0].count == 6
+    assert stats.types["move"][1].count == 3
+    assert stats.step(1)["type"] == "move"
+    assert stats.events_per_second() > 0
+
+
+def test_slowest_ranks_by_total_time():
+    """slowest() should list the steps with the most backend time first."""
+    stats = RunStats(top=2)
+    stats.reset(3)
+    stats.record(step(0), 0, 1000)
+    stats.record(step(1), 0, 5000)
+    stats.record(step(2, "move"), 0, 3000)
+    stats.record(step(2, "move"), 0, 3000)
+    assert [s["index"] for s in stats.slowest()] == [2, 1]
+    assert stats.slowest(5)[-1]["index"] == 0
+    assert "#3 move" in stats.format_slowest()
+
+
+def test_slowest_matches_full_ranking():
+    """The incremental ranking should agree with ranking every step."""
+    rng = random.Random(3)
+    stats = RunStats(top=5)
+    stats.reset(200)
+    for _ in range(5000):
+        stats.record(step(rng.randrange(200)), 0, rng.randrange(10_000))
+    totals = stats.latency_total
+    expected = sorted(range(200), key=lambda i: (-totals[i], i))[:5]
+    assert sorted(s["index"] for s in stats.slowest()) == sorted(expected)
+    assert [s["latency_total"] for s in stats.slowest()] == sorted((totals[i] for i in expected), reverse=True)
+
+
+def test_step_statistics_are_capped():
+    """Steps past max_steps should only count towards the overall histograms."""
+    stats = RunStats(max_steps=100)
+    stats.reset(2_000_000)
+    assert len(stats.count) == 100
+    assert stats.untracked_steps == 1_999_900
+    stats.record(step(1_500_000), 0, 1000)
+    stats.record(step(7), 0, 500)
+    assert stats.events == 2
+    assert [s["index"] for s in stats.slowest()] == [7]
+    assert stats.to_dict()["untracked_steps"] == 1_999_900
+
+
+def test_save_json_and_csv(tmp_path):
+    """Stats should export as JSON (summary, types, steps) and CSV (one row per step)."""
+    stats = RunStats()
+    stats.reset(2)
+    stats.record(step(0), 2000, 10_000)
+    stats.record(step(1, "move"), 4000, 20_000)
+    json_path = tmp_path / "stats.json"
+    stats.save(str(json_path))
+    data = json.loads(json_path.read_text())
+    assert data["events"] == 2
+    assert set(data["types"]) == {"click", "move"}
+    assert data["steps"][1]["latency_max"] == 20_000
+    csv_path = tmp_path / "stats.csv"
+    stats.save(str(csv_path))
+    with open(csv_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["type"] for row in rows] == ["click", "move"]
+    assert rows[0]["error_max"] == "2000"
+
+
+def test_poller_redraws_only_on_new_events():
+    """The poller should update its labels once per batch of new events."""
+    stats = RunStats()
+    stats.reset(1)
+    master = DummyMaster()
+    summary, slowest = DummyLabel(), DummyLabel()
+    poller = StatsPoller(master, summary, slowest, stats, refresh_hz=2)
+    poller.start()
+    assert summary.texts == []
+    stats.record(step(0), 0, 1000)
+    poller.poll()
+    poller.poll()
+    assert len(summary.texts) == 1
+    assert slowest.texts[0].startswith("#1 click")
+    assert master.after_calls[0][0] == 500
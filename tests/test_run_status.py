@@ -0,0 +1,98 @@
+"""
+Unit tests for RunStatus and StatusPoller.
+Covers:
+1. Poller reschedules itself at the configured frame rate
+2. Label is only updated when progress changes, however many events occur
+3. Messages take priority over progress and survive a stale progress write
+4. reset() lets the same message be shown again in the next run
+5. on_progress is called once per new progress
+"""
+import sys
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+from gui.run_status import RunStatus, StatusPoller
+
+
+class DummyMaster:
+    def __init__(self):
+        self.after_calls = []
+    def after(self, ms, func):
+        self.after_calls.append((ms, func))
+
+
+class DummyLabel:
+    def __init__(self):
+        self.texts = []
+    def config(self, **kwargs):
+        self.texts.append(kwargs.get('text'))
+
+
+def make_step(index=0, x=10, y=20, repeat=3):
+    return SimpleNamespace(index=index, x=x, y=y, repeat=repeat)
+
+
+def test_poller_reschedules_at_frame_rate():
+    """Should schedule the next poll using the refresh rate."""
+    master = DummyMaster()
+    poller = StatusPoller(master, DummyLabel(), RunStatus(), refresh_hz=20)
+    poller.start()
+    assert master.after_calls == [(50, poller.poll)]
+
+
+def test_poller_rejects_bad_rate():
+    """Should reject a non-positive refresh rate."""
+    with pytest.raises(ValueError):
+        StatusPoller(DummyMaster(), DummyLabel(), RunStatus(), refresh_hz=0)
+
+
+def test_progress_is_coalesced():
+    """Many events between polls should produce a single label update."""
+    status = RunStatus()
+    status.total = 2
+    label = DummyLabel()
+    poller = StatusPoller(DummyMaster(), label, status)
+    step = make_step()
+    for r in range(1, 1001):
+        status.progress = (step, r)
+    poller.poll()
+    poller.poll()
+    assert label.texts == ["Running action 1/2 (repeat 1000/3) at (10,20)"]
+
+
+def test_message_takes_priority():
+    """A message should win over progress written after it."""
+    status = RunStatus()
+    label = DummyLabel()
+    poller = StatusPoller(DummyMaster(), label, status)
+    status.message = "Stopped"
+    poller.poll()
+    status.progress = (make_step(), 1)
+    poller.poll()
+    assert label.texts == ["Stopped"]
+
+
+def test_reset_allows_repeated_message():
+    """The same message should be shown again after a reset."""
+    status = RunStatus()
+    label = DummyLabel()
+    poller = StatusPoller(DummyMaster(), label, status)
+    status.message = "Stopped"
+    poller.poll()
+    status.reset()
+    status.message = "Stopped"
+    poller.poll()
+    assert label.texts == ["Stopped", "Stopped"]
+
+
+def test_poller_reports_progress_changes():
+    """on_progress should get None for a new run, then each new progress once."""
+    status = RunStatus()
+    seen = []
+    poller = StatusPoller(DummyMaster(), DummyLabel(), status, on_progress=seen.append)
+    poller.poll()
+    progress = (make_step(), 1)
+    status.progress = progress
+    poller.poll()
+    poller.poll()
+    assert seen == [None, progress]
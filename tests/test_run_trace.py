@@ -0,0 +1,110 @@
+"""
+Unit tests for RunTrace.
+Covers:
+1. The ring buffer keeps the most recent spans, oldest first, and counts drops
+2. wrap() records a span around each call, even when it raises
+3. run_plan records action, wait and pass spans when run_trace is set
+4. The Chrome trace export has metadata, complete events and step args
+5. A trace that cannot be written is reported in the status message
+"""
+import json
+import sys
+import threading
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+from gui.run_trace import RunTrace, WAIT, PASS
+from gui.run_status import RunStatus
+from gui.engine import compile_plan, run_plan
+from gui.window_logic import WindowLogic
+
+
+class NoopAction:
+    def __init__(self, backend=None):
+        pass
+
+    def execute(self, x, y, interval=0.1, repeat=1):
+        pass
+
+
+REGISTRY = {"click": NoopAction}
+
+
+def make_clock():
+    ticks = iter(range(0, 10**9, 1000))
+    return lambda: next(ticks)
+
+
+def test_ring_keeps_latest_spans():
+    """Once full, the buffer should overwrite the oldest spans."""
+    trace = RunTrace(capacity=3, clock=make_clock())
+    name = trace.intern("click")
+    for i in range(5):
+        trace.add(name, i * 10, i * 10 + 5, i)
+    assert len(trace) == 3
+    assert trace.dropped == 2
+    assert [span[3] for span in trace.spans()] == [2, 3, 4]
+
+
+def test_rejects_bad_capacity():
+    """Should reject a non-positive capacity."""
+    with pytest.raises(ValueError):
+        RunTrace(capacity=0)
+
+
+def test_wrap_records_calls_and_errors():
+    """Wrapped calls should be timed and passed through, and recorded when they raise."""
+    trace = RunTrace(clock=make_clock())
+
+    def fail():
+        raise RuntimeError("boom")
+    assert trace.wrap("add", lambda a, b=0: a + b, 7)(1, b=2) == 3
+    with pytest.raises(RuntimeError):
+        trace.wrap("fail", fail)()
+    spans = list(trace.spans())
+    assert [(name, arg) for name, _, _, arg in spans] == [("add", 7), ("fail", -1)]
+    assert all(end > start for _, start, end, _ in spans)
+
+
+def test_run_plan_records_spans():
+    """run_plan should record one span per action, per wait and per pass."""
+    logic = SimpleNamespace(is_clicking_event=threading.Event(), is_waiting_event=threading.Event(),
+                            status=RunStatus(), run_trace=RunTrace())
+    logic.is_clicking_event.set()
+    plan = compile_plan([{"x": 1, "y": 1, "interval": 0.001, "type": "click", "repeat": 2}], REGISTRY)
+    run_plan(logic, plan, max_passes=2)
+    names = [name for name, _, _, _ in logic.run_trace.spans()]
+    assert names.count("click") == 4
+    assert names.count(WAIT) == 4
+    assert names.count(PASS) == 2
+
+
+def test_chrome_trace_format(tmp_path):
+    """write() should produce trace-event JSON with microsecond complete events."""
+    trace = RunTrace(clock=lambda: 1_000_000)
+    trace.reset()
+    trace.add(trace.intern("click"), 1_000_000, 1_003_000, 4)
+    trace.add(trace.intern(PASS), 1_000_000, 1_010_000, 0)
+    path = tmp_path / "trace.json"
+    trace.write(str(path))
+    data = json.loads(path.read_text())
+    events = data["traceEvents"]
+    assert [e["ph"] for e in events] == ["M", "M", "X", "X"]
+    click = events[2]
+    assert (click["name"], click["cat"], click["ts"], click["dur"]) == ("click", "action", 0, 3)
+    assert click["args"] == {"step": 4}
+    assert events[3]["args"] == {"pass": 0}
+    assert data["otherData"] == {"recorded": 2, "dropped": 0}
+
+
+def test_trace_write_error_sets_status(tmp_path):
+    """A failed trace write should be shown in the status message, and a good one leave it alone."""
+    logic = SimpleNamespace(run_trace=RunTrace(capacity=4), status=RunStatus(),
+                            trace_path=str(tmp_path / "missing" / "trace.json"))
+    WindowLogic._write_trace(logic)
+    assert logic.status.message.startswith("Error writing trace:")
+    logic.status.message = None
+    logic.trace_path = str(tmp_path / "trace.json")
+    WindowLogic._write_trace(logic)
+    assert logic.status.message is None
+    assert json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
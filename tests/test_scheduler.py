@@ -0,0 +1,117 @@
+"""
+Unit tests for DeadlineScheduler.
+Covers:
+1. Deadlines are absolute, so time spent between waits does not drift the schedule
+2. Skip and burst catch-up policies when falling behind
+3. The wake event interrupts a long wait promptly
+4. Sub-millisecond intervals are met by the spin phase
+5. Condition polling times out, passes, and shifts the schedule by the time spent
+"""
+import threading
+import time
+import sys
+import pytest
+sys.path.insert(0, 'src')
+from gui.scheduler import DeadlineScheduler, CATCH_UP_SKIP, CATCH_UP_BURST
+
+MS = 1_000_000
+
+
+class FakeClock:
+    """Clock that advances by step_ns on every read."""
+    def __init__(self, step_ns=0):
+        self.now = 0
+        self.step_ns = step_ns
+    def __call__(self):
+        self.now += self.step_ns
+        return self.now
+
+
+def test_deadlines_are_absolute():
+    """Work done between waits should be absorbed by the next interval."""
+    clock = FakeClock()
+    sched = DeadlineScheduler(threading.Event(), spin_ns=10 * MS, clock=clock)
+    sched.start()
+    clock.step_ns = 1000
+    for i in range(1, 6):
+        clock.now += 3 * MS  # simulated action time
+        assert sched.wait(10 * MS) is False
+        assert sched.deadline == i * 10 * MS
+        assert clock.now >= sched.deadline
+
+
+def test_skip_policy_reanchors_when_behind():
+    """Skip should drop missed slots and restart the schedule from now."""
+    clock = FakeClock()
+    sched = DeadlineScheduler(threading.Event(), catch_up=CATCH_UP_SKIP, clock=clock)
+    sched.start()
+    clock.now = 35 * MS
+    assert sched.wait(10 * MS) is False
+    assert sched.deadline == 35 * MS
+    assert sched.skipped == 1
+
+
+def test_burst_policy_keeps_deadlines():
+    """Burst should keep the original deadlines and return immediately while late."""
+    clock = FakeClock()
+    sched = DeadlineScheduler(threading.Event(), catch_up=CATCH_UP_BURST, clock=clock)
+    sched.start()
+    clock.now = 35 * MS
+    for i in range(1, 4):
+        assert sched.wait(10 * MS) is False
+        assert sched.deadline == i * 10 * MS
+    assert sched.skipped == 0
+
+
+def test_unknown_policy():
+    """Should reject unknown catch-up policies."""
+    with pytest.raises(ValueError):
+        DeadlineScheduler(threading.Event(), catch_up="later")
+
+
+def test_wake_event_interrupts_wait():
+    """Setting the wake event should end a long wait well before its deadline."""
+    wake = threading.Event()
+    sched = DeadlineScheduler(wake)
+    sched.start()
+    threading.Timer(0.05, wake.set).start()
+    start = time.perf_counter()
+    assert sched.wait(5_000 * MS) is True
+    assert time.perf_counter() - start < 1.0
+
+
+def test_sub_millisecond_intervals():
+    """Many 200 us waits should finish close to their total scheduled time."""
+    sched = DeadlineScheduler(threading.Event())
+    start = sched.start()
+    for _ in range(50):
+        sched.wait(200_000)
+    elapsed = time.perf_counter_ns() - start
+    assert 10 * MS <= elapsed < 30 * MS
+
+
+def test_poll_shifts_schedule():
+    """poll() should retry until the check passes or times out and push the deadline back by the time spent."""
+    sched = DeadlineScheduler(threading.Event())
+    start = sched.start()
+    results = iter([False, False, True])
+    assert sched.poll(lambda: next(results), 5 * MS, 1_000 * MS) is True
+    assert sched.deadline - start >= 10 * MS
+    checks = []
+    deadline = sched.deadline
+    assert sched.poll(lambda: checks.append(1), 5 * MS, 20 * MS) is False
+    assert 3 <= len(checks) <= 6
+    assert sched.deadline - deadline >= 20 * MS
+    assert sched.poll(lambda: checks.append(1), 5 * MS) is False
+    assert sched.skipped == 0
+
+
+def test_wake_event_interrupts_poll():
+    """Setting the wake event should end polling promptly."""
+    wake = threading.Event()
+    sched = DeadlineScheduler(wake)
+    sched.start()
+    threading.Timer(0.05, wake.set).start()
+    start = time.perf_counter()
+    assert sched.poll(lambda: False, 10 * MS, 5_000 * MS) is False
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,156 @@
+"""
+Unit tests for the frame cache, pixel probes and condition actions, on synthetic frames.
+Covers:
+1. Probe specs parse positions, colours and tolerances
+2. Probes are checked against one capture of their bounding rectangle
+3. Conditions checked within max_age share one capture of all watched regions
+4. Refreshes flag watches overlapping the dirty rectangle only
+5. Condition steps gate execution in run_plan and time out
+6. Pixel conditions keep their watches, so separate probes share one grab
+7. A poll field on the action row overrides the class poll interval
+"""
+import threading
+import sys
+from types import SimpleNamespace
+import pytest
+sys.path.insert(0, 'src')
+np = pytest.importorskip("numpy")
+from gui.screen_cache import FrameCache, PixelProbes, diff_region
+from gui.action_list import ClickWhenPixelAction, ClickWhenChangedAction, ACTIONS_REGISTRY
+from gui.engine import compile_plan, run_plan, COMPLETED
+from gui.input_backend import RecordingBackend
+from gui.run_status import RunStatus
+
+
+class FakeScreen:
+    """Screenshot source over an RGB array that records the regions grabbed."""
+    def __init__(self, width=200, height=100):
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        self.regions = []
+
+    def __call__(self, region):
+        self.regions.append(region)
+        left, top, width, height = region
+        return self.pixels[top:top + height, left:left + width].copy()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+
+def test_parse_probe_spec():
+    """Entries without a position should probe the action's own position."""
+    probes = PixelProbes.parse("ff0000; 30,40=#00FF00~8", x=10, y=20)
+    assert len(probes) == 2
+    assert probes.region == (10, 20, 21, 21)
+    for spec in ("", "zz0000", "1,2=ff00", "1=ff0000", "ff0000~-1"):
+        with pytest.raises(ValueError):
+            PixelProbes.parse(spec)
+
+
+def test_probes_match_with_one_grab():
+    """All probes should be read from a single grab of their bounding rectangle."""
+    screen = FakeScreen()
+    screen.pixels[20, 10] = (255, 0, 0)
+    screen.pixels[40, 30] = (0, 250, 0)
+    frames = FrameCache(screen, clock=FakeClock())
+    action = ClickWhenPixelAction(RecordingBackend(capacity=4), frames)
+    assert action.check(10, 20, "ff0000; 30,40=00ff00~8") is True
+    assert action.check(10, 20, "ff0000; 30,40=00ff00~4") is False
+    assert screen.regions == [(10, 20, 21, 21)]
+
+
+def test_conditions_share_capture():
+    """Regions watched by different conditions should come from one capture until it goes stale."""
+    screen = FakeScreen()
+    clock = FakeClock()
+    frames = FrameCache(screen, max_age=0.01, clock=clock)
+    a = frames.watch((0, 0, 10, 10))
+    b = frames.watch((100, 50, 10, 10))
+    frames.grab(a.region)
+    frames.grab(b.region)
+    assert screen.regions == [(0, 0, 110, 60)]
+    clock.now = 0.02
+    frames.grab(b.region)
+    assert frames.captures == 2
+    del a
+    clock.now = 0.04
+    frames.grab(b.region)
+    assert screen.regions[-1] == (100, 50, 10, 10)
+
+
+def test_dirty_region_flags_overlapping_watches():
+    """Only watches overlapping the changed pixels should be flagged."""
+    screen = FakeScreen()
+    clock = FakeClock()
+    frames = FrameCache(screen, max_age=0, clock=clock)
+    a = frames.watch((0, 0, 10, 10))
+    b = frames.watch((50, 50, 10, 10))
+    frames.refresh()
+    screen.pixels[55, 58] = 1
+    frames.refresh()
+    assert (a.take_changed(), b.take_changed(), b.take_changed()) == (False, True, False)
+    assert diff_region(np.zeros((4, 4)), np.eye(4)[::-1]) == (0, 0, 4, 4)
+    assert diff_region(np.zeros((4, 4)), np.zeros((4, 4))) is None
+
+
+def test_click_when_changed_action():
+    """Should only pass after the region changed since its previous check."""
+    screen = FakeScreen()
+    clock = FakeClock()
+    action = ClickWhenChangedAction(RecordingBackend(capacity=4), FrameCache(screen, max_age=0, clock=clock))
+    assert action.check(0, 0, "20,20,5,5") is False
+    assert action.check(0, 0, "20,20,5,5") is False
+    screen.pixels[22, 24] = 9
+    assert action.check(0, 0, "20,20,5,5") is True
+    assert action.check(0, 0, "20,20,5,5") is False
+    with pytest.raises(ValueError):
+        action.check(0, 0, "20,20,0,5")
+
+
+def test_condition_steps_gate_execution(monkeypatch):
+    """run_plan should click only when the condition passes, and move on after the timeout."""
+    screen = FakeScreen()
+    screen.pixels[5, 5] = (255, 255, 255)
+    frames = FrameCache(screen, max_age=0)
+    monkeypatch.setattr(ClickWhenPixelAction, "poll_interval", 0.001)
+    monkeypatch.setattr("gui.screen_cache._default_frame_cache", frames)
+    backend = RecordingBackend(capacity=8)
+    actions = [{"x": 5, "y": 5, "interval": 0.001, "type": "click when pixel", "repeat": 1, "template": "ffffff"},
+               {"x": 6, "y": 5, "interval": 0.001, "type": "click when pixel", "repeat": 1, "template": "ffffff",
+                "duration": 0.02}]
+    plan = compile_plan(actions, ACTIONS_REGISTRY, backend)
+    assert plan.steps[1].timeout_ns == 20_000_000
+    logic = SimpleNamespace(is_clicking_event=threading.Event(), is_waiting_event=threading.Event(),
+                            status=RunStatus())
+    logic.is_clicking_event.set()
+    assert run_plan(logic, plan, max_passes=1) == COMPLETED
+    assert [e[2:] for e in backend.events()] == [(5, 5)]
+    assert logic.status.events == 1
+
+
+def test_pixel_conditions_share_one_grab():
+    """Two pixel conditions at different points should be served by one capture."""
+    screen = FakeScreen()
+    screen.pixels[10, 10] = (255, 0, 0)
+    screen.pixels[80, 150] = (0, 0, 255)
+    frames = FrameCache(screen, max_age=1.0, clock=FakeClock())
+    action = ClickWhenPixelAction(RecordingBackend(capacity=4), frames)
+    action.probes(10, 10, "ff0000")
+    action.probes(150, 80, "0000ff")
+    assert len(frames._watches) == 2
+    assert action.check(10, 10, "ff0000") is True
+    assert action.check(150, 80, "0000ff") is True
+    assert screen.regions == [(10, 10, 141, 71)]
+
+
+def test_poll_interval_from_row():
+    """compile_plan should take the poll interval from the action row when it is set."""
+    actions = [{"x": 0, "y": 0, "interval": 0.1, "type": "wait for pixel", "template": "ffffff", "poll": 0.005},
+               {"x": 0, "y": 0, "interval": 0.1, "type": "wait for pixel", "template": "ffffff"}]
+    plan = compile_plan(actions, ACTIONS_REGISTRY, RecordingBackend(capacity=4))
+    assert plan.steps[0].poll_ns == 5_000_000
+    assert plan.steps[1].poll_ns == 50_000_000
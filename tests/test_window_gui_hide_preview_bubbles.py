@@ -4,14 +4,12 @@ import sys
 sys.path.insert(0, 'src')
 from gui.window_gui import WindowGUI
 
-def test_hide_preview_bubbles_destroys_bubbles():
+def test_hide_preview_bubbles_withdraws_overlay():
     root = tk.Tk()
     root.withdraw()
     gui = WindowGUI(root)
-    mock_bubble1 = MagicMock()
-    mock_bubble2 = MagicMock()
-    gui.preview_bubbles = [mock_bubble1, mock_bubble2]
     gui.hide_preview_bubbles()
-    mock_bubble1.destroy.assert_called_once()
-    mock_bubble2.destroy.assert_called_once()
-    assert gui.preview_bubbles == []
+    gui.preview_window = MagicMock()
+    gui.hide_preview_bubbles()
+    gui.preview_window.withdraw.assert_called_once()
+    gui.preview_window.destroy.assert_not_called()
@@ -2,15 +2,19 @@ from unittest.mock import MagicMock
 import tkinter as tk
 import sys
 sys.path.insert(0, 'src')
+import gui.window_gui as window_gui
 from gui.window_gui import WindowGUI
 
-def test_show_preview_bubbles_creates_bubbles():
+def test_show_preview_bubbles_uses_one_overlay(monkeypatch):
     root = tk.Tk()
     root.withdraw()
     gui = WindowGUI(root)
-    gui._create_bubble = MagicMock(return_value=MagicMock())
-    positions = [(10, 10), (20, 20)]
-    gui.show_preview_bubbles(positions)
-    assert len(gui.preview_bubbles) == 2
-    gui._create_bubble.assert_any_call(10, 10)
-    gui._create_bubble.assert_any_call(20, 20)
+    window, overlay = MagicMock(), MagicMock()
+    create = MagicMock(return_value=(window, overlay))
+    monkeypatch.setattr(window_gui, "create_overlay_window", create)
+    gui.show_preview_bubbles([(10, 10), (20, 20)])
+    gui.show_preview_bubbles([(30, 30)])
+    create.assert_called_once_with(root)
+    window.deiconify.assert_called_once()
+    assert list(overlay.update.call_args_list[0][0][0]) == [(0, 10, 10), (1, 20, 20)]
+    assert list(overlay.update.call_args_list[1][0][0]) == [(0, 30, 30)]